@@ -0,0 +1,76 @@
+"""
+Sequencer throughput for each arbitration mode at 1, 10 and 1,000
+competing sequences.
+
+Every sequence sends its share of N items through one sequencer
+to a driver that calls get_next_item() and item_done(). Sequence
+priorities cycle through 100, 200 and 300.
+
+There is no simulator, so the Scheduler from bench_queue.py stands
+in for the cocotb scheduler. Run with pyuvm installed:
+
+    python benchmarks/bench_arbitration.py
+"""
+import time
+
+import cocotb
+from bench_queue import Scheduler
+
+from pyuvm import (uvm_sequence, uvm_sequence_item, uvm_sequencer,
+                   uvm_sequencer_arb_mode)
+
+N = 30_000
+SEQUENCE_COUNTS = (1, 10, 1_000)
+
+
+class Item(uvm_sequence_item):
+    def __init__(self, name="item"):
+        super().__init__(name)
+
+
+class Seq(uvm_sequence):
+    def __init__(self, name, count):
+        super().__init__(name)
+        self.count = count
+
+    async def body(self):
+        for _ in range(self.count):
+            item = Item()
+            await self.start_item(item)
+            await self.finish_item(item)
+
+
+def bench(mode, sequences):
+    sched = Scheduler()
+    cocotb.scheduler = sched
+    seqr = uvm_sequencer(f"seqr_{mode.name}_{sequences}", None)
+    seqr.set_arbitration(mode)
+    export = seqr.seq_item_export
+    total = (N // sequences) * sequences
+
+    async def driver():
+        for _ in range(total):
+            await export.get_next_item()
+            export.item_done()
+
+    for ii in range(sequences):
+        sched.spawn(Seq(f"seq{ii}", N // sequences).start(
+            seqr, priority=100 * (1 + ii % 3)))
+    sched.spawn(driver())
+    start = time.perf_counter()
+    sched.run()
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'':28}" + "".join(f"{nn:>12,} seq" for nn in SEQUENCE_COUNTS))
+    for mode in uvm_sequencer_arb_mode:
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_USER:
+            continue
+        rates = [bench(mode, nn) for nn in SEQUENCE_COUNTS]
+        print(f"{mode.name:28}" + "".join(f"{rr:16,.0f}" for rr in rates))
+    print("(items/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+CPU time of uvm_batch_scoreboard against a per-transaction scoreboard.
+
+The transactions look like the ALU in ml_TB/alu.sv: op, a, b and y.
+One actual transaction in a thousand has a wrong y.
+
+* per-transaction: the usual pyuvm scoreboard. Analysis FIFOs collect
+  the expected and actual transactions, and check_phase takes them
+  out in pairs and compares each field.
+* per-transaction, inline model: a subscriber that runs a Python
+  reference model on each actual transaction as it arrives. This is
+  the cheapest possible Python scoreboard.
+* batch, expected stream: uvm_batch_scoreboard fed with the same
+  expected transactions the reference model would have produced.
+* batch, predict: uvm_batch_scoreboard with the reference model
+  written as NumPy array arithmetic in predict().
+
+There is no simulator, so cocotb.simulator.get_sim_time() is replaced
+with a function that returns 0. Run with pyuvm and numpy installed:
+
+    python benchmarks/bench_batch_scoreboard.py
+"""
+import logging
+import random
+import time
+
+import numpy as np
+from cocotb import simulator
+
+from pyuvm import (uvm_component, uvm_subscriber, uvm_batch_scoreboard,
+                   uvm_tlm_analysis_fifo, uvm_get_port)
+
+N = 500_000
+FIELDS = ("op", "a", "b", "y")
+ALU = (lambda a, b: a + b, lambda a, b: a - b,
+       lambda a, b: a & b, lambda a, b: a | b)
+
+
+class AluItem:
+    __slots__ = FIELDS
+
+    def __init__(self, op, a, b, y):
+        self.op, self.a, self.b, self.y = op, a, b, y
+
+
+class FifoScoreboard(uvm_component):
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.expected_fifo = uvm_tlm_analysis_fifo("expected_fifo", self)
+        self.actual_fifo = uvm_tlm_analysis_fifo("actual_fifo", self)
+        self.expected_export = self.expected_fifo.analysis_export
+        self.actual_export = self.actual_fifo.analysis_export
+        self.expected_get_port = uvm_get_port("expected_get_port", self)
+        self.actual_get_port = uvm_get_port("actual_get_port", self)
+        self.expected_get_port.connect(self.expected_fifo.get_export)
+        self.actual_get_port.connect(self.actual_fifo.get_export)
+        self.mismatches = 0
+
+    def check_phase(self):
+        while self.actual_get_port.can_get():
+            _, act = self.actual_get_port.try_get()
+            _, exp = self.expected_get_port.try_get()
+            for fname in FIELDS:
+                if getattr(exp, fname) != getattr(act, fname):
+                    self.mismatches += 1
+                    break
+
+
+class LoopScoreboard(uvm_component):
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.actual_export = uvm_subscriber.uvm_AnalysisImp(
+            "actual_export", self, self.write)
+        self.mismatches = 0
+
+    def write(self, tt):
+        if ALU[tt.op](tt.a, tt.b) & 0xFF != tt.y:
+            self.mismatches += 1
+
+
+class AluScoreboard(uvm_batch_scoreboard):
+    fields = {"op": "u1", "a": "u1", "b": "u1", "y": "u1"}
+
+
+class AluPredictScoreboard(AluScoreboard):
+    def predict(self, cols):
+        op, a, b = cols["op"], cols["a"], cols["b"]
+        return {"y": np.select([op == 0, op == 1, op == 2],
+                               [a + b, a - b, a & b], a | b)}
+
+
+def make_items():
+    rng = random.Random(1)
+    expected, actual = [], []
+    for ii in range(N):
+        op, a, b = rng.randrange(4), rng.randrange(256), rng.randrange(256)
+        y = ALU[op](a, b) & 0xFF
+        expected.append(AluItem(op, a, b, y))
+        actual.append(AluItem(op, a, b, y ^ 1 if ii % 1000 == 0 else y))
+    return expected, actual
+
+
+def bench(sb, expected, actual):
+    act_write = sb.actual_export.write
+    start = time.perf_counter()
+    if expected is None:
+        for act in actual:
+            act_write(act)
+    else:
+        exp_write = sb.expected_export.write
+        for exp, act in zip(expected, actual):
+            exp_write(exp)
+            act_write(act)
+    sb.check_phase()
+    elapsed = time.perf_counter() - start
+    assert sb.mismatches == N // 1000
+    return elapsed
+
+
+def main():
+    simulator.get_sim_time = lambda: (0, 0)
+    logging.disable(logging.ERROR)
+    expected, actual = make_items()
+    fifo_time = bench(FifoScoreboard("fifo", None), expected, actual)
+    results = [
+        ("per-transaction", fifo_time),
+        ("per-transaction, inline",
+         bench(LoopScoreboard("loop", None), None, actual)),
+        ("batch, expected stream",
+         bench(AluScoreboard("batch", None), expected, actual)),
+        ("batch, predict",
+         bench(AluPredictScoreboard("predict", None), None, actual)),
+    ]
+    for name, elapsed in results:
+        print(f"{name:24}: {elapsed:7.3f} s  {fifo_time / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
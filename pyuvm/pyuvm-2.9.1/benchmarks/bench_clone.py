@@ -0,0 +1,82 @@
+"""
+Clones and compares per second for a transaction a scoreboard
+keeps, with six int fields and a list of 16 data beats.
+
+* copy.deepcopy(): what tests use when clone() only copies the name
+* hand-written: clone() with a do_copy() and do_compare() written
+  out field by field, copying the list with list(), which is only
+  a shallow copy
+* uvm_fields: do_copy(), do_compare() and clone() generated from
+  uvm_fields, with the list marked mutable so it is deep copied
+
+Run with pyuvm installed:
+
+    python benchmarks/bench_clone.py
+"""
+import copy
+import timeit
+
+from pyuvm import uvm_sequence_item, uvm_field
+
+N = 20_000
+FIELDS = ("addr", "len", "size", "burst", "id", "resp")
+
+
+class PlainItem(uvm_sequence_item):
+    __slots__ = FIELDS + ("beats",)
+
+    def __init__(self, name="item"):
+        super().__init__(name)
+        self.addr, self.len, self.size = 0x1000, 15, 2
+        self.burst, self.id, self.resp = 1, 3, 0
+        self.beats = list(range(16))
+
+
+class HandItem(PlainItem):
+    __slots__ = ()
+
+    def do_copy(self, rhs):
+        super().do_copy(rhs)
+        self.addr, self.len, self.size = rhs.addr, rhs.len, rhs.size
+        self.burst, self.id, self.resp = rhs.burst, rhs.id, rhs.resp
+        self.beats = list(rhs.beats)
+
+    def do_compare(self, rhs):
+        return (self.addr == rhs.addr and self.len == rhs.len
+                and self.size == rhs.size and self.burst == rhs.burst
+                and self.id == rhs.id and self.resp == rhs.resp
+                and self.beats == rhs.beats)
+
+
+class FieldItem(PlainItem):
+    __slots__ = ()
+    uvm_fields = tuple(uvm_field(name) for name in FIELDS) \
+        + (uvm_field("beats", mutable=True),)
+
+
+def rate(stmt):
+    return N / min(timeit.repeat(stmt, number=N, repeat=5))
+
+
+def main():
+    plain, hand, fields = PlainItem(), HandItem(), FieldItem()
+    baseline = rate(lambda: copy.deepcopy(plain))
+    rows = (
+        ("copy.deepcopy()", baseline),
+        ("hand-written clone()", rate(hand.clone)),
+        ("uvm_fields clone()", rate(fields.clone)),
+    )
+    for name, value in rows:
+        print(f"{name:28}{value:12,.0f}  {value / baseline:5.1f}x")
+    hand_copy, fields_copy = hand.clone(), fields.clone()
+    for name, value in (
+            ("hand-written compare()",
+             rate(lambda: hand.compare(hand_copy))),
+            ("uvm_fields compare()",
+             rate(lambda: fields.compare(fields_copy)))):
+        print(f"{name:28}{value:12,.0f}")
+    print("(per second)")
+
+
+if __name__ == "__main__":
+    main()
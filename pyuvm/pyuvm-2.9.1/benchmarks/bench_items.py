@@ -0,0 +1,122 @@
+"""
+Memory and construction time of one sequence item.
+
+LegacySequenceItem below is a copy of uvm_sequence_item as it was
+before uvm_object, uvm_transaction and uvm_sequence_item declared
+__slots__: every instance had a __dict__ and created its three
+Events in __init__. The items compared are:
+
+* legacy: a LegacySequenceItem subclass with two fields
+* current, __dict__: the same subclass of uvm_sequence_item, which
+  keeps a __dict__ because it does not declare __slots__
+* current, __slots__: a subclass that declares its two fields in
+  __slots__
+* current, __slots__, handshake: as above after its Events have
+  been created, as start_item() and finish_item() do
+* create(), handshake: the handshake item made through the factory
+* pooled create(), handshake, release(): the same with enable_pool(),
+  so every create() after the first reuses the released item and
+  its Events
+
+Bytes per item come from tracemalloc while N items are alive,
+including the 8 bytes of the list that holds them. A pooled item
+is released before the next one is created, so N of them take no
+more memory than one. The time is the best of ten runs. Run with
+pyuvm installed:
+
+    python benchmarks/bench_items.py
+"""
+import gc
+import itertools
+import timeit
+import tracemalloc
+
+from cocotb.triggers import Event
+
+from pyuvm import uvm_sequence_item
+
+N = 100_000
+
+
+class LegacySequenceItem:
+    _transaction_ids = itertools.count(1)
+
+    def __init__(self, name):
+        assert (isinstance(name, str))
+        self._obj_name = name
+        self._initiator = None
+        self.transaction_id = next(LegacySequenceItem._transaction_ids)
+        self.start_condition = Event()
+        self.finish_condition = Event()
+        self.item_ready = Event()
+        self.parent_sequence_id = None
+        self.response_id = None
+
+
+class LegacyItem(LegacySequenceItem):
+    def __init__(self, name="item"):
+        super().__init__(name)
+        self.addr = 0
+        self.data = 0
+
+
+class DictItem(uvm_sequence_item):
+    def __init__(self, name="item"):
+        super().__init__(name)
+        self.addr = 0
+        self.data = 0
+
+
+class SlotItem(uvm_sequence_item):
+    __slots__ = ("addr", "data")
+
+    def __init__(self, name="item"):
+        super().__init__(name)
+        self.addr = 0
+        self.data = 0
+
+
+class PooledItem(SlotItem):
+    __slots__ = ()
+
+
+def handshake(item):
+    item.start_condition, item.item_ready, item.finish_condition
+    return item
+
+
+def pooled_item():
+    handshake(PooledItem.create("item")).release()
+
+
+def measure(make):
+    tracemalloc.start()
+    items = [make() for _ in range(N)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    gc.collect()
+    best = min(timeit.repeat(make, number=N // 10, repeat=10))
+    return size / N, best / (N // 10) * 1e9
+
+
+def main():
+    print(f"{'':40}{'bytes/item':>12}{'ns/item':>12}")
+    results = [
+        ("legacy", measure(LegacyItem)),
+        ("current, __dict__", measure(DictItem)),
+        ("current, __slots__", measure(SlotItem)),
+        ("current, __slots__, handshake",
+         measure(lambda: handshake(SlotItem()))),
+        ("create(), handshake",
+         measure(lambda: handshake(SlotItem.create("item")))),
+    ]
+    PooledItem.enable_pool()
+    results.append(("pooled create(), handshake, release()",
+                    measure(pooled_item)))
+    for name, (size, ns) in results:
+        print(f"{name:40}{size:12,.0f}{ns:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
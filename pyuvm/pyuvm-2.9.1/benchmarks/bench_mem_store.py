@@ -0,0 +1,109 @@
+"""
+Memory and time of a slave model's memory across a 4 GB address
+space, as a dict keyed by byte address and as a uvm_mem_store.
+
+Bursts of 64 bytes are written and then read back in two
+patterns:
+
+* DMA: 64 buffers of 64 KB at random places in the 4 GB space,
+  each written from start to end
+* scattered: the same number of bursts at random 64-byte aligned
+  addresses, so most land in a page of their own
+
+The memories are:
+
+* dict: one entry per byte, as a model that does
+  ``mem[addr + ii] = byte`` does
+* uvm_mem_store: 4 KB pages allocated as they are written
+* uvm_mem_store, 256 B pages: smaller pages, which waste less
+  memory on scattered bursts
+* uvm_mem_store, temp_file: the whole space in a sparse
+  memory-mapped temporary file. Its pages are outside the Python
+  heap, so its resident bytes come from get_stats().
+
+Bytes per stored byte come from tracemalloc, and the time, of
+the writes and reads together, from a second run without it.
+Run with pyuvm installed:
+
+    python benchmarks/bench_mem_store.py
+"""
+import random
+import time
+import tracemalloc
+
+from pyuvm import uvm_mem_store
+
+BUFFERS = 64
+BUFFER_SIZE = 1 << 16
+BURST = 64
+N = BUFFERS * BUFFER_SIZE // BURST
+
+
+def dma_addresses(rng):
+    addrs = []
+    for _ in range(BUFFERS):
+        base = rng.randrange((1 << 32) // BUFFER_SIZE) * BUFFER_SIZE
+        addrs.extend(range(base, base + BUFFER_SIZE, BURST))
+    return addrs
+
+
+def scattered_addresses(rng):
+    return [rng.randrange((1 << 32) // BURST) * BURST for _ in range(N)]
+
+
+def dict_model(addrs, data):
+    mem = {}
+    for addr in addrs:
+        for ii, byte in enumerate(data):
+            mem[addr + ii] = byte
+    for addr in addrs:
+        bytes(mem.get(addr + ii, 0) for ii in range(BURST))
+    return mem
+
+
+def store_model(addrs, data, **kwargs):
+    mem = uvm_mem_store(1 << 32, **kwargs)
+    for addr in addrs:
+        mem.write(addr, data)
+    for addr in addrs:
+        mem.read(addr, BURST)
+    return mem
+
+
+def measure(addrs, model, kwargs):
+    data = bytes(range(BURST))
+    stored = len(set(addrs)) * BURST
+    tracemalloc.start()
+    mem = model(addrs, data, **kwargs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if isinstance(mem, uvm_mem_store):
+        size = max(size, mem.get_stats().resident_bytes)
+        mem.close()
+    del mem
+    start = time.perf_counter()
+    mem = model(addrs, data, **kwargs)
+    elapsed = time.perf_counter() - start
+    if isinstance(mem, uvm_mem_store):
+        mem.close()
+    return size / stored, elapsed
+
+
+def main():
+    rng = random.Random(1)
+    for pattern, addrs in (("DMA", dma_addresses(rng)),
+                           ("scattered", scattered_addresses(rng))):
+        print(f"{pattern:32}{'bytes/byte':>12}{'ms':>10}")
+        for name, model, kwargs in (
+                ("dict", dict_model, {}),
+                ("uvm_mem_store", store_model, {}),
+                ("uvm_mem_store, 256 B pages", store_model,
+                 {"page_size": 256}),
+                ("uvm_mem_store, temp_file", store_model,
+                 {"temp_file": True})):
+            per_byte, elapsed = measure(addrs, model, kwargs)
+            print(f"  {name:30}{per_byte:12.1f}{elapsed * 1e3:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
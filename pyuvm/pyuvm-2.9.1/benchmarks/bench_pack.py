@@ -0,0 +1,122 @@
+"""
+Items per second packed to and unpacked from bytes.
+
+Two layouts:
+
+* bus: addr, data and strb of 32, 32 and 8 bits, which compiles to
+  a struct.Struct
+* bitfield: op, a, b and y of 2, 8, 8 and 9 bits, which compiles to
+  shift and mask code
+
+For each layout the methods are:
+
+* hand-written: the shifting and to_bytes()/from_bytes() code a
+  test writes for its own transaction
+* pickle: pickle.dumps() and pickle.loads(), as used for IPC
+* pack()/unpack(): uvm_fields, with pack() making a new bytearray
+* pack_bytes()/unpack_bytes(): uvm_fields, into and out of one
+  preallocated buffer
+* pack_items()/unpack_items(): uvm_fields, the whole list into and
+  out of the same buffer in one call each
+
+Run with pyuvm installed:
+
+    python benchmarks/bench_pack.py
+"""
+import pickle
+import time
+
+from pyuvm import uvm_sequence_item, uvm_field
+
+N = 200_000
+
+
+class BusItem(uvm_sequence_item):
+    __slots__ = ("addr", "data", "strb")
+    uvm_fields = (uvm_field("addr", 32), uvm_field("data", 32),
+                  uvm_field("strb", 8))
+
+    def __init__(self, name="bus"):
+        super().__init__(name)
+        self.addr, self.data, self.strb = 0x1000, 0xDEADBEEF, 0xF
+
+
+class AluItem(uvm_sequence_item):
+    __slots__ = ("op", "a", "b", "y")
+    uvm_fields = (uvm_field("op", 2), uvm_field("a", 8), uvm_field("b", 8),
+                  uvm_field("y", 9))
+
+    def __init__(self, name="alu"):
+        super().__init__(name)
+        self.op, self.a, self.b, self.y = 1, 200, 100, 100
+
+
+def bus_by_hand(item, buffer, offset):
+    buffer[offset:offset + 4] = item.addr.to_bytes(4, "big")
+    buffer[offset + 4:offset + 8] = item.data.to_bytes(4, "big")
+    buffer[offset + 8] = item.strb
+    item.addr = int.from_bytes(buffer[offset:offset + 4], "big")
+    item.data = int.from_bytes(buffer[offset + 4:offset + 8], "big")
+    item.strb = buffer[offset + 8]
+
+
+def alu_by_hand(item, buffer, offset):
+    value = ((item.op & 3) << 25 | (item.a & 0xFF) << 17
+             | (item.b & 0xFF) << 9 | (item.y & 0x1FF)) << 5
+    buffer[offset:offset + 4] = value.to_bytes(4, "big")
+    value = int.from_bytes(buffer[offset:offset + 4], "big") >> 5
+    item.op, item.a = value >> 25, (value >> 17) & 0xFF
+    item.b, item.y = (value >> 9) & 0xFF, value & 0x1FF
+
+
+def bench(item_type, by_hand):
+    items = [item_type() for _ in range(N)]
+    size = item_type.get_packed_size()
+    buffer = bytearray(size * N)
+    view = memoryview(buffer)
+    rates = {}
+
+    start = time.perf_counter()
+    offset = 0
+    for item in items:
+        by_hand(item, buffer, offset)
+        offset += size
+    rates["hand-written"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in items:
+        pickle.loads(pickle.dumps(item))
+    rates["pickle"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in items:
+        item.unpack(item.pack())
+    rates["pack()/unpack()"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    offset = 0
+    for item in items:
+        item.pack_bytes(view, offset)
+        offset = item.unpack_bytes(view, offset)
+    rates["pack_bytes()/unpack_bytes()"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    item_type.pack_items(items, view)
+    item_type.unpack_items(items, view)
+    rates["pack_items()/unpack_items()"] = time.perf_counter() - start
+    return {name: N / elapsed for name, elapsed in rates.items()}
+
+
+def main():
+    for label, item_type, by_hand in (("bus", BusItem, bus_by_hand),
+                                      ("bitfield", AluItem, alu_by_hand)):
+        rates = bench(item_type, by_hand)
+        baseline = rates["hand-written"]
+        print(f"{label}, {item_type.get_packed_size()} bytes")
+        for name, rate in rates.items():
+            print(f"  {name:30}{rate:12,.0f}  {rate / baseline:5.2f}x")
+    print("(items/s packed and unpacked)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+UVMQueue against the cocotb-queue-based UVMQueue it replaced.
+
+LegacyUVMQueue and LegacyResponseQueue below are copies of the old
+classes. The scenarios are:
+
+* nowait: put_nowait() then get_nowait(), with nothing waiting
+* handoff: a producer and a consumer through a queue of size 1, so
+  every item blocks one side or the other
+* peek handoff: as handoff, but the consumer peeks before each get
+  the way a driver looks at an item before taking it
+* response put: ResponseQueue.put_nowait() and get_nowait()
+* response by ID: 1,000 responses outstanding, each fetched by
+  transaction ID in the reverse of the order they arrived
+
+There is no simulator, so a small loop below stands in for the cocotb
+scheduler. It primes each trigger a coroutine yields and resumes the
+coroutine when the trigger fires. Run with pyuvm installed:
+
+    python benchmarks/bench_queue.py
+"""
+import collections
+import time
+
+import cocotb
+import cocotb.queue
+from cocotb.queue import QueueEmpty
+from cocotb.triggers import Event
+
+from pyuvm.utility_classes import UVMQueue
+from pyuvm.s14_15_python_sequences import ResponseQueue
+
+N = 200_000
+
+
+class LegacyUVMQueue(cocotb.queue.Queue):
+    def _peek(self):
+        return self._queue[0]
+
+    async def peek(self):
+        while self.empty():
+            event = Event('{} peek'.format(type(self).__name__))
+            self._getters.append((event, cocotb.scheduler._current_task))
+            await event.wait()
+        return self.peek_nowait()
+
+    def peek_nowait(self):
+        if self.empty():
+            raise QueueEmpty()
+        return self._peek()
+
+
+class LegacyResponseQueue(LegacyUVMQueue):
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize=maxsize)
+        self.put_event = Event("put event")
+
+    def put_nowait(self, item):
+        super().put_nowait(item)
+        self.put_event.set()
+        self.put_event.clear()
+
+    async def get_response(self, txn_id=None):
+        if txn_id is None:
+            return await self.get()
+        else:
+            while True:
+                item_list = list(self._queue)
+                txn_list = [xx
+                            for xx in item_list
+                            if xx.transaction_id == txn_id]
+                if len(txn_list) == 0:
+                    await self.put_event.wait()
+                else:
+                    _ = self._queue.index(txn_list[0])
+                    self._queue.remove(txn_list[0])
+                    return txn_list[0]
+
+
+class Response:
+    __slots__ = ("transaction_id",)
+
+    def __init__(self, transaction_id):
+        self.transaction_id = transaction_id
+
+
+class Task:
+    def __init__(self, coro):
+        self.coro = coro
+        self.finished = False
+
+    def done(self):
+        return self.finished
+
+
+class Scheduler:
+    """Just enough of the cocotb scheduler to run the queues"""
+
+    def __init__(self):
+        self.ready = collections.deque()
+        self._current_task = None
+
+    def spawn(self, coro):
+        self.ready.append(Task(coro))
+
+    def run(self):
+        ready = self.ready
+        while ready:
+            task = ready.popleft()
+            self._current_task = task
+            try:
+                trigger = task.coro.send(None)
+            except StopIteration:
+                task.finished = True
+                continue
+            trigger.prime(lambda _, task=task: ready.append(task))
+
+
+def nowait(queue_cls, make_item=int):
+    queue = queue_cls()
+    items = [make_item(ii) for ii in range(N)]
+    start = time.perf_counter()
+    for item in items:
+        queue.put_nowait(item)
+        queue.get_nowait()
+    return N / (time.perf_counter() - start)
+
+
+def by_id(queue_cls, outstanding=1_000, rounds=20):
+    queue = queue_cls()
+    items = [Response(ii) for ii in range(outstanding)]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in items:
+            queue.put_nowait(item)
+        for item in reversed(items):
+            coro = queue.get_response(item.transaction_id)
+            try:
+                coro.send(None)
+            except StopIteration:
+                pass
+            else:
+                raise RuntimeError("response was not in the queue")
+    return outstanding * rounds / (time.perf_counter() - start)
+
+
+def handoff(queue_cls, peek):
+    queue = queue_cls(maxsize=1)
+
+    async def producer():
+        for ii in range(N):
+            await queue.put(ii)
+
+    async def consumer():
+        for ii in range(N):
+            if peek:
+                await queue.peek()
+            assert await queue.get() == ii
+
+    sched = Scheduler()
+    cocotb.scheduler = sched
+    sched.spawn(consumer())
+    sched.spawn(producer())
+    start = time.perf_counter()
+    sched.run()
+    return N / (time.perf_counter() - start)
+
+
+def main():
+    scenarios = [
+        ("nowait", lambda cls: nowait(cls)),
+        ("handoff", lambda cls: handoff(cls, False)),
+        ("peek handoff", lambda cls: handoff(cls, True)),
+    ]
+    print(f"{'':16}{'legacy':>14}{'current':>14}")
+    for name, bench in scenarios:
+        old, new = bench(LegacyUVMQueue), bench(UVMQueue)
+        print(f"{name:16}{old:14,.0f}{new:14,.0f}  {new / old:5.2f}x")
+    scenarios = [
+        ("response put", lambda cls: nowait(cls, Response)),
+        ("response by ID", by_id),
+    ]
+    for name, bench in scenarios:
+        old, new = bench(LegacyResponseQueue), bench(ResponseQueue)
+        print(f"{name:16}{old:14,.0f}{new:14,.0f}  {new / old:5.2f}x")
+    print("(items/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Random ALU items per second, drawn the way ml_TB/ml_agent.py does it
+and with uvm_randomizer.
+
+The item has op, a and b. op is weighted 4:3:2:1, and a subtraction
+(op 1) needs a >= b, so about one candidate in eight is rejected.
+
+* random module: random.choices() and random.randint() for each
+  field of each item, drawing again until the constraint holds
+* uvm_randomizer.items(): the same items, made with create() from
+  batches drawn by NumPy
+* uvm_randomizer.randomize_batch(): the field values only, as arrays
+
+Run with pyuvm and numpy installed:
+
+    python benchmarks/bench_randomization.py
+"""
+import random
+import time
+
+from pyuvm import (uvm_sequence_item, uvm_randomizer, uvm_rand_dist,
+                   uvm_rand_range)
+
+N = 200_000
+
+
+class AluItem(uvm_sequence_item):
+    __slots__ = ("op", "a", "b")
+    rand_fields = {
+        "op": uvm_rand_dist({0: 4, 1: 3, 2: 2, 3: 1}),
+        "a": uvm_rand_range(0, 255),
+        "b": uvm_rand_range(0, 255),
+    }
+    constraints = (lambda c: (c["op"] != 1) | (c["a"] >= c["b"]),)
+
+
+def python_items():
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(N):
+        item = AluItem.create("item")
+        while True:
+            item.op = rng.choices((0, 1, 2, 3), (4, 3, 2, 1))[0]
+            item.a = rng.randint(0, 255)
+            item.b = rng.randint(0, 255)
+            if item.op != 1 or item.a >= item.b:
+                break
+    return N / (time.perf_counter() - start)
+
+
+def randomizer_items():
+    start = time.perf_counter()
+    for _ in uvm_randomizer(AluItem, seed=1).items(N):
+        pass
+    return N / (time.perf_counter() - start)
+
+
+def randomizer_batch():
+    randomizer = uvm_randomizer(AluItem, seed=1)
+    start = time.perf_counter()
+    for _ in range(N // randomizer.batch_size):
+        randomizer.randomize_batch(randomizer.batch_size)
+    done = N // randomizer.batch_size * randomizer.batch_size
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    baseline = python_items()
+    print(f"{'random module':32}{baseline:14,.0f}")
+    for name, bench in (("uvm_randomizer.items()", randomizer_items),
+                        ("uvm_randomizer.randomize_batch()",
+                         randomizer_batch)):
+        rate = bench()
+        print(f"{name:32}{rate:14,.0f}  {rate / baseline:6.1f}x")
+    print("(items/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cost of recording transactions, and time to find the transactions
+in a time window.
+
+Write path, per transaction:
+
+* no recording: begin_tr() and end_tr() with recording disabled
+* enable_recording(): the same with the item recording into a
+  uvm_tr_stream, packed with its uvm_fields
+* stream.record(): a monitor recording the item directly
+* pickled: enable_recording() for an item without uvm_fields
+
+Read path: the transactions in a window of 1% of the run, found
+with uvm_tr_stream_reader.transactions() and by checking every
+record.
+
+There is no simulator, so times are passed explicitly. Run with
+pyuvm installed:
+
+    python benchmarks/bench_recording.py
+"""
+import shutil
+import tempfile
+import time
+
+from pyuvm import (uvm_sequence_item, uvm_field, uvm_tr_database,
+                   uvm_tr_stream_reader)
+
+N = 200_000
+
+
+class BusItem(uvm_sequence_item):
+    __slots__ = ("addr", "data", "strb")
+    uvm_fields = (uvm_field("addr", 32), uvm_field("data", 32),
+                  uvm_field("strb", 8))
+
+    def __init__(self, name="bus"):
+        super().__init__(name)
+        self.addr, self.data, self.strb = 0x1000, 0xDEADBEEF, 0xF
+
+
+class PickledItem(uvm_sequence_item):
+    __slots__ = ("addr", "data", "strb")
+
+    def __init__(self, name="bus"):
+        super().__init__(name)
+        self.addr, self.data, self.strb = 0x1000, 0xDEADBEEF, 0xF
+
+
+def write(items, stream=None):
+    for item in items:
+        if stream is not None:
+            item.enable_recording(stream)
+    start = time.perf_counter()
+    for step, item in enumerate(items, 1):
+        item.begin_tr(10 * step)
+        item.end_tr(10 * step + 5)
+    return (time.perf_counter() - start) / N * 1e9
+
+
+def record(items, stream):
+    start = time.perf_counter()
+    for step, item in enumerate(items, 1):
+        stream.record(item, 10 * step, 10 * step + 5)
+    return (time.perf_counter() - start) / N * 1e9
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        db = uvm_tr_database(directory=directory)
+        items = [BusItem() for _ in range(N)]
+        rows = [
+            ("no recording", write(items)),
+            ("enable_recording()", write(items, db.open_stream("bus"))),
+            ("stream.record()", record(items, db.open_stream("direct"))),
+            ("pickled", write([PickledItem() for _ in range(N)],
+                              db.open_stream("pickled"))),
+        ]
+        db.close_db()
+        print(f"{'write path':24}{'ns/txn':>10}")
+        for name, ns in rows:
+            print(f"{name:24}{ns:10,.0f}")
+
+        low, high = 10 * N // 2, 10 * N // 2 + 10 * N // 100
+        with uvm_tr_stream_reader(db.get_path("bus")) as reader:
+            start = time.perf_counter()
+            found = sum(1 for _ in reader.transactions(low, high))
+            indexed = time.perf_counter() - start
+            start = time.perf_counter()
+            scanned = sum(1 for rec in reader
+                          if rec.begin_time <= high and rec.end_time >= low)
+            scan = time.perf_counter() - start
+        print(f"\n{found:,} of {N:,} transactions in the window")
+        print(f"{'transactions()':24}{indexed * 1e3:10.2f} ms")
+        print(f"{'every record':24}{scan * 1e3:10.2f} ms"
+              f"  {scan / indexed:5.0f}x slower")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Bus items and bus cycles to configure a block of N contiguous
+32-bit registers through the frontdoor.
+
+* reg.write() per register: one item per register, as a test
+  that loops over the block does
+* block.update(), single beats: update() with an adapter that
+  does not support bursts, which is still one item per register
+* block.update(), bursts: the same with an adapter that supports
+  bursts of up to 256 beats within 4 KB, like AXI4 INCR
+
+Bus cycles are counted the way an AXI4 write costs them: two for
+the address and response of each item plus one per beat. The
+time is the wall clock time to run the accesses through the
+sequencer to a driver.
+
+There is no simulator, so the Scheduler from bench_queue.py stands
+in for the cocotb scheduler. Run with pyuvm installed:
+
+    python benchmarks/bench_reg_frontdoor.py
+"""
+import time
+
+import cocotb
+from bench_queue import Scheduler
+
+from pyuvm import (uvm_access_e, uvm_reg, uvm_reg_adapter, uvm_reg_block,
+                   uvm_reg_field, uvm_sequence_item, uvm_sequencer,
+                   uvm_status_e)
+
+N = 4_096
+ITEM_CYCLES = 2
+
+
+class BusItem(uvm_sequence_item):
+    __slots__ = ("addr", "data")
+
+
+class BusAdapter(uvm_reg_adapter):
+    def __init__(self, bursts):
+        super().__init__("adapter")
+        self.supports_bursts = bursts
+
+    def reg2bus(self, rw):
+        item = BusItem("item")
+        item.addr = rw.addr
+        item.data = rw.data if rw.kind == uvm_access_e.UVM_BURST_WRITE \
+            else [rw.data]
+        return item
+
+    def bus2reg(self, bus_item, rw):
+        rw.status = uvm_status_e.UVM_IS_OK
+
+
+def build(bursts, name):
+    sched = Scheduler()
+    cocotb.scheduler = sched
+    seqr = uvm_sequencer(name, None)
+    block = uvm_reg_block("block")
+    reg_map = block.create_map("map", 0x4000_0000)
+    for ii in range(N):
+        reg = uvm_reg(f"reg{ii}", 32)
+        reg.configure(block)
+        field = uvm_reg_field("value")
+        field.configure(reg, 32, 0, "RW", False, 0)
+        reg_map.add_reg(reg, 4 * ii)
+    reg_map.set_sequencer(seqr, BusAdapter(bursts))
+    counts = [0, 0]
+
+    async def driver():
+        export = seqr.seq_item_export
+        while True:
+            item = await export.get_next_item()
+            counts[0] += 1
+            counts[1] += len(item.data)
+            export.item_done()
+
+    sched.spawn(driver())
+    return sched, block, counts
+
+
+def bench(name, bursts, configure):
+    sched, block, counts = build(bursts, name.replace(" ", "_"))
+    for ii, reg in enumerate(block.get_registers()):
+        reg.set(ii + 1)
+    sched.spawn(configure(block))
+    start = time.perf_counter()
+    sched.run()
+    elapsed = time.perf_counter() - start
+    assert not block.needs_update()
+    items, beats = counts
+    return items, items * ITEM_CYCLES + beats, elapsed
+
+
+async def write_each(block):
+    for reg in block.get_registers():
+        await reg.write(reg.get())
+
+
+async def update(block):
+    await block.update()
+
+
+def main():
+    print(f"{'':32}{'items':>8}{'cycles':>10}{'ms':>10}")
+    baseline = None
+    for name, bursts, configure in (
+            ("reg.write() per register", False, write_each),
+            ("block.update(), single beats", False, update),
+            ("block.update(), bursts", True, update)):
+        items, cycles, elapsed = bench(name, bursts, configure)
+        baseline = baseline or cycles
+        print(f"{name:32}{items:8,}{cycles:10,}{elapsed * 1e3:10.1f}"
+              f"  {cycles / baseline:6.1%} of the cycles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Time to build a register model of 50,000 registers with eight
+fields each.
+
+* configure(): a Python build script creating every uvm_reg and
+  uvm_reg_field and calling configure() and add_reg()
+* uvm_reg_loader, first load: reading the CSV table, checking it
+  and writing the cache
+* uvm_reg_loader, cached: a later load of the same table
+
+Run with pyuvm installed:
+
+    python benchmarks/bench_reg_loader.py
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from pyuvm import uvm_reg, uvm_reg_block, uvm_reg_field, uvm_reg_loader
+
+REGS = 50_000
+ACCESS = ("RW", "RO", "W1C", "RC") * 2
+
+
+def by_hand():
+    block = uvm_reg_block("soc")
+    apb = block.create_map("apb", 0)
+    for ii in range(REGS):
+        reg = uvm_reg(f"r{ii}", 32)
+        for jj, access in enumerate(ACCESS):
+            uvm_reg_field(f"f{jj}").configure(reg, 4, 4 * jj, access,
+                                              False, jj)
+        reg.configure(block)
+        apb.add_reg(reg, 4 * ii)
+    apb.decode_offset(0)
+    return block
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "soc.csv")
+        with open(path, "w") as file:
+            file.write("map,reg,offset,n_bits,field,lsb,size,access,"
+                       "reset\n")
+            for ii in range(REGS):
+                for jj, access in enumerate(ACCESS):
+                    file.write(f"apb,r{ii},{4 * ii:#x},32,f{jj},{4 * jj},"
+                               f"4,{access},{jj}\n")
+        cache = os.path.join(directory, "cache")
+        rows = []
+        start = time.perf_counter()
+        by_hand()
+        rows.append(("configure()", time.perf_counter() - start))
+        for label in ("uvm_reg_loader, first load",
+                      "uvm_reg_loader, cached"):
+            start = time.perf_counter()
+            uvm_reg_loader(path, cache_dir=cache).load()
+            rows.append((label, time.perf_counter() - start))
+        baseline = rows[0][1]
+        for name, seconds in rows:
+            print(f"{name:30}{seconds:8.2f} s  {baseline / seconds:5.1f}x")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
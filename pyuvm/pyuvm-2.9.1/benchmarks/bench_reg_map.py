@@ -0,0 +1,80 @@
+"""
+Bus addresses decoded per second by a uvm_reg_map with 10,000
+registers, 16 memories of 1,024 words and a submap.
+
+* dict lookup: a dict from every register's offset to the register,
+  as uvm_reg_map used to keep. It finds only addresses that are the
+  first byte of a register and cannot place memory words.
+* linear scan: checking each mapped range in turn, for 1,000
+  addresses only
+* decode(): the map's sorted ranges and bisect
+
+Run with pyuvm installed:
+
+    python benchmarks/bench_reg_map.py
+"""
+import random
+import time
+
+from pyuvm import uvm_mem, uvm_reg, uvm_reg_block, uvm_reg_map
+
+REGS = 10_000
+N = 200_000
+
+
+def build():
+    block = uvm_reg_block("block")
+    bus = block.create_map("bus", 0x4000_0000)
+    for ii in range(REGS):
+        reg = uvm_reg(f"r{ii}", 64 if ii % 10 == 0 else 32)
+        reg.configure(block)
+        bus.add_reg(reg, 8 * ii)
+    for ii in range(16):
+        mem = uvm_mem(f"m{ii}", 1024, 32)
+        mem.configure(block)
+        bus.add_mem(mem, 0x10_0000 + 0x1000 * ii)
+    sub = uvm_reg_map("sub")
+    sub.configure(block, 0)
+    for ii in range(64):
+        reg = uvm_reg(f"s{ii}", 32)
+        reg.configure(block)
+        sub.add_reg(reg, 4 * ii)
+    bus.add_submap(sub, 0x20_0000)
+    return bus
+
+
+def main():
+    bus = build()
+    rng = random.Random(1)
+    addresses = [0x4000_0000 + rng.choice(
+        (rng.randrange(0, 8 * REGS), rng.randrange(0x10_0000, 0x11_0000),
+         rng.randrange(0x20_0000, 0x20_0100))) for _ in range(N)]
+    by_offset = {reg.get_offset(): reg for reg in bus.get_registers()}
+    bus.decode(0)
+
+    start = time.perf_counter()
+    for address in addresses:
+        by_offset.get(address - 0x4000_0000)
+    rate = N / (time.perf_counter() - start)
+    print(f"{'dict lookup':16}{rate:14,.0f}")
+
+    ranges = bus._ranges
+    start = time.perf_counter()
+    for address in addresses[:1_000]:
+        offset = address - 0x4000_0000
+        for low, high, element, stride in ranges:
+            if low <= offset < high:
+                break
+    rate = 1_000 / (time.perf_counter() - start)
+    print(f"{'linear scan':16}{rate:14,.0f}")
+
+    start = time.perf_counter()
+    for address in addresses:
+        bus.decode(address)
+    rate = N / (time.perf_counter() - start)
+    print(f"{'decode()':16}{rate:14,.0f}")
+    print("(addresses/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Register predictions per second, and the time to find the
+registers that need an update in a block of 10,000.
+
+Each register has eight 4-bit fields, two each of RW, RO, W1C and
+RC.
+
+* per-field objects: the mirror a test builds by hand, with the
+  mirrored and desired value in each field object, and predict()
+  applying each field's access policy in turn
+* uvm_reg: the values in the block's lists and the policies
+  compiled into masks when the fields were added
+
+Run with pyuvm installed:
+
+    python benchmarks/bench_reg_values.py
+"""
+import random
+import time
+
+from pyuvm import uvm_predict_e, uvm_reg, uvm_reg_block, uvm_reg_field
+
+REGS = 10_000
+N = 200_000
+ACCESS = ("RW", "RO", "W1C", "RC") * 2
+
+
+class FieldObject:
+    def __init__(self, lsb, access):
+        self.lsb, self.access = lsb, access
+        self.mirrored = self.desired = 0
+
+    def predict_write(self, value):
+        bits = value >> self.lsb & 0xF
+        if self.access == "RW":
+            self.mirrored = bits
+        elif self.access == "W1C":
+            self.mirrored &= ~bits
+        self.desired = self.mirrored
+
+
+class RegObject:
+    def __init__(self):
+        self.fields = [FieldObject(4 * ii, access)
+                       for ii, access in enumerate(ACCESS)]
+
+    def predict_write(self, value):
+        for field in self.fields:
+            field.predict_write(value)
+
+    def needs_update(self):
+        return any(field.desired != field.mirrored
+                   and field.access != "RO" for field in self.fields)
+
+
+def build():
+    block = uvm_reg_block("block")
+    for ii in range(REGS):
+        reg = uvm_reg(f"r{ii}", 32)
+        for jj, access in enumerate(ACCESS):
+            uvm_reg_field(f"f{jj}").configure(reg, 4, 4 * jj, access,
+                                              False, 0)
+        reg.configure(block)
+    return block
+
+
+def main():
+    rng = random.Random(1)
+    values = [rng.getrandbits(32) for _ in range(N)]
+    picks = [rng.randrange(REGS) for _ in range(N)]
+    objects = [RegObject() for _ in range(REGS)]
+    block = build()
+    regs = block.get_registers()
+
+    start = time.perf_counter()
+    for pick, value in zip(picks, values):
+        objects[pick].predict_write(value)
+    hand = N / (time.perf_counter() - start)
+
+    write = uvm_predict_e.UVM_PREDICT_WRITE
+    start = time.perf_counter()
+    for pick, value in zip(picks, values):
+        regs[pick].predict(value, kind=write)
+    masks = N / (time.perf_counter() - start)
+    print(f"{'predict()':24}{'per-field objects':>20}{'uvm_reg':>12}")
+    print(f"{'predictions/s':24}{hand:20,.0f}{masks:12,.0f}"
+          f"  {masks / hand:4.1f}x")
+
+    for reg in regs[::100]:
+        reg.set(0xFFFFFFFF)
+    for obj in objects[::100]:
+        obj.fields[0].desired ^= 1
+    start = time.perf_counter()
+    hand_found = [obj for obj in objects if obj.needs_update()]
+    hand = time.perf_counter() - start
+    start = time.perf_counter()
+    found = block.get_regs_to_update()
+    masks = time.perf_counter() - start
+    print(f"{'find regs to update, ms':24}{hand * 1e3:20.2f}"
+          f"{masks * 1e3:12.2f}  {hand / masks:4.1f}x")
+    assert len(found) == len(hand_found) == REGS // 100
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Items per second through a sequencer with the classic handshake
+and with send_items() / get_next_items().
+
+* classic: start_item() and finish_item() in the sequence,
+  get_next_item() and item_done() in the driver
+* stream: the sequence calls send_items() with a list, or with an
+  async generator, and the driver takes batches of 1, 16 or 64 with
+  get_next_items() and items_done()
+
+There is no simulator, so the Scheduler from bench_queue.py stands
+in for the cocotb scheduler. Run with pyuvm installed:
+
+    python benchmarks/bench_streaming.py
+"""
+import time
+
+import cocotb
+from bench_queue import Scheduler
+
+from pyuvm import uvm_sequence, uvm_sequence_item, uvm_sequencer
+
+N = 50_000
+
+
+class Item(uvm_sequence_item):
+    def __init__(self, name="item"):
+        super().__init__(name)
+
+
+class ClassicSeq(uvm_sequence):
+    async def body(self):
+        for _ in range(N):
+            item = Item()
+            await self.start_item(item)
+            await self.finish_item(item)
+
+
+class ListSeq(uvm_sequence):
+    async def body(self):
+        await self.send_items(Item() for _ in range(N))
+
+
+class GeneratorSeq(uvm_sequence):
+    async def body(self):
+        async def items():
+            for _ in range(N):
+                yield Item()
+        await self.send_items(items())
+
+
+def bench(seq_cls, batch):
+    sched = Scheduler()
+    cocotb.scheduler = sched
+    seqr = uvm_sequencer(f"seqr_{seq_cls.__name__}_{batch}", None)
+    export = seqr.seq_item_export
+
+    async def classic_driver():
+        for _ in range(N):
+            await export.get_next_item()
+            export.item_done()
+
+    async def batch_driver():
+        done = 0
+        while done < N:
+            items = await export.get_next_items(batch)
+            done += len(items)
+            export.items_done()
+
+    sched.spawn(seq_cls("seq").start(seqr))
+    sched.spawn(classic_driver() if batch is None else batch_driver())
+    start = time.perf_counter()
+    sched.run()
+    return N / (time.perf_counter() - start)
+
+
+def main():
+    classic = bench(ClassicSeq, None)
+    print(f"{'classic handshake':36}{classic:12,.0f}")
+    for seq_cls, label in ((ListSeq, "stream, list"),
+                           (GeneratorSeq, "stream, async generator")):
+        for batch in (1, 16, 64):
+            rate = bench(seq_cls, batch)
+            print(f"{label + f', batch {batch}':36}{rate:12,.0f}"
+                  f"  {rate / classic:5.1f}x")
+    print("(items/s)")
+
+
+if __name__ == "__main__":
+    main()
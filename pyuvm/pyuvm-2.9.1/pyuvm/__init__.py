@@ -6,6 +6,8 @@ from pyuvm.utility_classes import *
 from pyuvm.s05_base_classes import *
 # Section 6
 from pyuvm.s06_reporting_classes import *
+# Section 7
+from pyuvm.s07_recording_classes import *
 # Section 8
 from pyuvm.s08_factory_classes import *
 # Section 9
@@ -16,7 +18,13 @@ from pyuvm.s12_uvm_tlm_interfaces import *
 from pyuvm.s13_predefined_component_classes import *
 # Section 14, 15 (Done as fresh Python design)
 from pyuvm.s14_15_python_sequences import *
+# Section 12.3 (TLM 2 needs uvm_sequence_item)
+from pyuvm.s12_uvm_tlm2 import *
 # Section 18
 from pyuvm.s18_register_model import *
 # Extension Modules
 from pyuvm.extension_classes import *
+from pyuvm.extension_shm_analysis import *
+from pyuvm.extension_batch_scoreboard import *
+from pyuvm.extension_randomization import *
+from pyuvm.extension_reg_loader import *
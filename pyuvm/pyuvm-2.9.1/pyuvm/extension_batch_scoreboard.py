@@ -0,0 +1,253 @@
+# Batch scoreboard
+#
+# uvm_scoreboard is empty, so every scoreboard ends up with its own
+# Python loop that compares one expected transaction against one
+# actual transaction. For data-path DUTs most of that time goes to
+# the interpreter, not to the comparison.
+#
+# uvm_batch_scoreboard copies the compared fields of each
+# transaction into preallocated NumPy columns as it arrives, so a
+# monitor may reuse one transaction object. Every batch_size pairs,
+# and once more at check_phase, it compares the columns in one
+# vectorized step and reports the first mismatches with their
+# transaction index and the sim times of both transactions. A
+# subclass that can write its reference model as array arithmetic
+# overrides predict() and needs no expected stream.
+#
+# Storing a transaction's fields costs about as much as a few Python
+# operations on it, so a subscriber that checks each transaction
+# inline with a model that cheap is faster. The batch scoreboard
+# is faster than the usual FIFO scoreboard, and than any model that
+# does more work per transaction than it takes to store it.
+#
+# NumPy is optional for pyuvm. This module imports without it, and
+# uvm_batch_scoreboard raises a UVMError if it is created without it.
+
+from cocotb import simulator
+from cocotb.utils import get_time_from_sim_steps
+
+from pyuvm.s13_predefined_component_classes import (uvm_scoreboard,
+                                                     uvm_subscriber)
+from pyuvm import error_classes
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# memoryview item assignment is faster than NumPy's for these
+_NATIVE_FORMATS = frozenset("?bBhHiIlLqQfd")
+
+
+class _Columns:
+    """
+    The field values and sim times of the transactions on one side
+    of the scoreboard, one NumPy array per field. The arrays double
+    in size when they fill.
+    """
+
+    def __init__(self, dtypes, capacity):
+        self.count = 0
+        self.cols = {fname: np.empty(capacity, dtype=dt)
+                     for fname, dt in dtypes.items()}
+        self.times = np.empty(capacity, dtype=np.uint64)
+        self._compile()
+
+    def _compile(self):
+        # A generated append() stores every field with no loop
+        # over the fields and no further call.
+        namespace = {"_columns": self, "_simulator": simulator}
+        lines = []
+        for ii, (fname, col) in enumerate(self.cols.items()):
+            view = memoryview(col)
+            namespace[f"_c{ii}"] = \
+                view if view.format in _NATIVE_FORMATS else col
+            lines.append(f"    _c{ii}[nn] = tt.{fname}\n")
+        namespace["_times"] = memoryview(self.times)
+        source = ("def append(tt):\n"
+                  "    nn = _columns.count\n"
+                  f"    if nn == {len(self.times)}:\n"
+                  "        _columns._grow()\n"
+                  "        return _columns.append(tt)\n"
+                  + "".join(lines)
+                  + "    high, low = _simulator.get_sim_time()\n"
+                  "    _times[nn] = high << 32 | low\n"
+                  "    _columns.count = nn + 1\n"
+                  "    return nn + 1\n")
+        exec(compile(source, "<uvm_batch_scoreboard columns>", "exec"),
+             namespace)
+        self.append = namespace["append"]
+
+    def _grow(self):
+        size = 2 * len(self.times)
+        for fname, col in self.cols.items():
+            self.cols[fname] = np.resize(col, size)
+        self.times = np.resize(self.times, size)
+        self._compile()
+
+    def head(self, start, nn):
+        """The columns of nn transactions from start"""
+        return ({fname: col[start:start + nn]
+                 for fname, col in self.cols.items()},
+                self.times[start:start + nn])
+
+    def discard(self, nn):
+        """Drop the first nn transactions"""
+        rest = self.count - nn
+        for col in self.cols.values():
+            col[:rest] = col[nn:self.count]
+        self.times[:rest] = self.times[nn:self.count]
+        self.count = rest
+
+
+class uvm_batch_scoreboard(uvm_scoreboard):
+    """
+    An in-order scoreboard that compares transactions in vectorized
+    batches. Connect the predictor to expected_export and the
+    monitor to actual_export.
+
+    Subclasses set ``fields`` to the names of the transaction
+    attributes to compare. Use a tuple of names to store every
+    field as ``dtype``, or a dict that maps each name to its own
+    NumPy dtype.
+
+    A subclass may instead override predict(), which computes the
+    expected columns from a batch of actual columns. Then only
+    actual_export needs to be connected::
+
+        class AluScoreboard(uvm_batch_scoreboard):
+            fields = {"op": "u1", "a": "u1", "b": "u1", "y": "u1"}
+
+            def predict(self, cols):
+                op, a, b = cols["op"], cols["a"], cols["b"]
+                return {"y": np.select([op == 0, op == 1, op == 2],
+                                       [a + b, a - b, a & b], a | b)}
+
+    The fields are copied when a transaction is written, so a
+    monitor may write the same object again after changing it.
+    Field names must be Python identifiers.
+    """
+
+    fields = ()
+    dtype = "int64"
+    batch_size = 4096
+    max_reported = 10
+    time_unit = "ns"
+
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        if np is None:
+            raise error_classes.UVMError(
+                f"{self.get_full_name()}: uvm_batch_scoreboard needs numpy")
+        if isinstance(self.fields, dict):
+            self._dtypes = {fname: np.dtype(dt)
+                            for fname, dt in self.fields.items()}
+        else:
+            self._dtypes = {fname: np.dtype(self.dtype)
+                            for fname in self.fields}
+        if len(self._dtypes) == 0:
+            raise error_classes.UVMError(
+                f"{self.get_full_name()}: set fields to the transaction"
+                " attributes to compare")
+        self._predicting = \
+            type(self).predict is not uvm_batch_scoreboard.predict
+        self.expected_export = uvm_subscriber.uvm_AnalysisImp(
+            "expected_export", self, self.write_expected)
+        self.actual_export = uvm_subscriber.uvm_AnalysisImp(
+            "actual_export", self, self.write_actual)
+        self._expected = _Columns(self._dtypes, self.batch_size)
+        self._actual = _Columns(self._dtypes, self.batch_size)
+        self.compared = 0
+        self.matches = 0
+        self.mismatches = 0
+        self.batches = 0
+
+    def predict(self, cols):
+        """
+        Override to compute the expected values from the actual ones
+        instead of receiving expected transactions.
+
+        :param cols: dict of field name to array of actual values
+        :return: dict of field name to array of expected values for
+            the fields that should be compared
+        """
+
+    def write_expected(self, tt):
+        if (self._expected.append(tt) >= self.batch_size
+                and self._actual.count >= self.batch_size):
+            self.compare_batch()
+
+    def write_actual(self, tt):
+        if self._actual.append(tt) >= self.batch_size and (
+                self._predicting
+                or self._expected.count >= self.batch_size):
+            self.compare_batch()
+
+    def compare_batch(self):
+        """
+        Compare every pair of expected and actual transactions that
+        has arrived so far, batch_size pairs at a time. Unpaired
+        transactions wait for the next call.
+        """
+        if self._predicting:
+            pairs = self._actual.count
+        else:
+            pairs = min(self._expected.count, self._actual.count)
+        done = 0
+        while done < pairs:
+            nn = min(self.batch_size, pairs - done)
+            actual, act_times = self._actual.head(done, nn)
+            if self._predicting:
+                expected = self.predict(actual)
+                exp_times = act_times
+            else:
+                expected, exp_times = self._expected.head(done, nn)
+            self._compare(expected, actual, exp_times, act_times, nn)
+            done += nn
+        self._actual.discard(done)
+        if not self._predicting:
+            self._expected.discard(done)
+
+    def _time(self, steps):
+        """Convert a sim time in steps to time_unit"""
+        return get_time_from_sim_steps(int(steps), self.time_unit)
+
+    def _compare(self, expected, actual, exp_times, act_times, nn):
+        bad = np.zeros(nn, dtype=bool)
+        for fname, exp_col in expected.items():
+            bad |= exp_col != actual[fname]
+        bad_indexes = np.flatnonzero(bad)
+        for ii in bad_indexes[:max(0, self.max_reported - self.mismatches)]:
+            diffs = ", ".join(
+                f"{fname} expected {exp_col[ii]} got {actual[fname][ii]}"
+                for fname, exp_col in expected.items()
+                if exp_col[ii] != actual[fname][ii])
+            self.logger.error(
+                f"Mismatch at transaction {self.compared + ii}"
+                f" (expected at {self._time(exp_times[ii])}{self.time_unit},"
+                f" actual at {self._time(act_times[ii])}{self.time_unit}):"
+                f" {diffs}")
+        self.mismatches += len(bad_indexes)
+        self.matches += nn - len(bad_indexes)
+        self.compared += nn
+        self.batches += 1
+
+    def check_phase(self):
+        self.compare_batch()
+        if self._expected.count:
+            self.logger.error(
+                f"{self._expected.count} expected transactions never"
+                " arrived")
+        if self._actual.count:
+            self.logger.error(
+                f"{self._actual.count} actual transactions had no"
+                " expected transaction")
+        if self.mismatches > self.max_reported:
+            self.logger.error(
+                f"{self.mismatches - self.max_reported} more mismatches"
+                " not reported")
+
+    def report_phase(self):
+        self.logger.info(
+            f"compared {self.compared} in {self.batches} batches:"
+            f" {self.matches} matches, {self.mismatches} mismatches")
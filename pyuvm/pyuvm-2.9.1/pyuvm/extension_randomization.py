@@ -0,0 +1,241 @@
+# Batch randomization
+#
+# pyuvm has no randomize(), so sequences call random.randint() once
+# per field per item. Here a sequence item class declares its random
+# fields and constraints instead, and uvm_randomizer draws thousands
+# of items at a time with NumPy. Each field is drawn for a whole
+# batch of candidates in one call, the constraints are evaluated as
+# array expressions, and the candidates that fail are rejected
+# together.
+#
+# NumPy is optional for pyuvm. This module imports without it, and
+# uvm_randomizer raises a UVMError if it is created without it.
+
+import math
+import random
+
+from pyuvm import error_classes
+from pyuvm.s08_factory_classes import uvm_factory
+from pyuvm.utility_classes import ObjectPool, UVMSeeding
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+class uvm_rand_range:
+    """
+    A field drawn uniformly from low to high, inclusive, like
+    ``x inside {[low:high]}``.
+    """
+
+    def __init__(self, low, high):
+        if high < low:
+            raise error_classes.UVMError(
+                f"uvm_rand_range high {high} is below low {low}")
+        self.low = low
+        self.high = high
+        self.dtype = "uint64" if high > 2 ** 63 - 1 else "int64"
+
+    def __repr__(self):
+        return f"uvm_rand_range({self.low}, {self.high})"
+
+    def sample(self, rng, size):
+        return rng.integers(self.low, self.high, size=size,
+                            dtype=self.dtype, endpoint=True)
+
+
+class uvm_rand_dist:
+    """
+    A field drawn from a weighted distribution, like a
+    SystemVerilog ``dist``. Keys are values, or (low, high)
+    tuples for an inclusive range. A range's weight is shared
+    by its values, as with ``:/``::
+
+        uvm_rand_dist({0: 40, (1, 254): 20, 255: 40})
+    """
+
+    def __init__(self, weights):
+        if not weights:
+            raise error_classes.UVMError("uvm_rand_dist needs weights")
+        self.weights = dict(weights)
+        lows, highs = [], []
+        for key in self.weights:
+            low, high = key if isinstance(key, tuple) else (key, key)
+            if high < low:
+                raise error_classes.UVMError(
+                    f"uvm_rand_dist range {key} is empty")
+            lows.append(low)
+            highs.append(high)
+        total = sum(self.weights.values())
+        if total <= 0:
+            raise error_classes.UVMError(
+                "uvm_rand_dist weights must add up to more than 0")
+        self.dtype = "uint64" if max(highs) > 2 ** 63 - 1 else "int64"
+        # Without numpy these stay lists, and uvm_randomizer says why
+        self._lows = np.array(lows, dtype=self.dtype) if np else lows
+        self._highs = np.array(highs, dtype=self.dtype) if np else highs
+        self._p = [weight / total for weight in self.weights.values()]
+
+    def __repr__(self):
+        return f"uvm_rand_dist({self.weights})"
+
+    def sample(self, rng, size):
+        choice = rng.choice(len(self._p), size=size, p=self._p)
+        return rng.integers(self._lows[choice], self._highs[choice],
+                            dtype=self.dtype, endpoint=True)
+
+
+class uvm_randomizer:
+    """
+    Draws random sequence items in batches. The item class lists
+    its random fields in ``rand_fields`` and its constraints in
+    ``constraints``. Each constraint is a function that takes a
+    dict of field name to NumPy array and returns a boolean array
+    that is True for the candidates to keep::
+
+        class AluItem(uvm_sequence_item):
+            __slots__ = ("op", "a", "b")
+            rand_fields = {
+                "op": uvm_rand_dist({0: 4, 1: 3, 2: 2, 3: 1}),
+                "a": uvm_rand_range(0, 255),
+                "b": uvm_rand_range(0, 255),
+            }
+            # subtraction never goes negative
+            constraints = (lambda c: (c["op"] != 1) | (c["a"] >= c["b"]),)
+
+    Write an implication ``p -> q`` as ``~p | q``, and combine
+    relations with ``&`` and ``|``. A sequence sends the items
+    with send_items()::
+
+        await self.send_items(uvm_randomizer(AluItem).items(10_000))
+    """
+
+    def __init__(self, item_type, seed=None, batch_size=4096,
+                 max_candidates=10_000_000):
+        """
+        :param item_type: uvm_sequence_item subclass with rand_fields
+        :param seed: Seed for the NumPy generator, or a
+            numpy.random.Generator to draw from. By default the
+            seed comes from the test seed and the item type, like
+            the seed of a uvm_object's stream, or from the random
+            module when path seeding is off. Pass
+            ``self.rng.getrandbits(64)`` to seed from a sequence's
+            or component's stream instead.
+        :param batch_size: Items drawn per call to randomize_batch()
+            when items() is iterating
+        :param max_candidates: Give up after rejecting this many
+            candidates in a row
+        """
+        if np is None:
+            raise error_classes.UVMError(
+                f"uvm_randomizer for {item_type.__name__} needs numpy")
+        self.item_type = item_type
+        self.fields = dict(getattr(item_type, "rand_fields", {}))
+        if not self.fields:
+            raise error_classes.UVMError(
+                f"{item_type.__name__} has no rand_fields")
+        self.constraints = tuple(getattr(item_type, "constraints", ()))
+        if seed is None and UVMSeeding.use_uvm_seeding:
+            seed = UVMSeeding.create_random_seed("uvm_randomizer",
+                                                 item_type.__name__)
+        elif seed is None:
+            seed = random.getrandbits(64)
+        if isinstance(seed, np.random.Generator):
+            self.rng = seed
+        else:
+            self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.max_candidates = max_candidates
+        self.candidates = 0
+        self.accepted = 0
+
+    def acceptance(self):
+        """Fraction of candidates that met the constraints so far"""
+        return self.accepted / self.candidates if self.candidates else 1.0
+
+    def _draw(self, size):
+        cols = {fname: field.sample(self.rng, size)
+                for fname, field in self.fields.items()}
+        self.candidates += size
+        if not self.constraints:
+            return cols
+        keep = np.ones(size, dtype=bool)
+        for constraint in self.constraints:
+            keep &= constraint(cols)
+        return {fname: col[keep] for fname, col in cols.items()}
+
+    def randomize_batch(self, count):
+        """
+        Draw count sets of field values that meet every constraint.
+
+        :param count: Number of items
+        :return: dict of field name to array of count values
+        """
+        parts = []
+        found = 0
+        rejected = 0
+        while found < count:
+            # Draw enough candidates to finish in one more round at
+            # the acceptance rate seen so far, which is never taken
+            # as zero.
+            needed = count - found
+            rate = (self.accepted + 1) / (self.candidates + 1)
+            size = max(needed, math.ceil(needed * 1.1 / rate))
+            size = min(size, 16 * max(count, self.batch_size))
+            cols = self._draw(size)
+            kept = len(next(iter(cols.values())))
+            self.accepted += kept
+            if kept == 0:
+                rejected += size
+                if rejected >= self.max_candidates:
+                    raise error_classes.UVMError(
+                        f"{self.item_type.__name__} constraints rejected"
+                        f" {rejected} candidates in a row")
+                continue
+            rejected = 0
+            parts.append(cols)
+            found += kept
+        if len(parts) == 1:
+            return {fname: col[:count] for fname, col in parts[0].items()}
+        return {fname: np.concatenate([part[fname] for part in parts])[:count]
+                for fname in self.fields}
+
+    def randomize(self, item):
+        """Set the random fields of one item"""
+        cols = self.randomize_batch(1)
+        for fname, col in cols.items():
+            setattr(item, fname, col.item(0))
+        return item
+
+    def items(self, count=None, name="item"):
+        """
+        Yield count randomized items, or items without end if
+        count is None. Factory overrides and pools apply as they
+        do in create(). The override is looked up once per batch.
+        """
+        fnames = list(self.fields)
+        left = count
+        while left is None or left > 0:
+            size = self.batch_size if left is None \
+                else min(left, self.batch_size)
+            cols = self.randomize_batch(size)
+            values = [cols[fname].tolist() for fname in fnames]
+            new_type = uvm_factory().find_override_by_type(self.item_type,
+                                                           name)
+            if new_type is None:
+                raise error_classes.UVMFactoryError(
+                    f"{self.item_type} not in uvm_factory()")
+            pool = ObjectPool.pools.get(new_type)
+            create = new_type if pool is None else pool.get
+            for row in zip(*values):
+                item = create(name)
+                for fname, value in zip(fnames, row):
+                    setattr(item, fname, value)
+                yield item
+            if left is not None:
+                left -= size
+
+    def __iter__(self):
+        return self.items()
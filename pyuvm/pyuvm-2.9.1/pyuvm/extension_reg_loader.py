@@ -0,0 +1,340 @@
+# Register model loader
+#
+# A register model built in Python with configure() calls is slow
+# for an SoC with tens of thousands of registers, and each test
+# builds it again. uvm_reg_loader builds the uvm_reg_block, maps,
+# registers and fields from a CSV table instead, with one row per
+# field:
+#
+#     map,reg,offset,n_bits,field,lsb,size,access,reset,volatile
+#     apb,ctrl,0x0,32,enable,0,1,RW,0,0
+#     apb,ctrl,0x0,32,mode,1,3,RW,0x2,0
+#     apb,status,0x4,32,irq,0,1,W1C,0,1
+#
+# The map, n_bits, reset, volatile and rights columns may be left
+# out. A row with an empty field column maps a register without
+# fields. Numbers may be written in decimal, hex (0x), octal (0o)
+# or binary (0b).
+#
+# The first load checks the table, including overlapping fields
+# and registers, and saves the model as flat lists of names and
+# integers in a JSON cache file named by the SHA-256 of the table.
+# Later loads of the same table read that file and skip the checks.
+# Their registers take their access masks from the cache and create
+# their uvm_reg_field objects only when get_fields() is first
+# called.
+#
+# The cache is data only, so a planted file cannot run code, and it
+# lives in a directory that only the user can write to. A cache file
+# that cannot be read or does not hold a model is ignored and the
+# table is parsed again.
+
+import array
+import csv
+import gc
+import hashlib
+import io
+import json
+import logging
+import os
+import stat
+
+from pyuvm import error_classes
+from pyuvm.s18_register_model import uvm_reg, uvm_reg_block, uvm_reg_field
+
+_CACHE_VERSION = 2
+_REQUIRED = ("reg", "offset", "field", "lsb", "size", "access")
+
+
+class uvm_reg_loader:
+    """
+    Builds a uvm_reg_block from a CSV register table::
+
+        loader = uvm_reg_loader("soc_regs.csv")
+        block = loader.load()
+        status = block.get_map_by_name("apb").get_reg_by_offset(4)
+    """
+
+    def __init__(self, path, name=None, base_addr=0, n_bytes=4,
+                 endian="little", cache_dir=None):
+        """
+        :param path: CSV register table
+        :param name: Block name, or None for the file name
+        :param base_addr: Base address of every map, or a dict of
+            map name to base address
+        :param n_bytes: Bus width in bytes of every map
+        :param endian: "little" or "big"
+        :param cache_dir: Directory for compiled models, or None
+            for pyuvm/reg_cache in the user's cache directory
+            ($XDG_CACHE_HOME or ~/.cache). It is created with mode
+            0o700, and not used if another user owns it or can
+            write to it.
+        """
+        self.path = path
+        stem = os.path.splitext(os.path.basename(path))[0]
+        self.name = stem if name is None else name
+        self.base_addr = base_addr
+        self.n_bytes = n_bytes
+        self.endian = endian
+        if cache_dir is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") \
+                or os.path.join(os.path.expanduser("~"), ".cache")
+            cache_dir = os.path.join(cache_home, "pyuvm", "reg_cache")
+        self.cache_dir = cache_dir
+        self.cache_path = None
+        self.from_cache = False
+
+    def load(self):
+        """
+        Build the block, from the cache if it holds this table
+
+        :return: uvm_reg_block
+        """
+        with open(self.path, "rb") as file:
+            source = file.read()
+        key = hashlib.sha256(source)
+        key.update(repr((_CACHE_VERSION, self.name, self.base_addr,
+                         self.n_bytes, self.endian)).encode())
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        self.cache_path = os.path.join(
+            self.cache_dir, f"{stem}.{key.hexdigest()[:32]}.json")
+        # Loading makes many objects that are never garbage, so the
+        # collector is paused rather than run over them again and
+        # again
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            model = self._read_cache()
+            if model is not None:
+                try:
+                    block = self._build(model)
+                except Exception:
+                    # A damaged cache file is a cache miss too
+                    pass
+                else:
+                    self.from_cache = True
+                    return block
+            self.from_cache = False
+            model = self._parse(source.decode("utf-8-sig"))
+            block = self._build(model)
+            self._write_cache(model)
+            return block
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _private_cache_dir(self):
+        """
+        Create cache_dir if needed and check that only this user
+        can write to it
+
+        :return: True if the cache may be used
+        """
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            info = os.stat(self.cache_dir)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(info.st_mode):
+            return False
+        if hasattr(os, "getuid") and (
+                info.st_uid != os.getuid()
+                or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+            logging.warning(
+                f"Not caching register models in {self.cache_dir}:"
+                " another user owns it or can write to it")
+            return False
+        return True
+
+    def _read_cache(self):
+        if not self._private_cache_dir():
+            return None
+        # Anything wrong with the file, from a partial write to a
+        # model from another version, is a cache miss
+        try:
+            with open(self.cache_path, "rb") as file:
+                model = json.load(file)
+            if model["version"] != _CACHE_VERSION:
+                return None
+        except Exception:
+            return None
+        return model
+
+    def _write_cache(self, model):
+        if not self._private_cache_dir():
+            return
+        data = {name: list(value) if isinstance(value, array.array)
+                else value for name, value in model.items()}
+        temp = f"{self.cache_path}.{os.getpid()}"
+        try:
+            with open(temp, "w") as file:
+                json.dump(data, file, separators=(",", ":"))
+            # Another test starting at the same time may be writing
+            # the same file, so replace it in one step
+            os.replace(temp, self.cache_path)
+        except OSError:
+            logging.warning(f"Could not write {self.cache_path}")
+
+    def _error(self, line, message):
+        raise error_classes.UVMError(f"{self.path}:{line}: {message}")
+
+    def _number(self, row, column, line, default=None):
+        text = (row.get(column) or "").strip()
+        if not text:
+            if default is None:
+                self._error(line, f"{column} is empty")
+            return default
+        try:
+            return int(text, 0)
+        except ValueError:
+            self._error(line, f"{column} {text!r} is not a number")
+
+    def _parse(self, text):
+        reader = csv.DictReader(io.StringIO(text))
+        missing = [column for column in _REQUIRED
+                   if column not in (reader.fieldnames or ())]
+        if missing:
+            self._error(1, f"missing columns {', '.join(missing)}")
+        maps = {}
+        regs = {}
+        for line, row in enumerate(reader, 2):
+            reg_name = (row["reg"] or "").strip()
+            if not reg_name:
+                self._error(line, "reg is empty")
+            map_name = (row.get("map") or "").strip() or "default_map"
+            offset = self._number(row, "offset", line)
+            n_bits = self._number(row, "n_bits", line, 0) or None
+            rights = (row.get("rights") or "").strip().upper() or "RW"
+            reg = regs.get(reg_name)
+            if reg is None:
+                reg = regs[reg_name] = {"n_bits": n_bits, "maps": {},
+                                        "fields": {}, "line": line}
+            elif n_bits is not None and reg["n_bits"] not in (None,
+                                                              n_bits):
+                self._error(line, f"{reg_name} n_bits {n_bits} differs"
+                                  f" from {reg['n_bits']} on line"
+                                  f" {reg['line']}")
+            elif n_bits is not None:
+                reg["n_bits"] = n_bits
+            placed = reg["maps"].setdefault(map_name, (offset, rights))
+            if placed[0] != offset:
+                self._error(line, f"{reg_name} is at {placed[0]:#x} in"
+                                  f" {map_name} on an earlier line")
+            maps.setdefault(map_name, len(maps))
+            field_name = (row["field"] or "").strip()
+            if not field_name:
+                continue
+            if field_name in reg["fields"]:
+                self._error(line, f"{reg_name} has two fields called"
+                                  f" {field_name}")
+            volatile = (row.get("volatile") or "").strip().lower()
+            reg["fields"][field_name] = (
+                self._number(row, "lsb", line),
+                self._number(row, "size", line),
+                (row["access"] or "").strip().upper(),
+                volatile in ("1", "true", "yes", "y"),
+                self._number(row, "reset", line, 0))
+
+        # Columns, with the fields of register ii at
+        # field_starts[ii]:field_starts[ii + 1]. Names are joined
+        # into one string, which the cache stores and loads as a
+        # single value.
+        model = {"version": _CACHE_VERSION, "maps": list(maps),
+                 "reg_names": [], "reg_n_bits": array.array("q"),
+                 "place_regs": array.array("q"),
+                 "place_maps": array.array("q"), "place_offsets": [],
+                 "place_rights": [], "field_starts": array.array("q", [0]),
+                 "field_names": [], "field_lsbs": array.array("q"),
+                 "field_sizes": array.array("q"), "field_access": [],
+                 "field_volatile": array.array("b"), "field_resets": [],
+                 "compiled": None}
+        for index, (reg_name, reg) in enumerate(regs.items()):
+            model["reg_names"].append(reg_name)
+            model["reg_n_bits"].append(reg["n_bits"] or 0)
+            for map_name, (offset, rights) in reg["maps"].items():
+                model["place_regs"].append(index)
+                model["place_maps"].append(maps[map_name])
+                model["place_offsets"].append(offset)
+                model["place_rights"].append(rights)
+            for field_name, (lsb, size, access, volatile,
+                             reset) in reg["fields"].items():
+                model["field_names"].append(field_name)
+                model["field_lsbs"].append(lsb)
+                model["field_sizes"].append(size)
+                model["field_access"].append(access)
+                model["field_volatile"].append(volatile)
+                model["field_resets"].append(reset)
+            model["field_starts"].append(len(model["field_names"]))
+        model["reg_names"] = "\n".join(model["reg_names"])
+        model["field_names"] = "\n".join(model["field_names"])
+        return model
+
+    def _build(self, model):
+        block = uvm_reg_block(self.name)
+        maps = []
+        for map_name in model["maps"]:
+            base_addr = self.base_addr
+            if isinstance(base_addr, dict):
+                base_addr = base_addr.get(map_name, 0)
+            maps.append(block.create_map(map_name, base_addr,
+                                         self.n_bytes, self.endian))
+        reg_names = model["reg_names"].split("\n") \
+            if model["reg_names"] else []
+        make_fields = _FieldMaker(model)
+        regs = []
+        compiled = model["compiled"]
+        if compiled is None:
+            # The first load checks the fields and works out the
+            # masks, which the cache keeps as one column per mask
+            # along with each register's width
+            n_bits = model["reg_n_bits"]
+            rows = []
+            for index, reg_name in enumerate(reg_names):
+                reg = uvm_reg(reg_name, n_bits[index] or None)
+                reg._add_fields(make_fields(reg, index))
+                n_bits[index] = reg.get_n_bits()
+                rows.append(reg._get_compiled())
+                reg.configure(block)
+                regs.append(reg)
+            model["compiled"] = [list(column) for column in zip(*rows)]
+        else:
+            for index, (reg_name, n_bits, masks) in enumerate(
+                    zip(reg_names, model["reg_n_bits"], zip(*compiled))):
+                reg = uvm_reg(reg_name, n_bits)
+                reg._set_compiled(masks, make_fields, index)
+                reg.configure(block)
+                regs.append(reg)
+        for reg_index, map_index, offset, rights in zip(
+                model["place_regs"], model["place_maps"],
+                model["place_offsets"], model["place_rights"]):
+            maps[map_index].add_reg(regs[reg_index], offset, rights)
+        for reg_map in maps:
+            # Builds the address index, which checks for overlaps
+            reg_map.decode_offset(0)
+        return block
+
+
+class _FieldMaker:
+    """
+    Creates the uvm_reg_field objects of one register of a model
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.names = None
+
+    def __call__(self, reg, index):
+        model = self.model
+        if self.names is None:
+            self.names = model["field_names"].split("\n")
+        fields = []
+        for ii in range(model["field_starts"][index],
+                        model["field_starts"][index + 1]):
+            field = uvm_reg_field(self.names[ii])
+            field._set_config(reg, model["field_sizes"][ii],
+                              model["field_lsbs"][ii],
+                              model["field_access"][ii],
+                              bool(model["field_volatile"][ii]),
+                              model["field_resets"][ii])
+            fields.append(field)
+        return fields
@@ -0,0 +1,357 @@
+# Out-of-process analysis
+#
+# Scoreboards and reference models run in the simulator's Python
+# interpreter and compete with the simulator for one core.
+# uvm_shm_subscriber moves that work into a worker process.
+#
+# The uvm_shm_subscriber is connected like any other subscriber.
+# Its write() serializes the transaction into a shared memory
+# ring buffer and returns. A worker process builds an instance
+# of a normal uvm_subscriber class, reads the ring buffer and
+# calls that subscriber's write() for each transaction.
+#
+# The worker runs the subscriber's phases up to
+# start_of_simulation_phase before it reads the first transaction,
+# so the subscriber can set itself up in build_phase as usual. At
+# check_phase the worker runs the subscriber's extract_phase and
+# check_phase and sends back everything the subscriber logged. The
+# uvm_shm_subscriber logs those messages through its own logger,
+# and raises a UVMError if the subscriber raised an exception.
+
+import collections
+import logging
+import multiprocessing
+import pickle
+import struct
+import time
+import traceback
+from multiprocessing import shared_memory
+
+from pyuvm.s09_phasing import (uvm_build_phase, uvm_check_phase,
+                               uvm_connect_phase,
+                               uvm_end_of_elaboration_phase,
+                               uvm_extract_phase,
+                               uvm_start_of_simulation_phase)
+from pyuvm.s13_uvm_component import uvm_component
+from pyuvm.s13_predefined_component_classes import uvm_subscriber
+from pyuvm import error_classes
+
+
+class ShmRingBuffer:
+    """
+    A single-producer, single-consumer ring buffer of byte records
+    in shared memory. The header holds the total number of bytes
+    written and read. Each record is a 4-byte length followed by
+    the payload, and records wrap around the end of the buffer.
+
+    The header counters are accessed through a memoryview cast to
+    unsigned 64-bit integers so that each update is a single aligned
+    store the other process cannot see half written.
+    """
+
+    _header_size = 16
+    _length = struct.Struct("<I")
+    STOP = 0xFFFFFFFF
+
+    def __init__(self, name=None, capacity=1 << 22):
+        """
+        :param name: Shared memory name to attach to, or None to create
+        :param capacity: Data bytes in a new buffer
+        """
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=self._header_size + capacity)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.capacity = self.shm.size - self._header_size
+        # _counters[0] is bytes written, _counters[1] is bytes read
+        self._counters = self.shm.buf[:self._header_size].cast("Q")
+        if name is None:
+            self._counters[0] = 0
+            self._counters[1] = 0
+        self._data = self.shm.buf[self._header_size:]
+
+    def _copy_in(self, pos, payload):
+        start = pos % self.capacity
+        first = min(len(payload), self.capacity - start)
+        self._data[start:start + first] = payload[:first]
+        if first < len(payload):
+            self._data[:len(payload) - first] = payload[first:]
+
+    def _copy_out(self, pos, size):
+        start = pos % self.capacity
+        first = min(size, self.capacity - start)
+        if first == size:
+            return bytes(self._data[start:start + size])
+        return bytes(self._data[start:]) + bytes(self._data[:size - first])
+
+    def try_write(self, payload, length=None):
+        """
+        Append a record if it fits.
+
+        :param payload: bytes-like record
+        :param length: Value for the length field. Defaults to len(payload)
+        :return: True if the record was written
+        """
+        head = self._counters[0]
+        needed = self._length.size + len(payload)
+        tail = self._counters[1]
+        if needed > self.capacity - (head - tail):
+            return False
+        if length is None:
+            length = len(payload)
+        self._copy_in(head, self._length.pack(length))
+        self._copy_in(head + self._length.size, payload)
+        # Publish the record only after its bytes are in place
+        self._counters[0] = head + needed
+        return True
+
+    def read(self):
+        """
+        Take the next record.
+
+        :return: bytes, STOP, or None if the buffer is empty
+        """
+        tail = self._counters[1]
+        if self._counters[0] == tail:
+            return None
+        (length,) = self._length.unpack(
+            self._copy_out(tail, self._length.size))
+        if length == self.STOP:
+            self._counters[1] = tail + self._length.size
+            return self.STOP
+        payload = self._copy_out(tail + self._length.size, length)
+        self._counters[1] = tail + self._length.size + length
+        return payload
+
+    def used(self):
+        """
+        :return: Bytes waiting to be read
+        """
+        return self._counters[0] - self._counters[1]
+
+    def close(self):
+        self._counters.release()
+        self._data.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class _ResultHandler(logging.Handler):
+    """Collects the worker subscriber's log messages"""
+
+    def __init__(self):
+        super().__init__(logging.NOTSET)
+        # With a formatter already set, add_logging_handler() does
+        # not add cocotb's SimTimeContextFilter, which needs the
+        # simulator that the worker process does not have
+        self.setFormatter(logging.Formatter("%(message)s"))
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+_PRE_RUN_PHASES = (uvm_build_phase, uvm_connect_phase,
+                   uvm_end_of_elaboration_phase,
+                   uvm_start_of_simulation_phase)
+_POST_RUN_PHASES = (uvm_extract_phase, uvm_check_phase)
+
+
+def _shm_subscriber_worker(shm_name, subscriber_cls, name, decode, results):
+    """
+    Worker process entry point. Builds the subscriber and runs its
+    phases up to start_of_simulation_phase, feeds it every record
+    in the ring buffer, and runs its extract_phase and check_phase
+    when it reads the STOP record. Then sends back the item count,
+    the subscriber's log messages and, if the subscriber raised an
+    exception, where and its traceback.
+    """
+    handler = _ResultHandler()
+    count = 0
+    step = "__init__()"
+    failure = None
+    ring = ShmRingBuffer(name=shm_name)
+    try:
+        subscriber = subscriber_cls(name, None)
+        subscriber.remove_streaming_handler()
+        subscriber.add_logging_handler(handler)
+        for phase in _PRE_RUN_PHASES:
+            step = phase.__name__[4:]
+            phase.traverse(subscriber)
+            if phase is uvm_connect_phase:
+                subscriber.resolve_bindings_hier()
+        # Children made in build_phase log through the handler too
+        subscriber.remove_streaming_handler_hier()
+        subscriber.add_logging_handler_hier(handler)
+        step = "write()"
+        idle = 0
+        while True:
+            payload = ring.read()
+            if payload is None:
+                idle = min(idle + 1, 20)
+                time.sleep(0.00005 * idle)
+                continue
+            idle = 0
+            if payload == ShmRingBuffer.STOP:
+                break
+            subscriber.write(decode(payload))
+            count += 1
+        for phase in _POST_RUN_PHASES:
+            step = phase.__name__[4:]
+            phase.traverse(subscriber)
+    except Exception:
+        if step == "write()":
+            step = f"write() of transaction {count + 1}"
+        failure = (step, traceback.format_exc())
+    finally:
+        ring.close()
+    results.send((count, handler.records, failure))
+    results.close()
+
+
+class uvm_shm_subscriber(uvm_component):
+    """
+    Runs a uvm_subscriber in a worker process. write() only
+    encodes the transaction and copies it into shared memory.
+    If the ring buffer is full the encoded transaction waits in
+    a local backlog and goes out on a later write().
+
+    subscriber_cls must be importable by the worker process, and
+    transactions must survive encode/decode (pickle by default).
+    """
+
+    def __init__(self, name, parent, subscriber_cls, capacity=1 << 22,
+                 encode=pickle.dumps, decode=pickle.loads,
+                 mp_context="spawn", timeout=60):
+        """
+        :param subscriber_cls: uvm_subscriber class to run in the worker
+        :param capacity: Ring buffer size in bytes
+        :param encode: Function from transaction to bytes
+        :param decode: Function from bytes to transaction, run in the
+            worker so it must be picklable
+        :param mp_context: multiprocessing start method
+        :param timeout: Seconds to wait for the worker at check_phase
+        """
+        super().__init__(name, parent)
+        assert issubclass(subscriber_cls, uvm_subscriber), \
+            f"{subscriber_cls} is not a uvm_subscriber"
+        self.subscriber_cls = subscriber_cls
+        self.capacity = capacity
+        self.encode = encode
+        self.decode = decode
+        self.mp_context = multiprocessing.get_context(mp_context)
+        self.timeout = timeout
+        self.analysis_export = uvm_subscriber.uvm_AnalysisImp(
+            "analysis_export", self, self.write)
+        self.ring = None
+        self.process = None
+        self._results = None
+        self._backlog = collections.deque()
+        self.items_written = 0
+        self.items_checked = 0
+
+    def start_of_simulation_phase(self):
+        self.ring = ShmRingBuffer(capacity=self.capacity)
+        self._results, child_end = self.mp_context.Pipe(duplex=False)
+        self.process = self.mp_context.Process(
+            target=_shm_subscriber_worker,
+            args=(self.ring.name, self.subscriber_cls, self.get_name(),
+                  self.decode, child_end),
+            daemon=True)
+        self.process.start()
+        child_end.close()
+
+    def _flush_backlog(self):
+        backlog = self._backlog
+        while backlog and self.ring.try_write(backlog[0]):
+            backlog.popleft()
+
+    def write(self, tt):
+        """
+        Queue a transaction for the worker. Never blocks.
+
+        :param tt: transaction
+        """
+        payload = self.encode(tt)
+        if len(payload) + 4 > self.ring.capacity:
+            raise error_classes.UVMError(
+                f"{len(payload)}-byte transaction does not fit in the"
+                f" {self.ring.capacity}-byte ring buffer of"
+                f" {self.get_full_name()}")
+        if self._backlog:
+            self._backlog.append(payload)
+            self._flush_backlog()
+        elif not self.ring.try_write(payload):
+            self._backlog.append(payload)
+        self.items_written += 1
+
+    def _wait_for_room(self, stop_at):
+        while self._backlog:
+            self._flush_backlog()
+            if self._backlog:
+                if not self.process.is_alive() or time.monotonic() > stop_at:
+                    return False
+                time.sleep(0.0005)
+        return True
+
+    def check_phase(self):
+        if self.process is None:
+            return
+        stop_at = time.monotonic() + self.timeout
+        if self._wait_for_room(stop_at):
+            while not self.ring.try_write(b"", ShmRingBuffer.STOP):
+                if not self.process.is_alive() or time.monotonic() > stop_at:
+                    break
+                time.sleep(0.0005)
+        remaining = max(0, stop_at - time.monotonic())
+        try:
+            if not self._results.poll(remaining):
+                self.logger.error(
+                    f"Worker for {self.subscriber_cls.__name__} did not"
+                    f" finish within {self.timeout} seconds")
+                self.process.kill()
+                return
+            try:
+                self.items_checked, records, failure = self._results.recv()
+            except (EOFError, OSError):
+                self.process.join(self.timeout)
+                raise error_classes.UVMError(
+                    f"The worker of {self.get_full_name()} running"
+                    f" {self.subscriber_cls.__name__} exited with code"
+                    f" {self.process.exitcode} before sending its"
+                    " results") from None
+            self.process.join()
+        finally:
+            # final_phase will not run if this raises, so free the
+            # shared memory now
+            self._release_ring()
+        for level, msg in records:
+            self.logger.log(level, msg)
+        if failure is not None:
+            step, trace = failure
+            raise error_classes.UVMError(
+                f"{self.subscriber_cls.__name__} in the worker of"
+                f" {self.get_full_name()} raised an exception in"
+                f" {step}:\n{trace}")
+        if self.items_checked != self.items_written:
+            self.logger.error(
+                f"Worker checked {self.items_checked} of"
+                f" {self.items_written} transactions")
+
+    def report_phase(self):
+        self.logger.info(
+            f"{self.items_checked} transactions checked out of process"
+            f" by {self.subscriber_cls.__name__}")
+
+    def final_phase(self):
+        self._release_ring()
+
+    def _release_ring(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
@@ -1,8 +1,12 @@
 """
 This file defines the UVM base classes
 """
+import itertools
+import random
 import sys
 
+from cocotb.utils import get_sim_time
+
 try:
     import pyuvm.error_classes as error_classes
     import pyuvm.utility_classes as utility_classes
@@ -14,7 +18,16 @@ except ModuleNotFoundError as mnf:
 
 # 5.3.1
 class uvm_object(utility_classes.uvm_void):
-    """ The most basic UVM object """
+    """
+    The most basic UVM object
+
+    uvm_object and uvm_transaction declare __slots__, so a
+    subclass that also declares __slots__ has no per-instance
+    __dict__. Subclasses without __slots__ work as before.
+    """
+
+    __slots__ = ("_obj_name", "_rng")
+    _uvm_codec = None
 
     # 5.3.2
     def __init__(self, name=''):
@@ -24,20 +37,43 @@ class uvm_object(utility_classes.uvm_void):
 
     # 5.3.3.1
     def get_uvm_seeding(self):
-        """Not implemented"""
-        raise error_classes.UVMNotImplemented(
-            'get_uvm_seeding not implemented')
+        """
+        True if objects get their own random streams seeded
+        from the test seed and their full names
+        """
+        return utility_classes.UVMSeeding.use_uvm_seeding
 
     # 5.3.3.2
     def set_uvm_seeding(self, enable):
-        """ Not implemented """
-        raise error_classes.UVMNotImplemented(
-            'set_uvm_seeding not implemented')
+        """
+        Turn path seeding on or off for every object. When it is
+        off, rng is the random module.
+        """
+        utility_classes.UVMSeeding.use_uvm_seeding = enable
 
     # 5.3.3.3
     def reseed(self):
-        """ Not implemented """
-        raise error_classes.UVMNotImplemented('reseed not implemented')
+        """
+        Give this object a new random stream seeded from the test
+        seed, its type name and its full name. Does nothing when
+        path seeding is off.
+        """
+        if utility_classes.UVMSeeding.use_uvm_seeding:
+            self._rng = random.Random(
+                utility_classes.UVMSeeding.create_random_seed(
+                    self.get_type_name(), self.get_full_name()))
+
+    @property
+    def rng(self):
+        """
+        This object's random.Random. The first use calls reseed(),
+        so components should use it after they are constructed.
+        """
+        try:
+            return self._rng
+        except AttributeError:
+            self.reseed()
+            return getattr(self, "_rng", random)
 
     # 5.3.3.4
     def get_name(self):
@@ -102,17 +138,86 @@ class uvm_object(utility_classes.uvm_void):
     @classmethod
     def create(cls, name):
         """
-        :return: new object from factory
-        """
-        new_obj = uvm_factory().create_object_by_type(cls, name=name)
+        :return: new object from factory, taken from the
+            pool of the created type if it has one
+        """
+        factory = uvm_factory()
+        pools = utility_classes.ObjectPool.pools
+        if pools:
+            if cls in factory.fd.overrides:
+                new_type = factory.find_override_by_type(cls, name)
+            else:
+                new_type = cls
+            pool = pools.get(new_type)
+            if pool is not None:
+                return pool.get(name)
+        new_obj = factory.create_object_by_type(cls, name=name)
         return new_obj
 
+    @classmethod
+    def enable_pool(cls, max_size=1024):
+        """
+        Make create() reuse released objects of exactly this
+        type. The sequencer releases pooled sequence items
+        when the driver completes them.
+
+        :param max_size: Most released objects to keep
+        :return: The utility_classes.ObjectPool for this type
+        """
+        pool = utility_classes.ObjectPool.pools.get(cls)
+        if pool is None:
+            pool = utility_classes.ObjectPool(cls, max_size)
+            utility_classes.ObjectPool.pools[cls] = pool
+        pool.max_size = max_size
+        return pool
+
+    @classmethod
+    def disable_pool(cls):
+        """Stop pooling this type and drop its released objects"""
+        pool = utility_classes.ObjectPool.pools.pop(cls, None)
+        if pool is not None:
+            pool.clear()
+
+    @classmethod
+    def get_pool(cls):
+        """
+        :return: The ObjectPool for this type, or None
+        """
+        return utility_classes.ObjectPool.pools.get(cls)
+
+    def release(self):
+        """
+        Return this object to its type's pool. create() reuses it
+        once nothing else refers to it. Does nothing if the type
+        is not pooled.
+
+        The check that nothing else refers to the object is only a
+        best-effort guard. It compares CPython reference counts, so
+        it cannot see weak references or handles held outside
+        Python objects. Do not use the object after releasing it.
+        """
+        pool = utility_classes.ObjectPool.pools.get(type(self))
+        if pool is not None and not pool.release(self):
+            raise error_classes.UVMError(
+                f"{self.get_name()} was released twice")
+
+    def reset(self):
+        """
+        Override to put the fields of a pooled object back to
+        their initial values. create() calls it when it reuses
+        a released object.
+        """
+
+    def _recycle(self, name):
+        self.set_name(name)
+        self.reset()
+
     # 5.3.5.2
     def clone(self):
         """
-        Unlike the clone in the SystemVerilog UVM, this clone()
-        uses copy.deepcopy so the user does not need to override
-        do_copy()
+        Create an object of the same type with the same name and
+        copy() this one into it. A class that declares uvm_fields
+        gets a generated clone() that copies them directly.
         """
         new = self.__class__(self.get_name())
         new.copy(self)
@@ -174,7 +279,8 @@ class uvm_object(utility_classes.uvm_void):
     # 5.3.8.2
     def do_copy(self, rhs):
         """
-        Copies name. Override to copy additional data members
+        Copies name. Override to copy additional data members, or
+        declare them in uvm_fields to have do_copy() generated.
         """
         self.set_name(rhs.get_name())
 
@@ -188,57 +294,164 @@ class uvm_object(utility_classes.uvm_void):
     # 5.3.9.2
     def do_compare(self, rhs):
         """
-        Recommend overriding __eq__() rather than this method.
+        Recommend overriding __eq__() rather than this method, or
+        declaring uvm_fields to have do_compare() generated.
         """
         return self.__eq__(rhs)
 
+    # Packing uses the codec FactoryMeta compiles from the fields a
+    # class declares in uvm_fields. A class without them, or with a
+    # field that has no width, still gets the UsePythonMethod error.
+
+    @classmethod
+    def _get_codec(cls):
+        codec = cls._uvm_codec
+        if codec is None:
+            raise error_classes.UsePythonMethod(
+                f"Declare uvm_fields with widths in {cls.__name__} to"
+                " pack it, or use struct, pickle, json, or yaml.")
+        return codec
+
+    @classmethod
+    def get_packed_size(cls):
+        """
+        :return: Bytes that pack() produces for this class
+        """
+        return cls._get_codec().size
+
+    @classmethod
+    def pack_items(cls, items, buffer, offset=0):
+        """
+        Pack many objects of this class back to back into buffer
+        in one generated loop.
+
+        :return: Offset of the byte after the last object
+        """
+        return cls._get_codec().pack_items(items, buffer, offset)
+
+    @classmethod
+    def unpack_items(cls, items, buffer, offset=0):
+        """
+        Set the fields of each object in items from consecutive
+        records in buffer.
+
+        :return: Offset of the byte after the last record
+        """
+        return cls._get_codec().unpack_items(items, buffer, offset)
+
     # 5.3.10.1
     def pack(self):
         """
-        Not implemented yet. There are Pythonic solutions to this.
+        Pack the fields declared in uvm_fields, first field
+        in the most significant bits. A subclass packs its
+        parents' fields before its own.
+
+        :return: bytearray
         """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
+        codec = self._get_codec()
+        buffer = bytearray(codec.size)
+        codec.pack_into(self, buffer, 0)
+        return buffer
 
     # 5.3.10.1
-    def pack_bytes(self):
+    def pack_bytes(self, buffer, offset=0):
         """
-        Not implemented yet. There are Pythonic solutions to this.
+        Pack into a caller's bytearray or writable memoryview
+        without making a copy.
+
+        :param buffer: Buffer to pack into
+        :param offset: Byte offset in buffer
+        :return: Offset of the byte after this object
         """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
+        codec = self._uvm_codec
+        if codec is None:
+            self._get_codec()
+        codec.pack_into(self, buffer, offset)
+        return offset + codec.size
 
     # 5.3.10.1
     def pack_ints(self):
         """
-        Not implemented yet. There are Pythonic solutions to this.
+        :return: pack() as a list of 32-bit ints, most significant
+            word first, with the last word padded with zeros
         """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
+        return self._words(4)
 
     # 5.3.10.1
     def pack_longints(self):
         """
-        Not implemented yet. There are Pythonic solutions to this.
+        :return: pack() as a list of 64-bit ints, most significant
+            word first, with the last word padded with zeros
         """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
+        return self._words(8)
+
+    def _words(self, size):
+        data = self.pack()
+        data.extend(bytes(-len(data) % size))
+        return [int.from_bytes(data[ii:ii + size], "big")
+                for ii in range(0, len(data), size)]
 
     # 5.3.10.2
     def do_pack(self):
         """
-        Not implemented yet. There are Pythonic solutions to this.
+        Not implemented. Declare uvm_fields instead.
         """
         raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
+            "declare uvm_fields, or use struct, pickle, json, or yaml.")
+
+    # 5.3.11.1
+    def unpack(self, data):
+        """
+        Set the fields declared in uvm_fields from the bytes
+        that pack() made.
+
+        :param data: bytes-like object
+        :return: Number of bytes used
+        """
+        codec = self._get_codec()
+        codec.unpack_from(self, data, 0)
+        return codec.size
+
+    # 5.3.11.1
+    def unpack_bytes(self, buffer, offset=0):
+        """
+        Set the fields from buffer at offset.
+
+        :param buffer: bytes-like object
+        :param offset: Byte offset in buffer
+        :return: Offset of the byte after this object
+        """
+        codec = self._uvm_codec
+        if codec is None:
+            self._get_codec()
+        codec.unpack_from(self, buffer, offset)
+        return offset + codec.size
+
+    # 5.3.11.1
+    def unpack_ints(self, words):
+        """
+        Set the fields from a list made by pack_ints()
+        """
+        return self._unwords(words, 4)
 
     # 5.3.11.1
-    def unpack(self):
+    def unpack_longints(self, words):
         """
-        Not implemented yet. There are Pythonic solutions to this.
+        Set the fields from a list made by pack_longints()
+        """
+        return self._unwords(words, 8)
+
+    def _unwords(self, words, size):
+        data = b"".join(word.to_bytes(size, "big") for word in words)
+        return self.unpack(data)
+
+    # 5.3.11.2
+    def do_unpack(self):
+        """
+        Not implemented. Declare uvm_fields instead.
         """
         raise error_classes.UsePythonMethod(
-            "use pickle, json, or yaml.")
+            "declare uvm_fields, or use struct, pickle, json, or yaml.")
 
     # 5.3.14.1
     def push_active_policy(self):
@@ -262,38 +475,6 @@ class uvm_object(utility_classes.uvm_void):
         """
         raise error_classes.UVMNotImplemented("policies not implemented yet")
 
-    # 5.3.11.1
-    def unpack_bytes(self):
-        """
-        Not implemented yet. There are Pythonic solutions to this.
-        """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
-
-    # 5.3.11.1
-    def unpack_ints(self):
-        """
-        Not implemented yet. There are Pythonic solutions to this.
-        """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
-
-    # 5.3.11.1
-    def unpack_longints(self):
-        """
-        Not implemented yet. There are Pythonic solutions to this.
-        """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
-
-    # 5.3.11.2
-    def do_unpack(self):
-        """
-        Not implemented yet. There are Pythonic solutions to this.
-        """
-        raise error_classes.UsePythonMethod(
-            "use struct, pickle, json, or yaml.")
-
     # 5.3.12
     def set_local(self):
         """
@@ -339,11 +520,42 @@ class uvm_policy:
 
 
 # 5.4.1
+class _TrState:
+    """
+    The recording state of a uvm_transaction, created the first
+    time one of the *_tr() or recording methods is called
+    """
+
+    __slots__ = ("stream", "handle", "parent_handle", "accept_time",
+                 "begin_time", "end_time")
+
+    def __init__(self):
+        self.stream = None
+        self.handle = 0
+        self.parent_handle = 0
+        self.accept_time = -1
+        self.begin_time = -1
+        self.end_time = -1
+
+    def __reduce__(self):
+        # Pickled and deep-copied transactions start unrecorded,
+        # and the stream's open files do not go with them
+        return _TrState, ()
+
+
 class uvm_transaction(uvm_object):
     """
     Transactions without interface to logging or waveforms.
+    With enable_recording() a transaction is written to a
+    uvm_tr_stream at each end_tr().
     """
 
+    __slots__ = ("_initiator", "transaction_id", "_tr_record")
+
+    # Python reuses id() values once objects are collected, so
+    # transaction IDs come from a counter instead.
+    _transaction_ids = itertools.count(1)
+
     # 5.4.2.1
     def __init__(self, name="", initiator=None):
         """
@@ -352,7 +564,14 @@ class uvm_transaction(uvm_object):
         """
         super().__init__(name)
         self.set_initiator(initiator)
-        self.transaction_id = id(self)
+        self.transaction_id = next(uvm_transaction._transaction_ids)
+        self._tr_record = None
+
+    def _recycle(self, name):
+        self._initiator = None
+        self._tr_record = None
+        self.transaction_id = next(uvm_transaction._transaction_ids)
+        super()._recycle(name)
 
     def set_id_info(self, other):
         """
@@ -381,82 +600,111 @@ class uvm_transaction(uvm_object):
         raise error_classes.UVMNotImplemented(
             'This method is not implemented at this time.')
 
+    def _tr_state(self):
+        if self._tr_record is None:
+            self._tr_record = _TrState()
+        return self._tr_record
+
     # 5.4.2.2
-    def accept_tr(self, time):
+    def accept_tr(self, accept_time=0):
         """
-        Not implemented
+        Mark the transaction accepted and call do_accept_tr()
+
+        :param accept_time: Time in sim steps, or 0 for now
         """
-        self.__not_implemented()
+        self._tr_state().accept_time = accept_time or get_sim_time("step")
+        self.do_accept_tr()
 
     # 5.4.2.3
     def do_accept_tr(self):
         """
-        Not implemented
+        Override to act when the transaction is accepted
         """
-        self.__not_implemented()
 
     # 5.4.2.5
-    def begin_tr(self, begin_time=0, parent_handle=None):
+    def begin_tr(self, begin_time=0, parent_handle=0):
         """
-        Not implemented
+        Start the transaction and call do_begin_tr()
+
+        :param begin_time: Time in sim steps, or 0 for now
+        :param parent_handle: get_tr_handle() of the parent
+            transaction, or 0 for none
+        :return: The transaction's handle, or 0 if recording is
+            not enabled
         """
-        self.__not_implemented()
+        state = self._tr_state()
+        state.begin_time = begin_time or get_sim_time("step")
+        state.end_time = -1
+        state.parent_handle = parent_handle
+        if state.stream is not None:
+            state.handle = state.stream.get_next_handle()
+        self.do_begin_tr()
+        return state.handle
 
     # 5.4.2.5
     def do_begin_tr(self):
         """
-        Not implemented
+        Override to act when the transaction begins
         """
-        self.__not_implemented()
 
     # 5.4.2.6
     def end_tr(self, end_time=0, free_handle=True):
         """
-        Not implemented
+        End the transaction, call do_end_tr() and record it if
+        recording is enabled
+
+        :param end_time: Time in sim steps, or 0 for now
+        :param free_handle: Set the handle back to 0 once recorded
         """
-        self.__not_implemented()
+        state = self._tr_state()
+        state.end_time = end_time or get_sim_time("step")
+        self.do_end_tr()
+        if state.stream is not None and state.handle:
+            state.stream.record(self, state.begin_time, state.end_time,
+                                state.parent_handle, state.handle)
+            if free_handle:
+                state.handle = 0
 
     # 5.4.2.7
     def do_end_tr(self):
         """
-        Not implemented
+        Override to act when the transaction ends
         """
-        self.__not_implemented()
 
     # 5.4.2.8
     def get_tr_handle(self):
         """
-        Not implemented
+        :return: Handle from begin_tr() until the transaction is
+            recorded, or 0
         """
-        self.__not_implemented()
+        return 0 if self._tr_record is None else self._tr_record.handle
 
     # 5.4.2.9
-    def enable_recording(self):
+    def enable_recording(self, stream):
         """
-        Not implemented
+        Record this transaction into stream at each end_tr()
+
+        :param stream: uvm_tr_stream from uvm_tr_database.open_stream()
         """
-        self.__not_implemented()
+        self._tr_state().stream = stream
 
     # 5.4.2.10
     def disable_recording(self):
-        """
-        Not implemented
-        """
-        self.__not_implemented()
+        self._tr_state().stream = None
 
     # 5.4.2.11
     def is_recording_enabled(self):
-        """
-        Not implemented
-        """
-        self.__not_implemented()
+        return (self._tr_record is not None
+                and self._tr_record.stream is not None)
 
     # 5.4.2.12
     def is_active(self):
         """
-        Not implemented
+        :return: True between begin_tr() and end_tr()
         """
-        self.__not_implemented()
+        state = self._tr_record
+        return (state is not None and state.begin_time != -1
+                and state.end_time == -1)
 
     # 5.4.2.13
     def get_event_pool(self):
@@ -468,23 +716,26 @@ class uvm_transaction(uvm_object):
     # 5.4.2.16
     def get_accept_time(self):
         """
-        Not implemented
+        :return: Accept time, or -1 if not accepted
         """
-        self.__not_implemented()
+        return -1 if self._tr_record is None \
+            else self._tr_record.accept_time
 
     # 5.4.2.16
     def get_begin_time(self):
         """
-        Not implemented
+        :return: Begin time, or -1 if not begun
         """
-        self.__not_implemented()
+        return -1 if self._tr_record is None \
+            else self._tr_record.begin_time
 
     # 5.4.2.16
     def get_end_time(self):
         """
-        Not implemented
+        :return: End time, or -1 if not ended
         """
-        self.__not_implemented()
+        return -1 if self._tr_record is None \
+            else self._tr_record.end_time
 
     # 5.4.2.17
     def set_transaction_id(self, txn_id):
@@ -0,0 +1,427 @@
+# Recording classes
+#
+# Section 7 of the IEEE-UVM Reference Manual (1800.2-2017) records
+# transactions into a database that a waveform viewer reads. pyuvm
+# does not run in the simulator, so uvm_tr_database writes its own
+# files and uvm_tr_stream_reader reads them back.
+#
+# Each stream is two append-only files in the database directory:
+#
+# <stream>.trs  The records. Each is a fixed header followed by the
+#               transaction's fields, packed with its uvm_fields
+#               codec or pickled if it has none.
+# <stream>.tri  The time index. Each entry is the end time, begin
+#               time and file offset of one record.
+#
+# Records are written at end_tr(), so the end times in the index
+# rise with simulation time. The reader memory-maps both files and
+# bisects the index to find the transactions in a time range
+# without reading the records outside it.
+
+import itertools
+import mmap
+import os
+import pickle
+import struct
+from collections import namedtuple
+
+from cocotb.utils import get_sim_time
+
+from pyuvm import error_classes
+from pyuvm.s05_base_classes import uvm_object
+
+# handle, parent handle, transaction_id, begin, end, flags, length
+_RECORD = struct.Struct("<QQQqqII")
+# end, begin, record offset
+_INDEX = struct.Struct("<qqQ")
+# magic, longest transaction, 1 if an end time went backwards
+_INDEX_HEADER = struct.Struct("<8sqq")
+_RECORDS_MAGIC = b"PYUVMTRS"
+_INDEX_MAGIC = b"PYUVMTRI"
+_PICKLED = 1
+
+uvm_tr_record = namedtuple(
+    "uvm_tr_record", ["handle", "parent_handle", "transaction_id",
+                      "begin_time", "end_time", "pickled", "data"])
+uvm_tr_record.__doc__ = """
+One recorded transaction. data is a memoryview of the packed or
+pickled fields, valid until the reader is closed.
+"""
+
+
+class uvm_tr_database(uvm_object):
+    """
+    7.1
+    A directory of transaction streams. Every stream opened
+    with open_stream() writes its own pair of files there.
+    """
+
+    def __init__(self, name="uvm_tr_database", directory="."):
+        """
+        :param name: Object name
+        :param directory: Directory for the stream files, created
+            by open_db() if it does not exist
+        """
+        super().__init__(name)
+        self.directory = directory
+        self._streams = {}
+        self._handles = itertools.count(1)
+        self._open = False
+
+    # 7.1.2.1
+    def open_db(self):
+        """
+        Create the directory if needed. open_stream() calls this.
+
+        :return: True
+        """
+        if not self._open:
+            os.makedirs(self.directory, exist_ok=True)
+            self._open = True
+        return True
+
+    # 7.1.2.2
+    def close_db(self):
+        """
+        Close every stream and the database.
+
+        :return: True
+        """
+        for stream in list(self._streams.values()):
+            stream.close()
+        self._streams.clear()
+        self._open = False
+        return True
+
+    # 7.1.2.3
+    def is_open(self):
+        return self._open
+
+    # 7.1.3.1
+    def open_stream(self, name, scope="", type_name="",
+                    buffer_size=1 << 20):
+        """
+        Open a stream, or return the stream already open with this
+        scope and name. A new stream replaces any files a previous
+        run left with the same names.
+
+        :param name: Stream name
+        :param scope: Full name of the component that records to
+            it, which prefixes the file names
+        :param type_name: Optional type name of the transactions
+        :param buffer_size: Bytes of records held before a write
+        :return: uvm_tr_stream
+        """
+        full_name = f"{scope}.{name}" if scope else name
+        if os.sep in full_name or (os.altsep and os.altsep in full_name):
+            raise error_classes.UVMError(
+                f"Stream name {full_name} cannot contain a path separator")
+        stream = self._streams.get(full_name)
+        if stream is None:
+            self.open_db()
+            stream = uvm_tr_stream(name, self, scope, type_name,
+                                   buffer_size)
+            self._streams[full_name] = stream
+        return stream
+
+    # 7.1.3.2
+    def get_streams(self):
+        """
+        :return: List of the open streams
+        """
+        return list(self._streams.values())
+
+    def get_path(self, stream_name):
+        """
+        :param stream_name: Stream name, with its scope if it has one
+        :return: Path of the stream's record file
+        """
+        return os.path.join(self.directory, f"{stream_name}.trs")
+
+    def _next_handle(self):
+        return next(self._handles)
+
+    def _remove(self, stream):
+        self._streams.pop(stream.get_full_name(), None)
+
+
+class uvm_tr_stream(uvm_object):
+    """
+    7.3
+    An append-only file of transaction records and its time index.
+    Get one from uvm_tr_database.open_stream().
+
+    Records collect in a preallocated buffer, and a transaction with
+    uvm_fields is packed straight into it, so record() does no file
+    I/O and allocates nothing until the buffer fills. Call flush()
+    to make the records so far visible to a reader before close().
+    """
+
+    def __init__(self, name, db, scope="", type_name="",
+                 buffer_size=1 << 20):
+        super().__init__(name)
+        self._db = db
+        self._scope = scope
+        self._type_name = type_name
+        path = db.get_path(self.get_full_name())
+        self._records = open(path, "wb")
+        self._index = open(path[:-1] + "i", "wb")
+        self._records.write(_RECORDS_MAGIC)
+        self._offset = len(_RECORDS_MAGIC)
+        self._index.write(_INDEX_HEADER.pack(_INDEX_MAGIC, 0, 0))
+        self._buffer = bytearray(buffer_size)
+        self._used = 0
+        self._index_buffer = bytearray(
+            buffer_size // _RECORD.size * _INDEX.size)
+        self._index_used = 0
+        self._last_end = None
+        self._max_duration = 0
+        self._unsorted = False
+        self.count = 0
+
+    def get_full_name(self):
+        name = self.get_name()
+        return f"{self._scope}.{name}" if self._scope else name
+
+    # 7.3.3.1
+    def get_db(self):
+        return self._db
+
+    # 7.3.3.2
+    def get_scope(self):
+        return self._scope
+
+    # 7.3.3.3
+    def get_stream_type_name(self):
+        return self._type_name
+
+    # 7.3.4.2
+    def close(self):
+        """
+        Write the remaining records and close the files
+        """
+        if self._records is None:
+            return
+        self.flush()
+        self._records.close()
+        self._index.close()
+        self._records = None
+        self._index = None
+        self._db._remove(self)
+
+    # 7.3.4.3
+    def free(self):
+        self.close()
+
+    def is_open(self):
+        return self._records is not None
+
+    def get_next_handle(self):
+        """
+        :return: A handle unique in this stream's database
+        """
+        return self._db._next_handle()
+
+    def record(self, tr, begin_time=None, end_time=None,
+               parent_handle=0, handle=None):
+        """
+        Append one transaction. end_tr() calls this for a
+        transaction that has recording enabled, and a monitor can
+        call it directly.
+
+        :param tr: uvm_transaction to record
+        :param begin_time: Begin time, or None for now
+        :param end_time: End time, or None for now
+        :param parent_handle: Handle of the parent transaction,
+            or 0 for none
+        :param handle: Handle from get_next_handle(), or None for
+            a new one
+        :return: The record's handle
+        """
+        if self._records is None:
+            raise error_classes.UVMError(
+                f"Stream {self.get_full_name()} is closed")
+        if end_time is None:
+            end_time = get_sim_time("step")
+        if begin_time is None:
+            begin_time = end_time
+        if handle is None:
+            handle = self._db._next_handle()
+        codec = tr._uvm_codec
+        if codec is None:
+            data = pickle.dumps(tr, pickle.HIGHEST_PROTOCOL)
+            size = len(data)
+            flags = _PICKLED
+        else:
+            size = codec.size
+            flags = 0
+        needed = _RECORD.size + size
+        if self._used + needed > len(self._buffer):
+            self.flush()
+            if needed > len(self._buffer):
+                self._buffer = bytearray(needed)
+        buffer = self._buffer
+        used = self._used
+        _RECORD.pack_into(buffer, used, handle, parent_handle,
+                          tr.get_transaction_id(), begin_time, end_time,
+                          flags, size)
+        if codec is None:
+            buffer[used + _RECORD.size:used + needed] = data
+        else:
+            codec.pack_into(tr, buffer, used + _RECORD.size)
+        self._used = used + needed
+        if self._index_used == len(self._index_buffer):
+            self._index_buffer.extend(bytes(len(self._index_buffer)
+                                            or _INDEX.size))
+        _INDEX.pack_into(self._index_buffer, self._index_used,
+                         end_time, begin_time, self._offset + used)
+        self._index_used += _INDEX.size
+        if self._last_end is not None and end_time < self._last_end:
+            self._unsorted = True
+        self._last_end = end_time
+        if end_time - begin_time > self._max_duration:
+            self._max_duration = end_time - begin_time
+        self.count += 1
+        return handle
+
+    def flush(self):
+        """
+        Write the buffered records and index entries to the files
+        """
+        if self._records is None:
+            return
+        with memoryview(self._buffer) as view:
+            self._records.write(view[:self._used])
+        self._offset += self._used
+        self._used = 0
+        with memoryview(self._index_buffer) as view:
+            self._index.write(view[:self._index_used])
+        self._index_used = 0
+        self._index.seek(0)
+        self._index.write(_INDEX_HEADER.pack(
+            _INDEX_MAGIC, self._max_duration, int(self._unsorted)))
+        self._index.seek(0, os.SEEK_END)
+        self._records.flush()
+        self._index.flush()
+
+
+class uvm_tr_stream_reader:
+    """
+    Reads a stream that uvm_tr_stream wrote. Both files are
+    memory-mapped, so opening a stream reads nothing, and
+    transactions() reads only the index entries and records in
+    its time range::
+
+        with uvm_tr_stream_reader(db.get_path("bus")) as reader:
+            for record in reader.transactions(1_000, 2_000):
+                item = reader.unpack(record, BusItem)
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the stream's .trs file
+        """
+        self.path = path
+        self._records = self._map(path, _RECORDS_MAGIC)
+        self._index = self._map(path[:-1] + "i", _INDEX_MAGIC)
+        _, self.max_duration, unsorted = \
+            _INDEX_HEADER.unpack_from(self._index)
+        self.sorted = not unsorted
+        count = (len(self._index) - _INDEX_HEADER.size) // _INDEX.size
+        self._views = [memoryview(self._index)]
+        self._views.append(self._views[0][
+            _INDEX_HEADER.size:_INDEX_HEADER.size + count * _INDEX.size])
+        # end, begin and offset of entry n are at 3n, 3n + 1, 3n + 2
+        self._ends = self._views[1].cast("q")
+        self._views.append(self._ends)
+
+    @staticmethod
+    def _map(path, magic):
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(magic)] != magic:
+            mapped.close()
+            raise error_classes.UVMError(
+                f"{path} is not a pyuvm transaction stream")
+        return mapped
+
+    def __len__(self):
+        return len(self._ends) // 3
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the files. Release the data of any records still
+        in use first.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._index.close()
+        self._records.close()
+
+    def _first_ending_at(self, time):
+        # Index of the first entry with an end time >= time
+        ends = self._ends
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if ends[3 * mid] < time:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _record(self, entry):
+        offset = self._ends[3 * entry + 2]
+        (handle, parent, txn_id, begin, end, flags,
+         size) = _RECORD.unpack_from(self._records, offset)
+        start = offset + _RECORD.size
+        data = memoryview(self._records)[start:start + size]
+        return uvm_tr_record(handle, parent, txn_id, begin, end,
+                             bool(flags & _PICKLED), data)
+
+    def __iter__(self):
+        for entry in range(len(self)):
+            yield self._record(entry)
+
+    def transactions(self, start_time, end_time):
+        """
+        Yield the records of the transactions that overlap
+        [start_time, end_time], in the order they ended.
+        """
+        ends = self._ends
+        if self.sorted:
+            first = self._first_ending_at(start_time)
+            # A transaction that began in range ends at most
+            # max_duration after end_time
+            last = self._first_ending_at(end_time + self.max_duration + 1)
+        else:
+            first, last = 0, len(self)
+        for entry in range(first, last):
+            if (ends[3 * entry + 1] <= end_time
+                    and ends[3 * entry] >= start_time):
+                yield self._record(entry)
+
+    def unpack(self, record, item_type=None):
+        """
+        Rebuild a recorded transaction.
+
+        :param record: uvm_tr_record from this reader
+        :param item_type: The class that was recorded. Not needed
+            for a pickled record.
+        :return: The transaction
+        """
+        if record.pickled:
+            return pickle.loads(record.data)
+        if item_type is None:
+            raise error_classes.UVMError(
+                "Unpacking a packed record needs its item_type")
+        item = item_type.create("tr")
+        item.unpack_bytes(record.data)
+        item.set_transaction_id(record.transaction_id)
+        return item
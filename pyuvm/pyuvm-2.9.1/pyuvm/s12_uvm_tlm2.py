@@ -0,0 +1,395 @@
+# UVM TLM 2
+# 12.3
+#
+# TLM 2 moves a generic payload between an initiator and a target
+# through sockets. The blocking interface is b_transport(). The
+# non-blocking interface is nb_transport_fw() from initiator to target
+# and nb_transport_bw() from target back to initiator.
+#
+# The SystemVerilog UVM passes the phase and delay by reference. pyuvm
+# returns them instead, the same way try_get() returns (success, data):
+#
+#   delay = await socket.b_transport(gp, delay)
+#   sync, phase, delay = socket.nb_transport_fw(gp, phase, delay)
+#
+# The payload data is held in a memoryview over the caller's buffer.
+# Initiators, interconnect models and targets can slice it and pass
+# it along without copying the bytes.
+#
+# This lives in its own module because the generic payload is a
+# uvm_sequence_item, so it can also be sent through a sequencer.
+
+from enum import IntEnum
+from pyuvm.s12_uvm_tlm_interfaces import uvm_port_base, uvm_export_base
+from pyuvm.s14_15_python_sequences import uvm_sequence_item
+from pyuvm.error_classes import UVMTLMConnectionError
+
+
+# 12.3.4.1.1
+class uvm_tlm_command_e(IntEnum):
+    UVM_TLM_READ_COMMAND = 0
+    UVM_TLM_WRITE_COMMAND = 1
+    UVM_TLM_IGNORE_COMMAND = 2
+
+
+# 12.3.4.1.2
+class uvm_tlm_response_status_e(IntEnum):
+    UVM_TLM_OK_RESPONSE = 1
+    UVM_TLM_INCOMPLETE_RESPONSE = 0
+    UVM_TLM_GENERIC_ERROR_RESPONSE = -1
+    UVM_TLM_ADDRESS_ERROR_RESPONSE = -2
+    UVM_TLM_COMMAND_ERROR_RESPONSE = -3
+    UVM_TLM_BURST_ERROR_RESPONSE = -4
+    UVM_TLM_BYTE_ENABLE_ERROR_RESPONSE = -5
+
+
+# 12.3.3.1
+class uvm_tlm_phase_e(IntEnum):
+    UNINITIALIZED_PHASE = 0
+    BEGIN_REQ = 1
+    END_REQ = 2
+    BEGIN_RESP = 3
+    END_RESP = 4
+
+
+# 12.3.3.2
+class uvm_tlm_sync_e(IntEnum):
+    UVM_TLM_ACCEPTED = 0
+    UVM_TLM_UPDATED = 1
+    UVM_TLM_COMPLETED = 2
+
+
+# 12.3.4.2
+class uvm_tlm_generic_payload(uvm_sequence_item):
+    """
+    The TLM 2 generic payload. The data and byte enables are
+    memoryviews over the buffers passed to set_data() and
+    set_byte_enable(), so no bytes are copied when the payload
+    is passed along or sliced. Read commands need a writable
+    buffer such as a bytearray.
+    """
+
+    # 12.3.4.2.3
+    def __init__(self, name="generic_payload"):
+        super().__init__(name)
+        self._address = 0
+        self._command = uvm_tlm_command_e.UVM_TLM_IGNORE_COMMAND
+        self._data = memoryview(bytearray())
+        self._length = 0
+        self._response_status = \
+            uvm_tlm_response_status_e.UVM_TLM_INCOMPLETE_RESPONSE
+        self._dmi = False
+        self._byte_enable = None
+        self._byte_enable_length = 0
+        self._streaming_width = 0
+
+    def __str__(self):
+        return (f"{self.get_name()}: {self._command.name} "
+                f"addr=0x{self._address:x} len={self._length} "
+                f"{self._response_status.name}")
+
+    # 12.3.4.2.10
+    def get_command(self):
+        return self._command
+
+    # 12.3.4.2.11
+    def set_command(self, command):
+        self._command = uvm_tlm_command_e(command)
+
+    # 12.3.4.2.12
+    def is_read(self):
+        return self._command == uvm_tlm_command_e.UVM_TLM_READ_COMMAND
+
+    # 12.3.4.2.13
+    def set_read(self):
+        self._command = uvm_tlm_command_e.UVM_TLM_READ_COMMAND
+
+    # 12.3.4.2.14
+    def is_write(self):
+        return self._command == uvm_tlm_command_e.UVM_TLM_WRITE_COMMAND
+
+    # 12.3.4.2.15
+    def set_write(self):
+        self._command = uvm_tlm_command_e.UVM_TLM_WRITE_COMMAND
+
+    # 12.3.4.2.16
+    def set_address(self, addr):
+        self._address = addr
+
+    # 12.3.4.2.17
+    def get_address(self):
+        return self._address
+
+    # 12.3.4.2.18
+    def get_data(self):
+        """
+        :return: memoryview of the data. Slicing it does not copy.
+        """
+        return self._data
+
+    # 12.3.4.2.19
+    def set_data(self, data):
+        """
+        Point the payload at data without copying it. Also sets
+        the data length to the length of data in bytes.
+
+        :param data: bytearray, memoryview or other contiguous
+            bytes-like object. An array of wider items, such as
+            array("I"), is viewed as its bytes.
+        """
+        self._data = memoryview(data).cast("B")
+        self._length = self._data.nbytes
+
+    # 12.3.4.2.20
+    def get_data_length(self):
+        return self._length
+
+    # 12.3.4.2.21
+    def set_data_length(self, length):
+        self._length = length
+
+    # 12.3.4.2.22
+    def get_streaming_width(self):
+        return self._streaming_width
+
+    # 12.3.4.2.23
+    def set_streaming_width(self, width):
+        self._streaming_width = width
+
+    # 12.3.4.2.24
+    def get_byte_enable(self):
+        """
+        :return: memoryview of the byte enables or None
+        """
+        return self._byte_enable
+
+    # 12.3.4.2.25
+    def set_byte_enable(self, byte_enable):
+        if byte_enable is None:
+            self._byte_enable = None
+            self._byte_enable_length = 0
+            return
+        self._byte_enable = memoryview(byte_enable).cast("B")
+        self._byte_enable_length = self._byte_enable.nbytes
+
+    # 12.3.4.2.26
+    def get_byte_enable_length(self):
+        return self._byte_enable_length
+
+    # 12.3.4.2.27
+    def set_byte_enable_length(self, length):
+        self._byte_enable_length = length
+
+    # 12.3.4.2.28
+    def set_dmi_allowed(self, dmi):
+        self._dmi = dmi
+
+    # 12.3.4.2.29
+    def is_dmi_allowed(self):
+        return self._dmi
+
+    # 12.3.4.2.30
+    def get_response_status(self):
+        return self._response_status
+
+    # 12.3.4.2.31
+    def set_response_status(self, status):
+        self._response_status = uvm_tlm_response_status_e(status)
+
+    # 12.3.4.2.32
+    def is_response_ok(self):
+        return self._response_status > 0
+
+    # 12.3.4.2.33
+    def is_response_error(self):
+        return self._response_status <= 0
+
+    # 12.3.4.2.34
+    def get_response_string(self):
+        return self._response_status.name
+
+    def slice(self, offset, length):
+        """
+        Return a new payload for length bytes starting at offset.
+        The new payload shares this payload's data buffer, so an
+        interconnect can split a burst without copying.
+
+        :param offset: Byte offset into this payload
+        :param length: Number of bytes
+        :return: uvm_tlm_generic_payload
+        """
+        part = self.__class__(self.get_name())
+        part._command = self._command
+        part._address = self._address + offset
+        part._data = self._data[offset:offset + length]
+        part._length = length
+        if self._byte_enable is not None:
+            be_len = self._byte_enable_length
+            if be_len >= offset + length:
+                part._byte_enable = \
+                    self._byte_enable[offset:offset + length]
+                part._byte_enable_length = length
+            else:
+                # Byte enables shorter than the data repeat
+                part._byte_enable = self._byte_enable
+                part._byte_enable_length = be_len
+        part._streaming_width = self._streaming_width
+        part._dmi = self._dmi
+        part.set_id_info(self)
+        return part
+
+    def do_copy(self, rhs):
+        """
+        Copies the fields. The data and byte enables are copied
+        into new buffers. Use slice() to share the buffer.
+        """
+        super().do_copy(rhs)
+        self._address = rhs._address
+        self._command = rhs._command
+        self._data = memoryview(bytearray(rhs._data))
+        self._length = rhs._length
+        self._response_status = rhs._response_status
+        self._dmi = rhs._dmi
+        if rhs._byte_enable is None:
+            self._byte_enable = None
+        else:
+            self._byte_enable = memoryview(bytearray(rhs._byte_enable))
+        self._byte_enable_length = rhs._byte_enable_length
+        self._streaming_width = rhs._streaming_width
+
+    def do_compare(self, rhs):
+        return (self._address == rhs._address
+                and self._command == rhs._command
+                and self._length == rhs._length
+                and self._data[:self._length] == rhs._data[:rhs._length]
+                and self._byte_enable_length == rhs._byte_enable_length
+                and self._byte_enable == rhs._byte_enable
+                and self._response_status == rhs._response_status)
+
+
+# 12.3.5 Sockets
+#
+# Initiator sockets are ports and target sockets are exports so
+# they connect, check and resolve like the TLM 1 classes. A target
+# socket binds its implementation's methods onto itself when it is
+# built, so a resolved initiator socket calls the target directly.
+
+# 12.3.5.1
+class uvm_tlm_b_initiator_socket(uvm_port_base):
+    """
+    Blocking initiator socket
+    """
+
+    async def b_transport(self, trans, delay=0):
+        """
+        Send trans to the target and wait for it to complete.
+
+        :param trans: uvm_tlm_generic_payload
+        :param delay: Annotated delay
+        :return: The delay as updated by the target
+        """
+        try:
+            return await self.export.b_transport(trans, delay)
+        except AttributeError:
+            raise UVMTLMConnectionError(
+                "Missing or wrong export in"
+                f" {self.get_full_name()}. Did you connect it?")
+
+
+# 12.3.5.2
+class uvm_tlm_b_target_socket(uvm_export_base):
+    """
+    Blocking target socket. imp, or the parent if imp is None,
+    must implement async b_transport(trans, delay) and return
+    the updated delay.
+    """
+
+    def __init__(self, name, parent, imp=None):
+        super().__init__(name, parent)
+        self.imp = parent if imp is None else imp
+        if not hasattr(self.imp, "b_transport"):
+            raise UVMTLMConnectionError(
+                f"{self.imp} must implement 'b_transport()'"
+                f" to use {self.get_full_name()}")
+        self.b_transport = self.imp.b_transport
+
+
+# 12.3.5.3
+class uvm_tlm_nb_initiator_socket(uvm_port_base):
+    """
+    Non-blocking initiator socket. imp, or the parent if imp is
+    None, must implement nb_transport_bw(trans, phase, delay) and
+    return (sync, phase, delay).
+    """
+
+    def __init__(self, name, parent, imp=None):
+        super().__init__(name, parent)
+        self.imp = parent if imp is None else imp
+        if not hasattr(self.imp, "nb_transport_bw"):
+            raise UVMTLMConnectionError(
+                f"{self.imp} must implement 'nb_transport_bw()'"
+                f" to use {self.get_full_name()}")
+        self.nb_transport_bw = self.imp.nb_transport_bw
+
+    def nb_transport_fw(self, trans, phase, delay=0):
+        """
+        Send trans to the target on the forward path.
+
+        :param trans: uvm_tlm_generic_payload
+        :param phase: uvm_tlm_phase_e
+        :param delay: Annotated delay
+        :return: (uvm_tlm_sync_e, phase, delay)
+        """
+        try:
+            return self.export.nb_transport_fw(trans, phase, delay)
+        except AttributeError:
+            raise UVMTLMConnectionError(
+                "Missing or wrong export in"
+                f" {self.get_full_name()}. Did you connect it?")
+
+    def connect(self, export):
+        super().connect(export)
+        export.bind_backward_path(self)
+
+
+# 12.3.5.4
+class uvm_tlm_nb_target_socket(uvm_export_base):
+    """
+    Non-blocking target socket. imp, or the parent if imp is
+    None, must implement nb_transport_fw(trans, phase, delay)
+    and return (sync, phase, delay). The target calls
+    nb_transport_bw() on this socket to reach the initiator.
+    """
+
+    def __init__(self, name, parent, imp=None):
+        super().__init__(name, parent)
+        self.imp = parent if imp is None else imp
+        if not hasattr(self.imp, "nb_transport_fw"):
+            raise UVMTLMConnectionError(
+                f"{self.imp} must implement 'nb_transport_fw()'"
+                f" to use {self.get_full_name()}")
+        self.nb_transport_fw = self.imp.nb_transport_fw
+        self.initiator = None
+
+    def bind_backward_path(self, initiator):
+        """
+        Called when an initiator socket connects to this socket.
+        Binds the initiator's backward implementation directly.
+
+        :param initiator: uvm_tlm_nb_initiator_socket
+        """
+        self.initiator = initiator
+        self.nb_transport_bw = initiator.nb_transport_bw
+
+    def nb_transport_bw(self, trans, phase, delay=0):
+        """
+        Send trans back to the initiator.
+
+        :return: (uvm_tlm_sync_e, phase, delay)
+        """
+        raise UVMTLMConnectionError(
+            f"No initiator socket connected to {self.get_full_name()}")
+
+
+uvm_port_base.add_forwarding_methods(uvm_tlm_b_initiator_socket,
+                                     uvm_tlm_nb_initiator_socket)
@@ -25,8 +25,11 @@
 
 from pyuvm.s13_uvm_component import uvm_component
 from pyuvm.error_classes import UVMTLMConnectionError
-from pyuvm.utility_classes import UVMQueue, FIFO_DEBUG
+from pyuvm.utility_classes import UVMQueue, SpillQueue, FIFO_DEBUG
 from cocotb.queue import QueueEmpty, QueueFull
+from cocotb.triggers import Event
+from cocotb.utils import get_sim_time
+from enum import IntEnum
 
 
 # 12.2.2
@@ -85,9 +88,11 @@ class uvm_port_base(uvm_export_base):
                          "try_put", "try_get", "try_peek",
                          "can_put", "can_get", "can_peek",
                          "transport", "nb_transport",
+                         "b_transport", "nb_transport_fw",
                          "write",
                          "put_req", "put_response", "get_next_item",
-                         "item_done", "get_response"]
+                         "item_done", "get_response",
+                         "get_next_items", "items_done"]
 
     def __init__(self, name, parent):
         super().__init__(name, parent)
@@ -113,6 +118,70 @@ class uvm_port_base(uvm_export_base):
                     f"{export} must implement '{needed}()'"
                     f" to connect to a {self.__class__}")
 
+    # The port classes below implement their TLM methods by
+    # forwarding to self.export. add_forwarding_methods() records
+    # those functions so resolve_bindings() can tell a forwarding
+    # method from one that a subclass implements itself.
+    _forwarding_methods = set()
+
+    @classmethod
+    def add_forwarding_methods(cls, *port_classes):
+        """
+        Record the TLM methods defined in port_classes as methods
+        that only forward to the export.
+
+        :param port_classes: Port classes whose methods forward
+        :return: None
+        """
+        for port_class in port_classes:
+            for name, method in vars(port_class).items():
+                if name in cls.__tlm_method_list:
+                    cls._forwarding_methods.add(method)
+
+    def _forwards(self, method):
+        return getattr(type(self), method, None) in self._forwarding_methods
+
+    def resolve_bindings(self):
+        """
+        Follow the export chain for each TLM method to the
+        implementation and bind that implementation's method
+        directly onto this port. A call through the port is then
+        a single function call. Ports that reach no implementation
+        are reported here rather than on first use.
+
+        uvm_root calls this on every component after the connect phase.
+        """
+        forwarded = [method for method in self.needed_methods
+                     if self._forwards(method)]
+        if len(forwarded) < len(self.needed_methods):
+            # This port implements some of its methods itself,
+            # so it is being used as an export.
+            return
+        if self.export is None:
+            if len(self.provided_to) == 0:
+                self.logger.warning("Port is not connected")
+            return
+        for method in forwarded:
+            target = self.export
+            while (isinstance(target, uvm_port_base)
+                   and target._forwards(method)
+                   and target.export is not None):
+                target = target.export
+            if isinstance(target, uvm_port_base) and target._forwards(method):
+                self.logger.warning(
+                    f"{method}() reaches unconnected port"
+                    f" {target.get_full_name()}")
+                continue
+            self.__dict__[method] = getattr(target, method)
+
+    def _unbind(self):
+        """Remove resolved bindings here and in ports that use this one"""
+        for method in self.needed_methods:
+            self.__dict__.pop(method, None)
+        for port in self.provided_to.values():
+            if isinstance(port, uvm_port_base):
+                port._unbind()
+
     def connect(self, export):
         """
         Attach this port to the associated export.
@@ -121,6 +190,7 @@ class uvm_port_base(uvm_export_base):
         :return:
         """
         self.check_export(export)
+        self._unbind()
         try:
             self.export = export
             self.connected_to[export.get_full_name()] = export
@@ -430,7 +500,46 @@ class uvm_analysis_port(uvm_port_base):
 
     def connect(self, export):
         self.check_export(export)
+        self._unbind()
         self.subscribers.append(export)
+        export.provided_to[self.get_full_name()] = self
+
+    def _writers(self):
+        """
+        The write() methods at the end of every subscriber chain.
+        Analysis ports that are subscribers are expanded in place.
+        """
+        writers = []
+        for export in self.subscribers:
+            if (isinstance(export, uvm_analysis_port)
+                    and type(export).write is uvm_analysis_port.write):
+                writers.extend(export._writers())
+            else:
+                writers.append(export.write)
+        return writers
+
+    def resolve_bindings(self):
+        """
+        Replace write() with a direct call to the subscribers'
+        write() methods. Unconnected analysis ports are legal.
+        """
+        if type(self).write is not uvm_analysis_port.write:
+            return
+        writers = self._writers()
+        if len(writers) == 1:
+            self.write = writers[0]
+        else:
+            def write(datum):
+                for writer in writers:
+                    writer(datum)
+            self.write = write
+
+
+uvm_port_base.add_forwarding_methods(
+    uvm_blocking_put_port, uvm_nonblocking_put_port,
+    uvm_blocking_get_port, uvm_nonblocking_get_port,
+    uvm_blocking_peek_port, uvm_nonblocking_peek_port,
+    uvm_blocking_transport_port, uvm_nonblocking_transport_port)
 
 
 class uvm_nonblocking_put_export(uvm_export_base):
@@ -561,10 +670,52 @@ class uvm_QueueAccessor:
         self.ap = ap
 
 
+class uvm_LazyExport:
+    """
+    Creates a FIFO export the first time it is accessed and
+    stores it in the FIFO so later accesses are plain attribute
+    lookups. The export class is looked up by name so that
+    FIFO subclasses can override it. The export gets the FIFO's
+    queue and the analysis port named by ap_name.
+    """
+
+    def __init__(self, export_cls_name, ap_name):
+        self.export_cls_name = export_cls_name
+        self.ap_name = ap_name
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, fifo, owner=None):
+        if fifo is None:
+            return self
+        export_cls = getattr(fifo, self.export_cls_name)
+        export = export_cls(self.name, fifo, fifo.queue,
+                            getattr(fifo, self.ap_name))
+        fifo.__dict__[self.name] = export
+        return export
+
+
+class uvm_LazyAnalysisPort:
+    """
+    Creates a FIFO analysis port the first time it is accessed.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, fifo, owner=None):
+        if fifo is None:
+            return self
+        ap = uvm_analysis_port(self.name, fifo)
+        fifo.__dict__[self.name] = ap
+        return ap
+
+
 class uvm_tlm_fifo_base(uvm_component):
     """
-    Declares and instantiate the exports needed to communicate
-    through the Queue.
+    Declares the exports needed to communicate through the Queue.
+    Each export is instantiated the first time it is used.
     """
 
     class uvm_BlockingPutExport(uvm_QueueAccessor, uvm_blocking_put_export):
@@ -651,39 +802,36 @@ class uvm_tlm_fifo_base(uvm_component):
     class uvm_GetPeekExport(uvm_GetExport, uvm_PeekExport):
         ...
 
+    # The exports and analysis ports are created on first access.
+    # Most FIFOs only ever use one or two of them, so there is no
+    # point paying for fifteen components per FIFO.
+    get_ap = uvm_LazyAnalysisPort()
+    put_ap = uvm_LazyAnalysisPort()
+
+    blocking_put_export = uvm_LazyExport("uvm_BlockingPutExport", "put_ap")
+    nonblocking_put_export = uvm_LazyExport("uvm_NonBlockingPutExport",
+                                            "put_ap")
+    put_export = uvm_LazyExport("uvm_PutExport", "put_ap")
+
+    blocking_get_export = uvm_LazyExport("uvm_BlockingGetExport", "get_ap")
+    nonblocking_get_export = uvm_LazyExport("uvm_NonBlockingGetExport",
+                                            "get_ap")
+    get_export = uvm_LazyExport("uvm_GetExport", "get_ap")
+
+    blocking_peek_export = uvm_LazyExport("uvm_BlockingPeekExport", "get_ap")
+    nonblocking_peek_export = uvm_LazyExport("uvm_NonBlockingPeekExport",
+                                             "get_ap")
+    peek_export = uvm_LazyExport("uvm_PeekExport", "get_ap")
+
+    blocking_get_peek_export = uvm_LazyExport("uvm_BlockingGetPeekExport",
+                                              "get_ap")
+    nonblocking_get_peek_export = uvm_LazyExport(
+        "uvm_NonBlockingGetPeekExport", "get_ap")
+    get_peek_export = uvm_LazyExport("uvm_GetPeekExport", "get_ap")
+
     def __init__(self, name, parent, maxsize=1):
         super().__init__(name, parent)
         self.queue = UVMQueue(maxsize=maxsize)
-        self.get_ap = uvm_analysis_port("get_ap", self)
-        self.put_ap = uvm_analysis_port("put_ap", self)
-
-        self.blocking_put_export = self.uvm_BlockingPutExport("blocking_put_export",  # noqa: E501
-                                                              self, self.queue,
-                                                              self.put_ap)
-        self.nonblocking_put_export = self.uvm_NonBlockingPutExport("nonblocking_put_export",  # noqa: E501
-                                                                    self, self.queue, self.put_ap)  # noqa: E501
-        self.put_export = self.uvm_PutExport("put_export", self, self.queue, self.put_ap)  # noqa: E501
-
-        self.blocking_get_export = self.uvm_BlockingGetExport("blocking_get_export", self,  # noqa: E501
-                                                              self.queue, self.get_ap)  # noqa: E501
-        self.nonblocking_get_export = self.uvm_NonBlockingGetExport("nonblocking_get_export", self,  # noqa: E501
-                                                                    self.queue, self.put_ap)  # noqa: E501
-
-        self.get_export = self.uvm_GetExport("get_export", self, self.queue,
-                                             self.get_ap)
-
-        self.blocking_peek_export = self.uvm_BlockingPeekExport("blocking_peek_export", self,  # noqa: E501
-                                                                self.queue, self.get_ap)  # noqa: E501
-        self.nonblocking_peek_export = self.uvm_NonBlockingPeekExport("nonblocking_peek_export", self,  # noqa: E501
-                                                                      self.queue, self.get_ap)  # noqa: E501
-        self.peek_export = self.uvm_PeekExport("peek_export", self,
-                                               self.queue, self.get_ap)
-
-        self.blocking_get_peek_export = self.uvm_BlockingGetPeekExport("blocking_get_peek_export", self,  # noqa: E501
-                                                                       self.queue, self.get_ap)  # noqa: E501
-        self.nonblocking_get_peek_export = self.uvm_NonBlockingGetPeekExport("nonblocking_get_peek_export", self,  # noqa: E501
-                                                                             self.queue, self.get_ap)  # noqa: E501
-        self.get_peek_export = self.uvm_GetPeekExport("get_peek_export", self, self.queue, self.get_ap)  # noqa: E501
 
     async def put(self, item):
         await self.put_export.put(item)
@@ -770,25 +918,98 @@ class uvm_tlm_fifo(uvm_tlm_fifo_base):
         """
         Flush out the FIFO
         """
-        self.queue._queue.clear()
+        self.queue.clear()
+
+
+class uvm_fifo_overflow_policy(IntEnum):
+    """
+    What a bounded uvm_tlm_analysis_fifo does with a write
+    that arrives when it is full.
+    """
+    UVM_FIFO_ERROR = 0
+    UVM_FIFO_DROP_OLDEST = 1
+    UVM_FIFO_DROP_NEWEST = 2
+    UVM_FIFO_SPILL = 3
 
 
 class uvm_tlm_analysis_fifo(uvm_tlm_fifo):
     class uvm_AnalysisExport(uvm_QueueAccessor, uvm_analysis_port):
         def write(self, item):
-            try:
-                self.queue.put_nowait(item)
-            except QueueFull:
-                raise QueueFull(
-                    f"Full analysis fifo: {self.__name__}. This should never happen")  # noqa: E501
+            self._parent.write(item)
 
-    def __init__(self, name, parent=None):
-        super().__init__(name, parent, 0)
+    def __init__(self, name, parent=None, size=0,
+                 overflow_policy=uvm_fifo_overflow_policy.UVM_FIFO_ERROR):
+        """
+        :param size: Maximum number of items. 0 is unbounded.
+        :param overflow_policy: uvm_fifo_overflow_policy used when
+            a write arrives at a full FIFO.
+        """
+        super().__init__(name, parent, size)
+        self.overflow_policy = uvm_fifo_overflow_policy(overflow_policy)
+        if self.overflow_policy == uvm_fifo_overflow_policy.UVM_FIFO_SPILL:
+            self.queue = SpillQueue(maxsize=size)
+        self.high_watermark = 0
+        self.dropped = 0
+        self.spilled = 0
         self.analysis_export = self.uvm_AnalysisExport(name="analysis_export",
                                                        parent=self,
                                                        uvm_queue=self.queue,
                                                        ap=None)
 
+    def write(self, item):
+        """
+        Store an item written by an analysis port, applying the
+        overflow policy if the FIFO is full.
+
+        :param item: The item to store
+        :return: None
+        """
+        try:
+            self.queue.put_nowait(item)
+        except QueueFull:
+            self._overflow(item)
+        used = self.queue.qsize()
+        if used > self.high_watermark:
+            self.high_watermark = used
+
+    def _overflow(self, item):
+        policy = self.overflow_policy
+        if policy == uvm_fifo_overflow_policy.UVM_FIFO_DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.put_nowait(item)
+            self.dropped += 1
+        elif policy == uvm_fifo_overflow_policy.UVM_FIFO_DROP_NEWEST:
+            self.dropped += 1
+        elif policy == uvm_fifo_overflow_policy.UVM_FIFO_SPILL:
+            self.queue.spill(item)
+            self.spilled += 1
+        else:
+            raise QueueFull(
+                f"Full analysis fifo: {self.get_full_name()}"
+                f" (size {self.size()})")
+
+    def get_high_watermark(self):
+        """
+        The largest number of items the FIFO has held,
+        including spilled items.
+
+        :return: high watermark
+        """
+        return self.high_watermark
+
+    def report_phase(self):
+        # Bounded FIFOs report at INFO. Unbounded FIFOs report at DEBUG
+        # so that a run with many FIFOs can still be used to size them.
+        msg = (f"high watermark {self.high_watermark}"
+               f" (size {self.size()}), dropped {self.dropped},"
+               f" spilled {self.spilled}")
+        if self.dropped > 0:
+            self.logger.warning(msg)
+        elif self.size() > 0:
+            self.logger.info(msg)
+        else:
+            self.logger.debug(msg)
+
 
 #    12.2.9.1
 class uvm_tlm_req_rsp_channel(uvm_component):
@@ -855,7 +1076,7 @@ class uvm_tlm_transport_channel(uvm_tlm_req_rsp_channel):
             self.rsp_fifo = rsp_fifo
 
         async def transport(self, req):
-            self.req_fifo.put_export.put(req)
+            await self.req_fifo.put_export.put(req)
             return await self.rsp_fifo.get_peek_export.get()
 
         def nb_transport(self, req):
@@ -870,7 +1091,200 @@ class uvm_tlm_transport_channel(uvm_tlm_req_rsp_channel):
             req_fifo=self.req_tlm_fifo,
             rsp_fifo=self.rsp_tlm_fifo)
 
+
+class uvm_tlm_pipelined_transport_channel(uvm_component):
+    """
+    A transport channel that allows up to max_outstanding requests
+    in flight at once. Each transport() call waits for the response
+    whose transaction ID matches its request, so the target may
+    complete requests in any order.
+
+    The target gets requests from get_peek_request_export (or
+    slave_export) and puts responses into put_response_export.
+    A response must carry its request's transaction ID, for example
+    through rsp.set_id_info(req).
+    """
+
+    class uvm_PipelinedTransportExport(uvm_transport_port):
+        def __init__(self, name, parent, channel):
+            super().__init__(name, parent)
+            self.channel = channel
+
+        async def transport(self, req):
+            return await self.channel.transport(req)
+
+        def nb_transport(self, req):
+            return self.channel.nb_transport(req)
+
+    class uvm_ResponseExport(uvm_put_export):
+        def __init__(self, name, parent, channel):
+            super().__init__(name, parent)
+            self.channel = channel
+
+        async def put(self, rsp):
+            self.channel.put_response(rsp)
+
+        def can_put(self):
+            return True
+
+        def try_put(self, rsp):
+            self.channel.put_response(rsp)
+            return True
+
+    class uvm_Outstanding:
+        """A request waiting for its response"""
+        __slots__ = ("event", "response", "start_time")
+
+        def __init__(self, event, start_time):
+            self.event = event
+            self.response = None
+            self.start_time = start_time
+
+    def __init__(self, name, parent=None, max_outstanding=16,
+                 time_unit="step"):
+        """
+        :param max_outstanding: Requests allowed in flight at once
+        :param time_unit: Unit for the latency counters
+        """
+        super().__init__(name, parent)
+        self.max_outstanding = max_outstanding
+        self.time_unit = time_unit
+        self.req_tlm_fifo = uvm_tlm_fifo("request_fifo", self,
+                                         max_outstanding)
+        self.get_peek_request_export = self.req_tlm_fifo.get_peek_export
+        self.put_response_export = self.uvm_ResponseExport(
+            "put_response_export", self, self)
+        self.slave_export = uvm_tlm_req_rsp_channel.uvm_MasterSlaveExport(
+            name="slave_export",
+            parent=self,
+            get_peek_export=self.get_peek_request_export,
+            put_export=self.put_response_export)
+        self.transport_export = self.uvm_PipelinedTransportExport(
+            "transport_export", self, self)
+        self._outstanding = {}
+        self._slot_event = Event("slot free")
+        self._slot_waiters = 0
+        self.max_occupancy = 0
+        self.completed = 0
+        self.total_latency = 0
+        self.min_latency = None
+        self.max_latency = 0
+
+    def _issue(self, req, event):
+        txn_id = req.get_transaction_id()
+        if txn_id in self._outstanding:
+            raise UVMTLMConnectionError(
+                f"Transaction ID {txn_id} is already outstanding"
+                f" in {self.get_full_name()}")
+        entry = self.uvm_Outstanding(event, get_sim_time(self.time_unit))
+        self._outstanding[txn_id] = entry
+        occupancy = len(self._outstanding)
+        if occupancy > self.max_occupancy:
+            self.max_occupancy = occupancy
+        self.req_tlm_fifo.put_export.try_put(req)
+        return entry
+
+    def _retire(self, txn_id, entry):
+        del self._outstanding[txn_id]
+        latency = get_sim_time(self.time_unit) - entry.start_time
+        self.completed += 1
+        self.total_latency += latency
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+        if self._slot_waiters > 0:
+            self._slot_event.set()
+            self._slot_event.clear()
+        return entry.response
+
+    async def transport(self, req):
+        """
+        Send a request and wait for its response. Blocks while
+        max_outstanding requests are already in flight.
+
+        :param req: request transaction
+        :return: response transaction
+        """
+        while len(self._outstanding) >= self.max_outstanding:
+            self._slot_waiters += 1
+            try:
+                await self._slot_event.wait()
+            finally:
+                self._slot_waiters -= 1
+        entry = self._issue(req, Event("response"))
+        await entry.event.wait()
+        return self._retire(req.get_transaction_id(), entry)
+
+    def nb_transport(self, req):
+        """
+        Poll a request. The first call issues it if there is room.
+        Later calls with the same request return the response
+        once it has arrived.
+
+        :param req: request transaction
+        :return: (True, response) or (False, None)
+        """
+        txn_id = req.get_transaction_id()
+        entry = self._outstanding.get(txn_id)
+        if entry is None:
+            if len(self._outstanding) < self.max_outstanding:
+                self._issue(req, None)
+            return False, None
+        if entry.response is None:
+            return False, None
+        return True, self._retire(txn_id, entry)
+
+    def put_response(self, rsp):
+        """
+        Deliver a response to the transport() call waiting for it.
+
+        :param rsp: response with its request's transaction ID
+        """
+        txn_id = rsp.get_transaction_id()
+        try:
+            entry = self._outstanding[txn_id]
+        except KeyError:
+            self.logger.error(
+                f"Response {rsp} has transaction ID {txn_id},"
+                " which matches no outstanding request")
+            return
+        entry.response = rsp
+        if entry.event is not None:
+            entry.event.set()
+
+    def get_occupancy(self):
+        """
+        :return: Number of requests in flight
+        """
+        return len(self._outstanding)
+
+    def get_max_occupancy(self):
+        """
+        :return: Most requests that were in flight at once
+        """
+        return self.max_occupancy
+
+    def get_mean_latency(self):
+        """
+        :return: Mean request-to-response time in time_unit
+        """
+        if self.completed == 0:
+            return 0
+        return self.total_latency / self.completed
+
+    def report_phase(self):
+        if self.completed == 0:
+            return
+        self.logger.info(
+            f"completed {self.completed}, max occupancy"
+            f" {self.max_occupancy}/{self.max_outstanding}, latency"
+            f" min {self.min_latency} mean {self.get_mean_latency():.1f}"
+            f" max {self.max_latency} ({self.time_unit})")
+
+
 # UVM TLM 2
 # 12.3
 
-# This is left for future development.
+# TLM 2 is in s12_uvm_tlm2.py because the generic payload
+# is a uvm_sequence_item.
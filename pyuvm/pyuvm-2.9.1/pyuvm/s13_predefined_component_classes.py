@@ -1,8 +1,11 @@
 # from base_classes import *
 from pyuvm.s14_15_python_sequences import uvm_seq_item_port
-from pyuvm.s12_uvm_tlm_interfaces import uvm_analysis_export
+from pyuvm.s12_uvm_tlm_interfaces import (uvm_analysis_export,
+                                          uvm_analysis_port)
 from pyuvm.s13_uvm_component import *
 from pyuvm import error_classes
+from cocotb.utils import get_sim_time
+from collections import deque
 from enum import IntEnum
 
 
@@ -19,9 +22,9 @@ from enum import IntEnum
 #              to the standard UVM phases.
 # c: Hierarchical Reporting---We manage this with the logging module. It is
 #              orthogonal to the components.
-# d: Transaction Recording---We do not record transactions since pyuvm does
-#              not run in the simulator. This
-# could be added later if we see a need or way to do it.
+# d: Transaction Recording---pyuvm does not run in the simulator, so
+#              components do not record. Transactions record themselves
+#              into a uvm_tr_database file with enable_recording().
 # e: Factory---pyuvm manages the factory through the create() method without
 #              all the SystemVerilog typing overhead.
 #
@@ -120,3 +123,223 @@ class uvm_subscriber(uvm_component):
         raise error_classes.UVMFatalError(
             "You must override the write() method in"
             f"uvm_subscriber {self.get_full_name()}")
+
+
+# Comparators
+#
+# These are not in 1800.2 but are part of the Accellera UVM library.
+# Connect the expected stream to before_export and the DUT stream
+# to after_export. Each matched pair goes out of pair_ap as a
+# (before, after) tuple.
+
+class uvm_in_order_comparator(uvm_component):
+    """
+    Compares two streams that arrive in the same order.
+    Transactions wait in a deque until their partner arrives.
+    Whatever is left at check_phase is an orphan.
+    """
+
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.before_export = uvm_subscriber.uvm_AnalysisImp(
+            "before_export", self, self.write_before)
+        self.after_export = uvm_subscriber.uvm_AnalysisImp(
+            "after_export", self, self.write_after)
+        self.pair_ap = uvm_analysis_port("pair_ap", self)
+        self.before = deque()
+        self.after = deque()
+        self.m_matches = 0
+        self.m_mismatches = 0
+        self.m_orphans = 0
+
+    def compare(self, before, after):
+        """
+        Override to change how a pair is compared.
+
+        :return: True if the pair matches
+        """
+        if hasattr(before, "compare"):
+            return before.compare(after)
+        return before == after
+
+    def _pair(self, before, after):
+        if self.compare(before, after):
+            self.m_matches += 1
+        else:
+            self.m_mismatches += 1
+            self.logger.error(
+                f"Comparator mismatch: expected {before}, got {after}")
+        self.pair_ap.write((before, after))
+
+    def write_before(self, tt):
+        if self.after:
+            self._pair(tt, self.after.popleft())
+        else:
+            self.before.append(tt)
+
+    def write_after(self, tt):
+        if self.before:
+            self._pair(self.before.popleft(), tt)
+        else:
+            self.after.append(tt)
+
+    def get_matches(self):
+        return self.m_matches
+
+    def get_mismatches(self):
+        return self.m_mismatches
+
+    def get_orphans(self):
+        return self.m_orphans + len(self.before) + len(self.after)
+
+    def flush(self):
+        """Forget waiting transactions and clear the counts"""
+        self.before.clear()
+        self.after.clear()
+        self.m_matches = 0
+        self.m_mismatches = 0
+        self.m_orphans = 0
+
+    def check_phase(self):
+        if self.before:
+            self.logger.error(
+                f"{len(self.before)} expected transactions never arrived")
+        if self.after:
+            self.logger.error(
+                f"{len(self.after)} transactions arrived with no"
+                " expected transaction")
+
+    def report_phase(self):
+        self.logger.info(
+            f"matches {self.m_matches}, mismatches {self.m_mismatches},"
+            f" orphans {self.get_orphans()}")
+
+
+class uvm_algorithmic_comparator(uvm_in_order_comparator):
+    """
+    An in-order comparator that passes each before transaction
+    through transformer.transform() first. The transformer is
+    usually a reference model.
+    """
+
+    def __init__(self, name, parent, transformer):
+        super().__init__(name, parent)
+        self.transformer = transformer
+
+    def write_before(self, tt):
+        super().write_before(self.transformer.transform(tt))
+
+
+class uvm_out_of_order_comparator(uvm_in_order_comparator):
+    """
+    Compares two streams that may arrive in any order. key(tt)
+    returns a hashable value, such as a transaction ID or address,
+    that identifies the partners. Waiting transactions are held in
+    a dict of deques keyed on it, so each write is O(1) however far
+    the DUT reorders. Partners with the same key pair off in order.
+
+    If window is set, a transaction that waits more than window
+    time_units for its partner expires as an orphan. check_phase
+    reports expired transactions apart from those still waiting.
+    """
+
+    def __init__(self, name, parent, key=None, window=None,
+                 time_unit="ns"):
+        """
+        :param key: Function from transaction to a hashable key.
+            Defaults to the transaction itself.
+        :param window: Time a transaction may wait, or None to wait
+            until check_phase
+        :param time_unit: Unit of window
+        """
+        super().__init__(name, parent)
+        self.key = key if key is not None else (lambda tt: tt)
+        self.window = window
+        self.time_unit = time_unit
+        self.before = {}
+        self.after = {}
+        self.m_expired = 0
+        # Waiting entries in arrival order: [time, side, key, tt, waiting]
+        self._ages = deque()
+
+    def _waiting(self, side):
+        return sum(len(entries) for entries in side.values())
+
+    def _expire(self, now):
+        ages = self._ages
+        oldest = now - self.window
+        while ages and ages[0][0] < oldest:
+            stamp, side, key, tt, waiting = ages.popleft()
+            if not waiting:
+                continue
+            entries = side[key]
+            entries.popleft()
+            if not entries:
+                del side[key]
+            self.m_orphans += 1
+            self.m_expired += 1
+            self.logger.warning(
+                f"{'Expected' if side is self.before else 'Actual'}"
+                f" transaction {tt} expired after waiting since"
+                f" {stamp}{self.time_unit}")
+
+    def _write(self, tt, mine, theirs, is_before):
+        if self.window is not None:
+            now = get_sim_time(self.time_unit)
+            self._expire(now)
+        else:
+            now = None
+        key = self.key(tt)
+        partners = theirs.get(key)
+        if partners:
+            entry = partners.popleft()
+            if not partners:
+                del theirs[key]
+            entry[4] = False
+            if is_before:
+                self._pair(tt, entry[3])
+            else:
+                self._pair(entry[3], tt)
+            return
+        entry = [now, mine, key, tt, True]
+        mine.setdefault(key, deque()).append(entry)
+        if self.window is not None:
+            self._ages.append(entry)
+
+    def write_before(self, tt):
+        self._write(tt, self.before, self.after, True)
+
+    def write_after(self, tt):
+        self._write(tt, self.after, self.before, False)
+
+    def get_orphans(self):
+        return (self.m_orphans + self._waiting(self.before)
+                + self._waiting(self.after))
+
+    def get_expired(self):
+        """
+        :return: Number of orphans that expired waiting for a partner
+        """
+        return self.m_expired
+
+    def flush(self):
+        super().flush()
+        self.m_expired = 0
+        self._ages.clear()
+
+    def check_phase(self):
+        if self.window is not None:
+            self._expire(get_sim_time(self.time_unit))
+        if self.m_expired:
+            self.logger.error(
+                f"{self.m_expired} transactions expired waiting more"
+                f" than {self.window}{self.time_unit} for a partner")
+        before = self._waiting(self.before)
+        after = self._waiting(self.after)
+        if before:
+            self.logger.error(
+                f"{before} expected transactions never arrived")
+        if after:
+            self.logger.error(
+                f"{after} transactions arrived with no expected"
+                " transaction")
@@ -1,6 +1,7 @@
 from pyuvm.s06_reporting_classes import uvm_report_object
 from pyuvm.s08_factory_classes import uvm_factory
 from pyuvm.s09_phasing import uvm_common_phases, uvm_run_phase, uvm_build_phase
+from pyuvm.s09_phasing import uvm_connect_phase
 from pyuvm import error_classes, INFO
 from pyuvm import utility_classes
 import logging
@@ -308,6 +309,22 @@ class uvm_component(uvm_report_object):
         for child in self.children:
             child.disable_logging_hier()
 
+    def resolve_bindings(self):
+        """
+        Called on every component after the connect phase.
+        Ports override this to bind their methods directly
+        to the implementation at the end of the export chain.
+        """
+
+    def resolve_bindings_hier(self):
+        """
+        Resolve bindings for this component and everything below it
+        :return: None
+        """
+        self.resolve_bindings()
+        for child in self.get_children():
+            child.resolve_bindings_hier()
+
     def build_phase(self):
         ...
 
@@ -409,12 +426,15 @@ class uvm_root(uvm_component, metaclass=utility_classes.UVM_ROOT_Singleton):
             factory.clear_overrides()
         self.clear_children()
         utility_classes.ObjectionHandler().clear()
+        utility_classes.UVMSeeding.clear()
         self.uvm_test_top = factory.create_component_by_name(
             test_name, "", "uvm_test_top", self)
         for self.running_phase in uvm_common_phases:
             self.logger.log(utility_classes.PYUVM_DEBUG,
                             str(self.running_phase))
             self.running_phase.traverse(self.uvm_test_top)
+            if self.running_phase == uvm_connect_phase:
+                self.resolve_bindings_hier()
             if self.running_phase == uvm_run_phase:
                 await utility_classes.ObjectionHandler().run_phase_complete()  # noqa: E501
 
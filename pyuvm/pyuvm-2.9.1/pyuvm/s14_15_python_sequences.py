@@ -9,7 +9,14 @@
 
 from pyuvm.s05_base_classes import *
 from pyuvm.s12_uvm_tlm_interfaces import *
+from pyuvm.utility_classes import ObjectPool
 from cocotb.triggers import Event as CocotbEvent
+from cocotb.triggers import NullTrigger
+from collections import deque
+from enum import IntEnum
+import heapq
+import itertools
+import random
 
 # The sequence system allows users to create and populate sequence
 # items and then send them to a driver. The driver
@@ -92,55 +99,771 @@ from cocotb.triggers import Event as CocotbEvent
 # uvm_seq_item_port
 # The uvm_seq_item_port is a uvm_put_port with two extra methods.
 
-class ResponseQueue(UVMQueue):
+class ResponseQueue:
     """
-    Returns either the next response or the item with the id.
+    Holds responses until a sequence asks for them. Responses
+    are kept in a dict keyed by the ID of the request they
+    answer, so fetching one by ID is O(1). A put wakes only one
+    waiter: the one waiting for that ID, else one waiting for
+    the response's sequence, else one waiting for any response.
+
+    A response answers the request in its response_id (see
+    set_context()) or, failing that, the one with its own
+    transaction_id (see set_id_info()).
     """
 
     def __init__(self, maxsize: int = 0):
-        super().__init__(maxsize=maxsize)
-        self.put_event = CocotbEvent("put event")
+        # Responses never block the driver, so maxsize is ignored
+        self._responses = {}  # request ID -> deque of (sequence ID, rsp)
+        self._by_sequence = {}  # sequence ID -> {request ID: None}
+        self._count = 0
+        self._id_waiters = {}
+        self._sequence_waiters = {}
+        self._any_waiters = deque()
+        self._free_events = []
+
+    def __str__(self):
+        return str([str(xx) for xx in self])
+
+    def __iter__(self):
+        for entries in list(self._responses.values()):
+            for _, rsp in entries:
+                yield rsp
+
+    def __len__(self):
+        return self._count
+
+    def qsize(self):
+        return self._count
+
+    def empty(self):
+        return self._count == 0
+
+    def full(self):
+        return False
+
+    def clear(self):
+        self._responses.clear()
+        self._by_sequence.clear()
+        self._count = 0
 
-    def put_nowait(self, item):
-        super().put_nowait(item)
-        self.put_event.set()
-        self.put_event.clear()
+    @staticmethod
+    def _ids(rsp):
+        response_id = getattr(rsp, "response_id", None)
+        if response_id is not None:
+            return response_id[1], response_id[0]
+        return rsp.transaction_id, getattr(rsp, "parent_sequence_id", None)
 
-    async def get_response(self, txn_id=None):
-        if txn_id is None:
-            return await self.get()
+    def put_nowait(self, rsp):
+        txn_id, seq_id = self._ids(rsp)
+        entries = self._responses.get(txn_id)
+        if entries is None:
+            entries = self._responses[txn_id] = deque()
+        entries.append((seq_id, rsp))
+        if seq_id is not None:
+            self._by_sequence.setdefault(seq_id, {})[txn_id] = None
+        self._count += 1
+        event = self._id_waiters.pop(txn_id, None)
+        if event is None:
+            waiters = self._sequence_waiters.get(seq_id)
+            if waiters:
+                event = waiters.popleft()
+            elif self._any_waiters:
+                event = self._any_waiters.popleft()
+        if event is not None:
+            event.set()
+
+    async def put(self, rsp):
+        self.put_nowait(rsp)
+
+    def _take(self, txn_id):
+        entries = self._responses[txn_id]
+        seq_id, rsp = entries.popleft()
+        if not entries:
+            del self._responses[txn_id]
+            if seq_id is not None:
+                requests = self._by_sequence[seq_id]
+                del requests[txn_id]
+                if not requests:
+                    del self._by_sequence[seq_id]
+        self._count -= 1
+        return rsp
+
+    def get_nowait(self, txn_id=None, sequence_id=None):
+        """
+        Remove and return the response to txn_id, else the oldest
+        response for sequence_id, else the oldest response.
+        Raise :exc:`QueueEmpty` if there is none.
+        """
+        if txn_id is not None:
+            if txn_id in self._responses:
+                return self._take(txn_id)
+        elif sequence_id is not None:
+            requests = self._by_sequence.get(sequence_id)
+            if requests:
+                return self._take(next(iter(requests)))
+        elif self._responses:
+            return self._take(next(iter(self._responses)))
+        raise QueueEmpty()
+
+    async def _wait(self, txn_id, sequence_id):
+        if self._free_events:
+            event = self._free_events.pop()
         else:
-            while True:
-                item_list = list(self._queue)
-                txn_list = [xx
-                            for xx in item_list
-                            if xx.transaction_id == txn_id]
-                if len(txn_list) == 0:
-                    await self.put_event.wait()
-                else:
-                    assert len(txn_list) == 1, \
-                        f"Multiple transactionsn have the same ID: {txn_id}"
-                    _ = self._queue.index(txn_list[0])
-                    self._queue.remove(txn_list[0])
-                    return txn_list[0]
+            event = CocotbEvent("response waiter")
+        if txn_id is not None:
+            if txn_id in self._id_waiters:
+                raise error_classes.UVMSequenceError(
+                    f"Two callers are waiting for response {txn_id}")
+            self._id_waiters[txn_id] = event
+        elif sequence_id is not None:
+            self._sequence_waiters.setdefault(
+                sequence_id, deque()).append(event)
+        else:
+            self._any_waiters.append(event)
+        try:
+            await event.wait()
+        except BaseException:
+            # Killed while waiting. Stop waiting, and hand on a
+            # wakeup we were already given.
+            if self._id_waiters.get(txn_id) is event:
+                del self._id_waiters[txn_id]
+            elif event in self._sequence_waiters.get(sequence_id, ()):
+                self._sequence_waiters[sequence_id].remove(event)
+            elif event in self._any_waiters:
+                self._any_waiters.remove(event)
+            elif self._any_waiters and not self.empty():
+                self._any_waiters.popleft().set()
+            raise
+        finally:
+            event.clear()
+            self._free_events.append(event)
+            if not self._sequence_waiters.get(sequence_id, True):
+                del self._sequence_waiters[sequence_id]
+
+    async def get_response(self, txn_id=None, sequence_id=None):
+        """
+        Remove and return the response to txn_id, else the oldest
+        response for sequence_id, else the oldest response.
+        Wait for it if it has not arrived.
+        """
+        while True:
+            try:
+                return self.get_nowait(txn_id, sequence_id)
+            except QueueEmpty:
+                await self._wait(txn_id, sequence_id)
+
+    async def get(self):
+        return await self.get_response()
+
+
+class uvm_sequencer_arb_mode(IntEnum):
+    """
+    How the sequencer picks between sequences that are waiting
+    to send an item.
+    """
+    UVM_SEQ_ARB_FIFO = 0
+    UVM_SEQ_ARB_WEIGHTED = 1
+    UVM_SEQ_ARB_RANDOM = 2
+    UVM_SEQ_ARB_STRICT_FIFO = 3
+    UVM_SEQ_ARB_STRICT_RANDOM = 4
+    UVM_SEQ_ARB_USER = 5
+
+
+class SequenceRequest:
+    """
+    A sequence waiting at the sequencer, either to send an item
+    or, if item is None, to lock the sequencer.
+    """
+    __slots__ = ("item", "sequence_id", "priority", "arrival", "event")
+
+    def __init__(self, item, sequence_id, priority, arrival, event=None):
+        self.item = item
+        self.sequence_id = sequence_id
+        self.priority = priority
+        self.arrival = arrival
+        self.event = event
+
+
+# Arbiters
+#
+# An arbiter holds one candidate per sequence that has a request
+# waiting: the sequence's oldest request. choose() picks and
+# removes a candidate. Every policy is O(log n) in the number of
+# waiting sequences except UVM_SEQ_ARB_USER, which hands the whole
+# list to the sequencer.
+
+class _FifoArbiter:
+    """Oldest request first. A heap ordered by arrival."""
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}
+
+    def __len__(self):
+        return len(self._live)
+
+    def _order(self, request):
+        return (request.arrival,)
+
+    def add(self, key, request):
+        self._live[key] = request.arrival
+        heapq.heappush(self._heap,
+                       self._order(request) + (request.arrival, key))
+
+    def remove(self, key):
+        del self._live[key]
+
+    def choose(self):
+        # Entries for removed candidates are skipped here
+        heap, live = self._heap, self._live
+        while True:
+            entry = heapq.heappop(heap)
+            key = entry[-1]
+            if live.get(key) == entry[-2]:
+                del live[key]
+                return key
+
+
+class _StrictFifoArbiter(_FifoArbiter):
+    """Highest priority first, oldest first within a priority"""
+
+    def _order(self, request):
+        return (-request.priority, request.arrival)
+
+
+class _WeightedArbiter:
+    """
+    Random choice weighted by priority, or uniform if uniform is
+    True. Candidates sit in slots of a Fenwick tree that holds
+    their weights, so adding, removing and choosing are all
+    O(log n).
+    """
+
+    def __init__(self, rng, uniform=False):
+        self.rng = rng
+        self.uniform = uniform
+        self._size = 16
+        self._tree = [0] * (self._size + 1)
+        self._weights = [0] * (self._size + 1)
+        self._keys = [None] * (self._size + 1)
+        self._slots = {}
+        self._free = list(range(self._size, 0, -1))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _update(self, slot, delta):
+        tree, size = self._tree, self._size
+        while slot <= size:
+            tree[slot] += delta
+            slot += slot & -slot
+
+    def _grow(self):
+        old = self._size
+        self._size *= 2
+        self._weights += [0] * old
+        self._keys += [None] * old
+        self._free = list(range(self._size, old, -1))
+        tree = self._weights[:]
+        for slot in range(1, self._size + 1):
+            parent = slot + (slot & -slot)
+            if parent <= self._size:
+                tree[parent] += tree[slot]
+        self._tree = tree
+
+    def add(self, key, request):
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        weight = 1 if self.uniform else request.priority
+        self._slots[key] = slot
+        self._keys[slot] = key
+        self._weights[slot] = weight
+        self._update(slot, weight)
+
+    def remove(self, key):
+        slot = self._slots.pop(key)
+        self._update(slot, -self._weights[slot])
+        self._weights[slot] = 0
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def choose(self):
+        total = self._tree_total()
+        if total <= 0:
+            # Every candidate has weight 0, so they are all equal
+            key = next(iter(self._slots))
+        else:
+            # Find the slot whose weight covers the random point
+            point = self.rng.random() * total
+            slot, tree = 0, self._tree
+            step = self._size
+            while step:
+                nxt = slot + step
+                if nxt <= self._size and tree[nxt] <= point:
+                    slot = nxt
+                    point -= tree[nxt]
+                step >>= 1
+            key = self._keys[slot + 1]
+        self.remove(key)
+        return key
+
+    def _tree_total(self):
+        total, slot = 0, self._size
+        while slot:
+            total += self._tree[slot]
+            slot -= slot & -slot
+        return total
+
+
+class _StrictRandomArbiter:
+    """Highest priority first, chosen at random within a priority"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self._levels = {}
+        # Each priority is in the heap at most once. A priority
+        # whose level has emptied stays until choose() reaches it,
+        # and is reused if its level is made again before then.
+        self._priorities = []
+        self._in_heap = set()
+        self._priority_of = {}
+
+    def __len__(self):
+        return len(self._priority_of)
+
+    def add(self, key, request):
+        level = self._levels.get(request.priority)
+        if level is None:
+            level = self._levels[request.priority] = \
+                _WeightedArbiter(self.rng, uniform=True)
+            if request.priority not in self._in_heap:
+                self._in_heap.add(request.priority)
+                heapq.heappush(self._priorities, -request.priority)
+        level.add(key, request)
+        self._priority_of[key] = request.priority
+
+    def _drop_level_if_empty(self, priority):
+        if len(self._levels[priority]) == 0:
+            del self._levels[priority]
+
+    def remove(self, key):
+        priority = self._priority_of.pop(key)
+        self._levels[priority].remove(key)
+        self._drop_level_if_empty(priority)
+
+    def choose(self):
+        # Priorities whose level has emptied are skipped here
+        while -self._priorities[0] not in self._levels:
+            self._in_heap.discard(-heapq.heappop(self._priorities))
+        priority = -self._priorities[0]
+        key = self._levels[priority].choose()
+        del self._priority_of[key]
+        self._drop_level_if_empty(priority)
+        return key
+
+
+class _UserArbiter:
+    """Lets sequencer.user_priority_arbitration() choose"""
+
+    def __init__(self, sequencer):
+        self.sequencer = sequencer
+        self._candidates = {}
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def add(self, key, request):
+        self._candidates[key] = request
+
+    def remove(self, key):
+        del self._candidates[key]
+
+    def choose(self):
+        keys = list(self._candidates)
+        requests = [self._candidates[key] for key in keys]
+        index = self.sequencer.user_priority_arbitration(requests)
+        key = keys[index]
+        del self._candidates[key]
+        return key
+
+
+class ArbitrationQueue:
+    """
+    The sequencer's request queue. Each sequence has its own FIFO
+    of requests, and an arbiter chooses which sequence goes next
+    each time the driver asks for an item.
+
+    A sequence that holds the lock is the only one that can send
+    items. lock() waits its turn in arbitration like an item.
+    grab() goes ahead of everything and waits only for the current
+    lock to be released.
+    """
+
+    def __init__(self, sequencer=None):
+        self.sequencer = sequencer
+        self.rng = getattr(sequencer, "rng", random)
+        self._pending = {}  # sequence ID -> deque of SequenceRequest
+        self._arrivals = itertools.count()
+        self._count = 0
+        self._mode = uvm_sequencer_arb_mode.UVM_SEQ_ARB_FIFO
+        self._arbiter = _FifoArbiter()
+        self._getters = deque()
+        self._free_events = []
+        self._lock_holder = None
+        self._grabs = deque()
 
     def __str__(self):
-        return str([str(xx) for xx in self._queue])
+        return str([str(xx) for xx in self])
+
+    def __iter__(self):
+        for pending in list(self._pending.values()):
+            for request in pending:
+                if request.item is not None:
+                    yield request.item
+
+    def __len__(self):
+        return self._count
+
+    def qsize(self):
+        return self._count
+
+    def empty(self):
+        return self._count == 0
+
+    def full(self):
+        return False
+
+    def _make_arbiter(self, mode):
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_FIFO:
+            return _FifoArbiter()
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_STRICT_FIFO:
+            return _StrictFifoArbiter()
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_WEIGHTED:
+            return _WeightedArbiter(self.rng)
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_RANDOM:
+            return _WeightedArbiter(self.rng, uniform=True)
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_STRICT_RANDOM:
+            return _StrictRandomArbiter(self.rng)
+        if mode == uvm_sequencer_arb_mode.UVM_SEQ_ARB_USER:
+            if self.sequencer is None:
+                raise error_classes.UVMSequenceError(
+                    "UVM_SEQ_ARB_USER needs a sequencer")
+            return _UserArbiter(self.sequencer)
+        raise error_classes.UVMSequenceError(
+            f"Unknown arbitration mode {mode}")
+
+    def set_arbitration(self, mode):
+        mode = uvm_sequencer_arb_mode(mode)
+        arbiter = self._make_arbiter(mode)
+        for sequence_id, pending in self._pending.items():
+            arbiter.add(sequence_id, pending[0])
+        self._mode = mode
+        self._arbiter = arbiter
+
+    def get_arbitration(self):
+        return self._mode
+
+    def clear(self):
+        self._pending.clear()
+        self._arbiter = self._make_arbiter(self._mode)
+        self._count = 0
+
+    def _wake_getter(self):
+        if self._getters:
+            self._getters.popleft().set()
+
+    def _add(self, request):
+        pending = self._pending.get(request.sequence_id)
+        if pending is None:
+            pending = self._pending[request.sequence_id] = deque()
+            self._arbiter.add(request.sequence_id, request)
+        pending.append(request)
+        self._count += 1
+        self._wake_getter()
+
+    def _take(self, sequence_id):
+        """Pop the oldest request of a sequence the arbiter released"""
+        pending = self._pending[sequence_id]
+        request = pending.popleft()
+        if pending:
+            self._arbiter.add(sequence_id, pending[0])
+        else:
+            del self._pending[sequence_id]
+        self._count -= 1
+        return request
+
+    def _cancel(self, request):
+        pending = self._pending.get(request.sequence_id)
+        if pending is None or request not in pending:
+            return
+        if pending[0] is request:
+            self._arbiter.remove(request.sequence_id)
+            self._take(request.sequence_id)
+        else:
+            pending.remove(request)
+            self._count -= 1
+
+    def put_nowait(self, item, sequence_id=None, priority=100):
+        """
+        Queue an item for arbitration.
+
+        :param item: uvm_sequence_item
+        :param sequence_id: Sequence sending the item. Defaults to
+            item.parent_sequence_id.
+        :param priority: Priority of the request
+        """
+        if sequence_id is None:
+            sequence_id = getattr(item, "parent_sequence_id", None)
+        self._add(SequenceRequest(item, sequence_id, priority,
+                                  next(self._arrivals)))
+
+    async def put(self, item, sequence_id=None, priority=100):
+        self.put_nowait(item, sequence_id, priority)
+
+    def get_nowait(self):
+        """
+        Arbitrate and return the winning item.
+        Raise :exc:`QueueEmpty` if no sequence may send.
+        """
+        while True:
+            holder = self._lock_holder
+            if holder is not None:
+                if holder not in self._pending:
+                    raise QueueEmpty()
+                self._arbiter.remove(holder)
+                request = self._take(holder)
+            elif self._pending:
+                request = self._take(self._arbiter.choose())
+            else:
+                raise QueueEmpty()
+            if request.item is not None:
+                return request.item
+            # A lock request won
+            self._lock_holder = request.sequence_id
+            request.event.set()
+
+    async def get(self):
+        """Wait until some sequence may send and return its item"""
+        if self._mode != uvm_sequencer_arb_mode.UVM_SEQ_ARB_FIFO:
+            # Let sequences whose last item just finished ask for
+            # their next one, so they take part in this decision.
+            await NullTrigger()
+        while True:
+            try:
+                return self.get_nowait()
+            except QueueEmpty:
+                pass
+            if self._free_events:
+                event = self._free_events.pop()
+            else:
+                event = CocotbEvent("arbitration waiter")
+            self._getters.append(event)
+            try:
+                await event.wait()
+            except BaseException:
+                if event in self._getters:
+                    self._getters.remove(event)
+                else:
+                    self._wake_getter()
+                raise
+            finally:
+                event.clear()
+                self._free_events.append(event)
+
+    async def lock(self, sequence_id, priority=100):
+        """Wait until sequence_id wins arbitration and holds the lock"""
+        if self._lock_holder == sequence_id:
+            return
+        if self._lock_holder is None and not self._pending:
+            self._lock_holder = sequence_id
+            return
+        request = SequenceRequest(None, sequence_id, priority,
+                                  next(self._arrivals),
+                                  CocotbEvent("lock"))
+        self._add(request)
+        try:
+            await request.event.wait()
+        except BaseException:
+            self._cancel(request)
+            raise
+
+    async def grab(self, sequence_id):
+        """Wait only for the current lock, then hold the lock"""
+        if self._lock_holder == sequence_id:
+            return
+        if self._lock_holder is None:
+            self._lock_holder = sequence_id
+            return
+        grab = (sequence_id, CocotbEvent("grab"))
+        self._grabs.append(grab)
+        try:
+            await grab[1].wait()
+        except BaseException:
+            if grab in self._grabs:
+                self._grabs.remove(grab)
+            raise
+
+    def unlock(self, sequence_id):
+        """Release the lock held by sequence_id"""
+        if self._lock_holder != sequence_id:
+            raise error_classes.UVMSequenceError(
+                f"Sequence {sequence_id} tried to unlock a sequencer"
+                f" locked by {self._lock_holder}")
+        self._lock_holder = None
+        if self._grabs:
+            self._lock_holder, event = self._grabs.popleft()
+            event.set()
+        self._wake_getter()
+
+    def get_lock_holder(self):
+        """:return: ID of the sequence holding the lock, or None"""
+        return self._lock_holder
+
+    def is_blocked(self, sequence_id):
+        """:return: True if another sequence holds the lock"""
+        return self._lock_holder not in (None, sequence_id)
+
+
+class ItemStream:
+    """
+    Items a sequence sends with send_items(). The sequencer
+    arbitrates the stream as one request. Each time it wins, the
+    driver takes up to the number of items it asked for, and the
+    stream goes back into arbitration until its source runs out.
+    """
+
+    def __init__(self, source, sequence_id, priority):
+        """
+        :param source: Iterable or async iterable of sequence items
+        :param sequence_id: Sequence sending the items
+        :param priority: Arbitration priority
+        """
+        if hasattr(source, "__aiter__"):
+            self._anext = source.__aiter__().__anext__
+            self._iter = None
+        else:
+            self._anext = None
+            self._iter = iter(source)
+        self.sequence_id = sequence_id
+        self.priority = priority
+        self.exhausted = False
+        self.outstanding = 0
+        self.sent = 0
+        self.finished = CocotbEvent("stream finished")
+
+    async def take(self, count):
+        """Take up to count items from the source"""
+        if self._iter is not None:
+            items = list(itertools.islice(self._iter, count))
+            if len(items) < count:
+                self.exhausted = True
+        else:
+            items = []
+            try:
+                while len(items) < count:
+                    items.append(await self._anext())
+            except StopAsyncIteration:
+                self.exhausted = True
+        for item in items:
+            item.parent_sequence_id = self.sequence_id
+        self.sent += len(items)
+        return items
+
+    def batch_done(self):
+        self.outstanding -= 1
+        self.check_finished()
+
+    def check_finished(self):
+        if self.exhausted and self.outstanding == 0:
+            self.finished.set()
 
 
 class uvm_sequence_item(uvm_transaction):
     """
     The pyuvm uvm_sequence_item has conditions to
     implement start_item() and finish_item()
+
+    The conditions are created the first time the sequencer
+    uses them, so items sent with send_items() never create
+    them. Declare __slots__ in a subclass to leave out the
+    per-instance __dict__::
+
+        class BusItem(uvm_sequence_item):
+            __slots__ = ("addr", "data")
     """
 
+    __slots__ = ("_start_condition", "_finish_condition", "_item_ready",
+                 "_parent_sequence", "parent_sequence_id", "response_id")
+
     def __init__(self, name):
         super().__init__(name)
-        self.start_condition = CocotbEvent()
-        self.finish_condition = CocotbEvent()
-        self.item_ready = CocotbEvent()
+        self._start_condition = None
+        self._finish_condition = None
+        self._item_ready = None
+        self._parent_sequence = None
+        self.parent_sequence_id = None
+        self.response_id = None
+
+    def _recycle(self, name):
+        self._parent_sequence = None
         self.parent_sequence_id = None
         self.response_id = None
+        super()._recycle(name)
+
+    def get_full_name(self):
+        """
+        The full name of the parent sequence and this item's name,
+        as in UVM, or just the name outside a sequence
+        """
+        if self._parent_sequence is None:
+            return self.get_name()
+        return f"{self._parent_sequence.get_full_name()}.{self.get_name()}"
+
+    def set_item_context(self, parent_seq):
+        """
+        Make this item part of parent_seq, so that its full name,
+        and so the seed of its random stream, start with the
+        sequence's. A stream already in use is reseeded.
+
+        :param parent_seq: The uvm_sequence sending this item
+        """
+        self._parent_sequence = parent_seq
+        self.parent_sequence_id = parent_seq.sequence_id
+        if hasattr(self, "_rng"):
+            self.reseed()
+
+    @property
+    def start_condition(self):
+        """Fires when the item wins arbitration"""
+        if self._start_condition is None:
+            self._start_condition = CocotbEvent()
+        return self._start_condition
+
+    @property
+    def finish_condition(self):
+        """Fires when the driver completes the item"""
+        if self._finish_condition is None:
+            self._finish_condition = CocotbEvent()
+        return self._finish_condition
+
+    @property
+    def item_ready(self):
+        """Fires when finish_item() hands the item to the driver"""
+        if self._item_ready is None:
+            self._item_ready = CocotbEvent()
+        return self._item_ready
+
+    def set_id_info(self, other):
+        """
+        Set transaction_id and parent_sequence_id from other so
+        that this response is routed back to other's sequence.
+
+        :param other: uvm_sequence_item
+        """
+        super().set_id_info(other)
+        self.parent_sequence_id = other.parent_sequence_id
 
     def set_context(self, item):
         """
@@ -157,13 +880,29 @@ class uvm_seq_item_export(uvm_blocking_put_export):
     """
     The sequence item port with a request queue and
     a response queue.
+
+    A driver either completes each item with get_next_item() and
+    item_done(), or pipelines them with get() and put(). get()
+    accepts an item and lets finish_item() return at once, and
+    put() sends the response later, in any order. After
+    set_max_outstanding() each accepted item holds a slot until
+    put() sends its response, and get() waits for a free slot.
+
+    Completed items of a type that called enable_pool() go back
+    to the type's pool.
     """
 
     def __init__(self, name, parent):
         super().__init__(name, parent)
-        self.req_q = UVMQueue()
+        self.req_q = ArbitrationQueue(parent)
         self.rsp_q = ResponseQueue()
         self.current_item = None
+        self.current_items = None
+        self._current_stream = None
+        self._peeked = False
+        self.max_outstanding = 0
+        self.outstanding = {}  # transaction ID -> accepted item
+        self._slot_free = CocotbEvent("outstanding slot free")
 
     async def put_req(self, item):
         """
@@ -176,25 +915,87 @@ class uvm_seq_item_export(uvm_blocking_put_export):
 
     def put_response(self, item):
         """
-        Put response into response queue
+        Put response into response queue and free the
+        outstanding slot of the request it answers
 
         :param item: response item
         :return:
         """
+        if self.outstanding:
+            txn_id, _ = ResponseQueue._ids(item)
+            if self.outstanding.pop(txn_id, None) is not None:
+                self._slot_free.set()
+                self._slot_free.clear()
         self.rsp_q.put_nowait(item)
 
+    def set_max_outstanding(self, depth):
+        """
+        Limit how many items get() may accept before their
+        responses come back. 0, the default, means no limit
+        and no tracking.
+
+        :param depth: Most items awaiting a response
+        """
+        if depth < 0:
+            raise error_classes.UVMSequenceError(
+                f"Outstanding depth must not be negative, got {depth}")
+        self.max_outstanding = depth
+        if depth == 0:
+            self.outstanding.clear()
+        self._slot_free.set()
+        self._slot_free.clear()
+
+    def get_max_outstanding(self):
+        return self.max_outstanding
+
+    async def _wait_for_slot(self):
+        while 0 < self.max_outstanding <= len(self.outstanding):
+            await self._slot_free.wait()
+
+    @staticmethod
+    def _release(items):
+        """Return completed items of pooled types to their pools"""
+        pools = ObjectPool.pools
+        for item in items:
+            pool = pools.get(type(item))
+            if pool is not None:
+                pool.release(item)
+
+    async def _next_items(self, count):
+        """
+        Arbitrate and return the winner's items with the stream
+        they came from, or None for an item from start_item().
+        """
+        while True:
+            request = await self.req_q.get()
+            if not isinstance(request, ItemStream):
+                request.start_condition.set()
+                request.start_condition.clear()
+                await request.item_ready.wait()
+                return [request], None
+            stream = request
+            items = await stream.take(count)
+            if not stream.exhausted:
+                self.req_q.put_nowait(stream, stream.sequence_id,
+                                      stream.priority)
+            if items:
+                stream.outstanding += 1
+                return items, stream
+            stream.check_finished()
+
     async def get_next_item(self):
         """
         Get the next item out of the item queue
         :return: item to process
         """
-        if self.current_item is not None:
+        if self._peeked:
+            self._peeked = False
+            return self.current_item
+        if self.current_item is not None or self.current_items is not None:
             raise error_classes.UVMSequenceError(
                 "You must call item_done() before calling get_next_item again")
-        self.current_item = await self.req_q.get()
-        self.current_item.start_condition.set()
-        self.current_item.start_condition.clear()
-        await self.current_item.item_ready.wait()
+        items, self._current_stream = await self._next_items(1)
+        self.current_item = items[0]
         return self.current_item
 
     def item_done(self, rsp=None):
@@ -207,20 +1008,122 @@ class uvm_seq_item_export(uvm_blocking_put_export):
         if self.current_item is None:
             raise error_classes.UVMSequenceError(
                 "You must call get_next_item before calling item_done")
-        self.current_item.finish_condition.set()
-        self.current_item.finish_condition.clear()
+        if self._current_stream is not None:
+            self._current_stream.batch_done()
+            self._current_stream = None
+        else:
+            self.current_item.finish_condition.set()
+            self.current_item.finish_condition.clear()
+        if ObjectPool.pools:
+            self._release((self.current_item,))
         self.current_item = None
+        self.current_items = None
+        self._peeked = False
         if rsp is not None:
             self.put_response(rsp)
 
-    async def get_response(self, transaction_id=None):
+    async def peek(self):
+        """
+        Return the next item without accepting it. finish_item()
+        stays blocked, and peek() returns the same item until
+        get() or item_done() completes it.
+        :return: item to process
+        """
+        if self.current_item is not None and not self._peeked:
+            raise error_classes.UVMSequenceError(
+                "You must call item_done() before calling peek")
+        if self.current_item is None:
+            if self.current_items is not None:
+                raise error_classes.UVMSequenceError(
+                    "You must call items_done() before calling peek")
+            await self._wait_for_slot()
+            items, self._current_stream = await self._next_items(1)
+            self.current_item = items[0]
+            self._peeked = True
+        return self.current_item
+
+    async def get(self):
+        """
+        Accept the next item, or the one peek() returned, and
+        complete its handshake so finish_item() returns. Send the
+        response later with put(). Waits while max_outstanding
+        items are awaiting responses.
+        :return: item to process
+        """
+        if not self._peeked:
+            if self.current_item is not None or self.current_items is not None:
+                raise error_classes.UVMSequenceError(
+                    "You must call item_done() before calling get")
+            await self._wait_for_slot()
+            items, self._current_stream = await self._next_items(1)
+            self.current_item = items[0]
+        item = self.current_item
+        self.item_done()
+        if self.max_outstanding:
+            self.outstanding[item.transaction_id] = item
+        return item
+
+    async def put(self, rsp):
+        """
+        Send the response to an item from get(). Responses may
+        come back in any order.
+
+        :param rsp: Response with the ID info of its request
+        """
+        self.put_response(rsp)
+
+    async def get_next_items(self, count):
+        """
+        Get up to count items from the sequence that wins
+        arbitration. A sequence using send_items() fills the batch
+        from its stream. A sequence using start_item() supplies one
+        item. Call items_done() once for the whole batch.
+
+        :param count: Most items to return
+        :return: list of items
+        """
+        if self.current_item is not None or self.current_items is not None:
+            raise error_classes.UVMSequenceError(
+                "You must call items_done() before calling"
+                " get_next_items again")
+        items, self._current_stream = await self._next_items(count)
+        if self._current_stream is None:
+            self.current_item = items[0]
+        self.current_items = items
+        return items
+
+    def items_done(self, rsps=None):
+        """
+        Signal that every item from get_next_items() is complete
+
+        :param rsps: Iterable of responses to put in the response queue
+        """
+        if self.current_items is None:
+            raise error_classes.UVMSequenceError(
+                "You must call get_next_items before calling items_done")
+        if self._current_stream is None:
+            self.item_done()
+        else:
+            if ObjectPool.pools:
+                self._release(self.current_items)
+            self._current_stream.batch_done()
+            self._current_stream = None
+            self.current_items = None
+        if rsps is not None:
+            for rsp in rsps:
+                self.put_response(rsp)
+
+    async def get_response(self, transaction_id=None, sequence_id=None):
         """
         If transaction_id is not none, block until a
         response with the transaction id becomes available.
+        Otherwise, if sequence_id is not None, block until
+        a response for that sequence becomes available.
         :param transaction_id: The transaction ID of the response
+        :param sequence_id: The sequence ID of the response
         :return:
         """
-        datum = await self.rsp_q.get_response(transaction_id)
+        datum = await self.rsp_q.get_response(transaction_id, sequence_id)
         return datum
 
 
@@ -250,20 +1153,44 @@ class uvm_seq_item_port(uvm_port_base):
         """Notify finish_item that the item is complete"""
         self.export.item_done(rsp)
 
-    async def get_response(self, transaction_id=None):
+    async def get(self):
+        """Accept the next item and let finish_item() return"""
+        return await self.export.get()
+
+    async def peek(self):
+        """Look at the next item without accepting it"""
+        return await self.export.peek()
+
+    async def put(self, rsp):
+        """Send a response to an item from get()"""
+        await self.export.put(rsp)
+
+    async def get_next_items(self, count):
+        """Get up to count items from the next sequence to win"""
+        return await self.export.get_next_items(count)
+
+    def items_done(self, rsps=None):
+        """Complete every item from get_next_items()"""
+        self.export.items_done(rsps)
+
+    async def get_response(self, transaction_id=None, sequence_id=None):
         """
         Either get a response item with the given transaction_id,
-        or get the first one in the queue.
+        the first one for the given sequence_id,
+        or the first one in the queue.
 
         Removes the found transaction.
 
-        If there is no transaction in the queue with transaction_id,
+        If there is no such transaction in the queue,
         block until it appears.
         """
-        datum = await self.export.get_response(transaction_id)
+        datum = await self.export.get_response(transaction_id, sequence_id)
         return datum
 
 
+uvm_port_base.add_forwarding_methods(uvm_seq_item_port)
+
+
 # The UVM sequencer is really just a holder for the
 # seq_item_export that does all the work.
 
@@ -280,17 +1207,86 @@ class uvm_sequencer(uvm_component):
     def __init__(self, name, parent):
         super().__init__(name, parent)
         self.seq_item_export = uvm_seq_item_export("seq_item_export", self)
-        self.seq_q = UVMQueue(0)
+        self.seq_q = self.seq_item_export.req_q
 
-    async def run_phase(self):
-        while True:
-            next_item = await self.seq_q.get()
-            await self.seq_item_export.put_req(next_item)
+    def set_arbitration(self, mode):
+        """
+        Choose how waiting sequences are arbitrated.
+
+        :param mode: uvm_sequencer_arb_mode
+        """
+        self.seq_q.set_arbitration(mode)
+
+    def get_arbitration(self):
+        return self.seq_q.get_arbitration()
+
+    def set_max_outstanding(self, depth):
+        """
+        Let a pipelined driver accept up to depth items
+        before their responses come back.
+
+        :param depth: Most items awaiting a response, 0 for no limit
+        """
+        self.seq_item_export.set_max_outstanding(depth)
+
+    def get_max_outstanding(self):
+        return self.seq_item_export.get_max_outstanding()
+
+    def user_priority_arbitration(self, avail_sequences):
+        """
+        Override to implement UVM_SEQ_ARB_USER.
+
+        :param avail_sequences: list of SequenceRequest, one per
+            sequence that is waiting, oldest first
+        :return: Index of the request that goes next
+        """
+        return 0
 
-    async def start_item(self, item):
-        await self.seq_q.put(item)
+    async def lock(self, sequence):
+        """
+        Wait until sequence wins arbitration, then let only
+        sequence send items until it calls unlock()
+        """
+        await self.seq_q.lock(sequence.sequence_id, sequence.get_priority())
+
+    async def grab(self, sequence):
+        """
+        Give sequence the lock as soon as the current lock
+        holder, if any, unlocks.
+        """
+        await self.seq_q.grab(sequence.sequence_id)
+
+    def unlock(self, sequence):
+        self.seq_q.unlock(sequence.sequence_id)
+
+    def ungrab(self, sequence):
+        self.seq_q.unlock(sequence.sequence_id)
+
+    def is_blocked(self, sequence):
+        return self.seq_q.is_blocked(sequence.sequence_id)
+
+    def has_lock(self, sequence):
+        return self.seq_q.get_lock_holder() == sequence.sequence_id
+
+    def is_grabbed(self):
+        return self.seq_q.get_lock_holder() is not None
+
+    async def start_item(self, item, priority=100):
+        self.seq_q.put_nowait(item, item.parent_sequence_id, priority)
         await item.start_condition.wait()
 
+    async def send_items(self, source, sequence_id, priority=100):
+        """
+        Stream items to the driver and wait until it has
+        completed all of them.
+
+        :return: Number of items sent
+        """
+        stream = ItemStream(source, sequence_id, priority)
+        self.seq_q.put_nowait(stream, sequence_id, priority)
+        await stream.finished.wait()
+        return stream.sent
+
     async def finish_item(self, item):
         item.item_ready.set()
         item.item_ready.clear()
@@ -299,14 +1295,17 @@ class uvm_sequencer(uvm_component):
     async def put_req(self, req):
         await self.seq_item_export.put_req(req)
 
-    async def get_response(self, txn_id=None):
-        datum = await self.seq_item_export.get_response(txn_id)
+    async def get_response(self, txn_id=None, sequence_id=None):
+        datum = await self.seq_item_export.get_response(txn_id, sequence_id)
         return datum
 
     async def get_next_item(self):
         next_item = await self.seq_item_export.get_next_item()
         return next_item
 
+    async def get_next_items(self, count):
+        return await self.seq_item_export.get_next_items(count)
+
 
 class uvm_sequence(uvm_object):
     """
@@ -317,11 +1316,14 @@ class uvm_sequence(uvm_object):
     body() gets launched in a thread at start.
     """
 
+    _sequence_ids = itertools.count(1)
+
     def __init__(self, name="uvm_sequence"):
         super().__init__(name)
         self.sequencer = None
         self.running_item = None
-        self.sequence_id = id(self)
+        self.sequence_id = next(uvm_sequence._sequence_ids)
+        self._priority = 100
 
     async def body(self):
         """
@@ -329,27 +1331,97 @@ class uvm_sequence(uvm_object):
         You generally override it in any extension.
         """
 
-    async def start(self, seqr=None):
+    async def start(self, seqr=None, priority=None):
+        """
+        Run body() on seqr. A random stream already in use is
+        reseeded from the new full name.
+
+        :param seqr: The sequencer, or None for a virtual sequence
+        :param priority: Arbitration priority. Defaults to get_priority().
+        """
         if seqr is not None:
             assert (isinstance(seqr, uvm_sequencer)), \
                 "Tried to start a sequence with a non-sequencer"
         self.sequencer = seqr
+        if hasattr(self, "_rng"):
+            self.reseed()
+        if priority is not None:
+            self.set_priority(priority)
         await self.body()
 
-    async def start_item(self, item):
+    def get_full_name(self):
+        """
+        The sequencer's full name and this sequence's name, as in
+        UVM, or just the name before start() or in a virtual
+        sequence
+        """
+        if self.sequencer is None:
+            return self.get_name()
+        return f"{self.sequencer.get_full_name()}.{self.get_name()}"
+
+    def set_priority(self, value):
+        """
+        Set the priority used by the priority arbitration modes.
+        Larger numbers win. The default is 100.
+        """
+        if value < 0:
+            raise error_classes.UVMSequenceError(
+                f"Sequence priority must not be negative: {value}")
+        self._priority = value
+
+    def get_priority(self):
+        return self._priority
+
+    def _check_sequencer(self, action):
+        if self.sequencer is None:
+            raise error_classes.UVMSequenceError(
+                f"Tried {action} in a virtual "
+                f"sequence {self.get_full_name()}")
+
+    async def lock(self):
+        """Wait for exclusive use of the sequencer"""
+        self._check_sequencer("lock")
+        await self.sequencer.lock(self)
+
+    async def grab(self):
+        """Take exclusive use of the sequencer ahead of other requests"""
+        self._check_sequencer("grab")
+        await self.sequencer.grab(self)
+
+    def unlock(self):
+        self._check_sequencer("unlock")
+        self.sequencer.unlock(self)
+
+    def ungrab(self):
+        self._check_sequencer("ungrab")
+        self.sequencer.ungrab(self)
+
+    def is_blocked(self):
+        self._check_sequencer("is_blocked")
+        return self.sequencer.is_blocked(self)
+
+    def has_lock(self):
+        self._check_sequencer("has_lock")
+        return self.sequencer.has_lock(self)
+
+    async def start_item(self, item, priority=None):
         """
         Sends an item to the sequencer and waits to be notified
         when the item has been selected to be run.
 
         :param item: The sequence item to send to the driver.
+        :param priority: Priority of this item. Defaults to
+            get_priority().
         """
         if self.sequencer is None:
             raise error_classes.UVMSequenceError(
                 "Tried start_item in a virtual "
                 f"sequence {self.get_full_name()}")
-        item.parent_sequence_id = self.sequence_id
+        item.set_item_context(self)
         self.running_item = item
-        await self.sequencer.start_item(item)
+        if priority is None:
+            priority = self._priority
+        await self.sequencer.start_item(item, priority)
 
     async def finish_item(self, item):
         if self.sequencer is None:
@@ -358,11 +1430,42 @@ class uvm_sequence(uvm_object):
                 f" sequence: {self.get_full_name()}")
         await self.sequencer.finish_item(item)
 
+    async def send_items(self, source, priority=None):
+        """
+        Send many items without a start_item()/finish_item()
+        handshake for each. The driver takes them in batches
+        with get_next_items() and completes each batch with
+        items_done(). Returns when the driver has completed
+        every item.
+
+        :param source: Iterable or async iterable (such as an
+            async generator) of sequence items
+        :param priority: Arbitration priority. Defaults to
+            get_priority().
+        :return: Number of items sent
+        """
+        if self.sequencer is None:
+            raise error_classes.UVMSequenceError(
+                "Tried send_items in a virtual "
+                f"sequence {self.get_full_name()}")
+        if priority is None:
+            priority = self._priority
+        return await self.sequencer.send_items(source, self.sequence_id,
+                                               priority)
+
     async def get_response(self, transaction_id=None):
+        """
+        Get the response to transaction_id, or to the last item
+        sent with start_item(). A sequence that has only used
+        send_items() gets its next response.
+        """
         if self.sequencer is None:
             raise error_classes.UVMSequenceError(
                 "Tried to do get_response in a virtual "
                 f"sequence: {self.get_full_name()}")
+        if transaction_id is None and self.running_item is None:
+            return await self.sequencer.get_response(
+                sequence_id=self.sequence_id)
         tran_id = transaction_id if transaction_id is not None \
             else self.running_item.transaction_id
         datum = await self.sequencer.get_response(tran_id)
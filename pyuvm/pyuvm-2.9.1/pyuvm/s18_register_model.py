@@ -1,4 +1,43 @@
+import mmap
+import tempfile
+from bisect import bisect_right
+from collections import namedtuple
+from enum import IntEnum
+from operator import itemgetter
+
 from pyuvm import uvm_object
+from pyuvm import error_classes
+from pyuvm.s14_15_python_sequences import uvm_sequence
+
+
+class uvm_status_e(IntEnum):
+    UVM_IS_OK = 0
+    UVM_NOT_OK = 1
+    UVM_HAS_X = 2
+
+
+class uvm_access_e(IntEnum):
+    UVM_READ = 0
+    UVM_WRITE = 1
+    UVM_BURST_READ = 2
+    UVM_BURST_WRITE = 3
+
+
+class uvm_predict_e(IntEnum):
+    UVM_PREDICT_DIRECT = 0
+    UVM_PREDICT_READ = 1
+    UVM_PREDICT_WRITE = 2
+
+
+_PREDICT_READ = uvm_predict_e.UVM_PREDICT_READ
+_PREDICT_WRITE = uvm_predict_e.UVM_PREDICT_WRITE
+
+# Field access policies. Writing a 1 to a W1C bit clears it and
+# writing a 1 to a W1S bit sets it. Reading an RC bit clears it.
+# A WO bit reads back nothing, so a read leaves its mirror alone.
+_WRITE_TAKES = frozenset(("RW", "WO"))
+_READ_TAKES = frozenset(("RW", "RO", "W1C", "W1S"))
+_ACCESS_POLICIES = frozenset(("RW", "RO", "WO", "W1C", "W1S", "RC"))
 
 
 # 18.1.1 Class declaration
@@ -9,68 +48,645 @@ class uvm_reg_block(uvm_object):
     def __init__(self, name=""):
         super().__init__(name)
         self._regs = []
+        self._mems = []
+        self._maps = []
+        self.default_map = None
+        # The mirrored and desired value of each register, by
+        # register index, and the bits that update() can write
+        self._mirrored = []
+        self._desired = []
+        self._update_masks = []
+
+    # 18.1.2.5
+    def create_map(self, name, base_addr, n_bytes=4, endian="little"):
+        """
+        Create a map, add it to this block and make it the
+        default map if the block has none.
+
+        :param name: Map name
+        :param base_addr: Bus address of offset 0
+        :param n_bytes: Bus width in bytes
+        :param endian: "little" or "big"
+        :return: uvm_reg_map
+        """
+        reg_map = uvm_reg_map(name)
+        reg_map.configure(self, base_addr, n_bytes, endian)
+        self.add_map(reg_map)
+        return reg_map
+
+    # 18.1.2.9
+    def add_map(self, reg_map):
+        if reg_map in self._maps:
+            raise error_classes.UVMError(
+                f"Map {reg_map.get_name()} is already in block"
+                f" {self.get_name()}")
+        self._maps.append(reg_map)
+        if self.default_map is None:
+            self.default_map = reg_map
+
+    # 18.1.3.6
+    def get_maps(self):
+        return list(self._maps)
 
     # 18.1.3.7
     # TODO Fix signature
     def get_registers(self):
         return self._regs
 
+    # 18.1.3.10
+    def get_memories(self):
+        return self._mems
+
+    # 18.1.3.19
+    def get_map_by_name(self, name):
+        """
+        :return: The map called name, or None
+        """
+        for reg_map in self._maps:
+            if reg_map.get_name() == name:
+                return reg_map
+        return None
+
+    # 18.1.5.4
+    def get_default_map(self):
+        return self.default_map
+
+    # 18.1.5.5
+    def set_default_map(self, reg_map):
+        if reg_map not in self._maps:
+            raise error_classes.UVMError(
+                f"Map {reg_map.get_name()} is not in block"
+                f" {self.get_name()}")
+        self.default_map = reg_map
+
+    def reset(self):
+        """
+        Set the mirrored and desired values of every register
+        to its reset value
+        """
+        resets = [reg.get_reset() for reg in self._regs]
+        self._mirrored[:] = resets
+        self._desired[:] = resets
+
+    def needs_update(self):
+        """
+        :return: True if any register's desired value differs from
+            its mirrored value in bits that a write can change
+        """
+        return any(map(_differs, self._desired, self._mirrored,
+                       self._update_masks))
+
+    def get_regs_to_update(self):
+        """
+        :return: The registers for which needs_update() is True,
+            found in one pass over the block's value lists
+        """
+        return [reg for reg, desired, mirrored, mask
+                in zip(self._regs, self._desired, self._mirrored,
+                       self._update_masks)
+                if (desired ^ mirrored) & mask]
+
+    async def update(self, map=None):
+        """
+        Write every register whose desired value differs from its
+        mirrored value. The registers are written together with
+        uvm_reg_map.write_regs(), so those at consecutive addresses
+        go in bursts if the adapter supports them.
+
+        :param map: Map to write through, or None for the root of
+            the first map each register was added to
+        :return: uvm_status_e
+        """
+        by_map = {}
+        for reg in self.get_regs_to_update():
+            reg_map = map
+            if reg_map is None:
+                reg_map = _element_map(reg, None).get_root_map()
+            by_map.setdefault(reg_map, {})[reg] = reg.get_update_value()
+        status = uvm_status_e.UVM_IS_OK
+        for reg_map, values in by_map.items():
+            status = _worse(status, await reg_map.write_regs(values))
+        return status
+
+    async def write_regs(self, values, map=None):
+        """
+        uvm_reg_map.write_regs() on map, or on the default map
+        """
+        return await self._get_map(map).write_regs(values)
+
+    async def read_regs(self, regs, map=None):
+        """
+        uvm_reg_map.read_regs() on map, or on the default map
+        """
+        return await self._get_map(map).read_regs(regs)
+
+    def _get_map(self, reg_map):
+        if reg_map is None:
+            reg_map = self.default_map
+            if reg_map is None:
+                raise error_classes.UVMError(
+                    f"Block {self.get_name()} has no map")
+        return reg_map
+
     def _add_register(self, reg):
+        reg._index = len(self._regs)
         self._regs.append(reg)
+        self._mirrored.append(reg.get_reset())
+        self._desired.append(reg.get_reset())
+        self._update_masks.append(reg._update_mask)
+
+    def _add_mem(self, mem):
+        self._mems.append(mem)
 
 
 # 18.2.1 Class declaration
 class uvm_reg_map(uvm_object):
+    """
+    Maps registers, memories and submaps to offsets. The offsets
+    of everything in the map and its submaps are kept in one
+    sorted list of address ranges, so get_reg_by_offset(),
+    get_mem_by_offset() and decode() find the register or memory
+    at any address with a binary search. The list is rebuilt on
+    the first lookup after the map or one of its submaps changes.
+
+    Addressing is by byte. A register takes up its width rounded
+    up to whole bus words, and a memory takes up size such words
+    or more.
+    """
 
     # 18.2.3.1
     def __init__(self, name="uvm_reg_map"):
         super().__init__(name)
         self._parent = None
         self._base_addr = None
+        self._n_bytes = 4
+        self._endian = "little"
         self._regs = {}
+        self._mems = {}
+        self._submaps = {}
+        self._parent_map = None
+        self._rights = {}
+        self._starts = None
+        self._ranges = None
+        self._sequencer = None
+        self._adapter = None
+        self._frontdoor_seq = None
+        # Without a uvm_reg_predictor watching the bus, frontdoor
+        # accesses update the mirror themselves
+        self._auto_predict = True
 
     # 18.2.3.2
-    # TODO Fix signature
     # TODO Support binary and hex values for 'base_addr'
-    def configure(self, parent, base_addr):
+    def configure(self, parent, base_addr, n_bytes=4, endian="little"):
+        """
+        :param parent: uvm_reg_block that holds the map
+        :param base_addr: Bus address of offset 0
+        :param n_bytes: Bus width in bytes
+        :param endian: "little" or "big"
+        """
+        if n_bytes <= 0:
+            raise error_classes.UVMError(
+                f"Map {self.get_name()} needs a positive n_bytes")
+        if endian not in ("big", "little"):
+            raise error_classes.UVMError(
+                f"Map {self.get_name()} endian must be 'big' or 'little'")
         self._parent = parent
         self._base_addr = base_addr
+        self._n_bytes = n_bytes
+        self._endian = endian
+
+    # 18.2.4.1
+    def get_root_map(self):
+        """
+        :return: The map at the top of this map's submap tree
+        """
+        reg_map = self
+        while reg_map._parent_map is not None:
+            reg_map = reg_map._parent_map
+        return reg_map
 
     # 18.2.4.2
     def get_parent(self):
         return self._parent
 
+    # 18.2.4.3
+    def get_parent_map(self):
+        """
+        :return: The map this map is a submap of, or None
+        """
+        return self._parent_map
+
     # 18.2.4.4
-    # TODO Fix signature
-    def get_base_addr(self):
-        return self._base_addr
+    def get_base_addr(self, hier=False):
+        """
+        :param hier: Add the base addresses of the parent maps,
+            giving the bus address of offset 0
+        :return: Base address
+        """
+        base = self._base_addr
+        if hier:
+            base = base or 0
+            if self._parent_map is not None:
+                base += self._parent_map.get_base_addr(hier=True)
+        return base
+
+    # 18.2.4.5
+    def get_n_bytes(self):
+        return self._n_bytes
+
+    # 18.2.4.7
+    def get_endian(self):
+        return self._endian
 
     # 18.2.3.3
-    # TODO Fix signature
-    # TODO Perform validation (e.g. reg not already added)
-    def add_reg(self, reg, offset):
+    def add_reg(self, reg, offset, rights="RW"):
+        """
+        :param reg: uvm_reg to map
+        :param offset: Byte offset in this map
+        :param rights: "RW", "RO" or "WO"
+        """
+        if reg in self._rights:
+            raise error_classes.UVMError(
+                f"Register {reg.get_name()} is already in map"
+                f" {self.get_name()}")
+        self._check_free(reg, offset)
         self._regs[offset] = reg
+        self._rights[reg] = rights
+        reg._maps[self] = offset
+        self._changed()
+
+    # 18.2.3.4
+    def add_mem(self, mem, offset, rights="RW"):
+        """
+        :param mem: uvm_mem to map
+        :param offset: Byte offset of its first word in this map
+        :param rights: "RW", "RO" or "WO"
+        """
+        if mem in self._rights:
+            raise error_classes.UVMError(
+                f"Memory {mem.get_name()} is already in map"
+                f" {self.get_name()}")
+        self._check_free(mem, offset)
+        self._mems[offset] = mem
+        self._rights[mem] = rights
+        mem._maps[self] = offset
+        self._changed()
+
+    def _check_free(self, element, offset):
+        # Other overlaps are found when the index is built
+        other = self._regs.get(offset) or self._mems.get(offset)
+        if other is not None:
+            raise error_classes.UVMError(
+                f"In map {self.get_name()}, {element.get_name()} at"
+                f" {offset:#x} overlaps {other.get_name()}")
+
+    # 18.2.3.5
+    def add_submap(self, child_map, offset):
+        """
+        Map everything in child_map at offset in this map. The
+        child's offsets, and decode() through this map, are
+        relative to offset.
+        """
+        if child_map._parent_map is not None:
+            raise error_classes.UVMError(
+                f"Map {child_map.get_name()} is already a submap of"
+                f" {child_map._parent_map.get_name()}")
+        ancestor = self
+        while ancestor is not None:
+            if ancestor is child_map:
+                raise error_classes.UVMError(
+                    f"Map {child_map.get_name()} cannot be its own submap")
+            ancestor = ancestor._parent_map
+        child_map._parent_map = self
+        child_map._base_addr = offset
+        self._submaps[child_map] = offset
+        self._changed()
+
+    # 18.2.4.8
+    def get_submaps(self):
+        return list(self._submaps)
+
+    def set_sequencer(self, sequencer, adapter):
+        """
+        Send frontdoor accesses through this map and its submaps
+        to sequencer, as items made by adapter
+
+        :param sequencer: uvm_sequencer of the bus agent
+        :param adapter: uvm_reg_adapter for the bus
+        """
+        self._sequencer = sequencer
+        self._adapter = adapter
+        self._frontdoor_seq = uvm_sequence(f"{self.get_name()}_frontdoor")
+        self._frontdoor_seq.sequencer = sequencer
+
+    def get_sequencer(self):
+        """
+        :return: The sequencer of this map or the nearest parent
+            map that has one, or None
+        """
+        reg_map = self._frontdoor_map()
+        return None if reg_map is None else reg_map._sequencer
+
+    def get_adapter(self):
+        """
+        :return: The adapter that goes with get_sequencer()
+        """
+        reg_map = self._frontdoor_map()
+        return None if reg_map is None else reg_map._adapter
+
+    def set_auto_predict(self, on=True):
+        """
+        :param on: Update the mirror when a frontdoor access
+            completes. True by default, as pyuvm has no
+            uvm_reg_predictor.
+        """
+        self._auto_predict = on
+
+    def get_auto_predict(self):
+        return self._auto_predict
+
+    def _frontdoor_map(self):
+        reg_map = self
+        while reg_map is not None and reg_map._sequencer is None:
+            reg_map = reg_map._parent_map
+        return reg_map
+
+    async def write_regs(self, values):
+        """
+        Write registers of this map and its submaps through the
+        frontdoor, lowest address first. If the adapter supports
+        bursts, registers at consecutive bus words are written
+        together in one burst.
+
+        :param values: dict of uvm_reg to value, or (uvm_reg,
+            value) pairs
+        :return: UVM_IS_OK, or the worst status of the accesses
+        """
+        values = dict(values)
+        for reg, value in values.items():
+            reg.set(value)
+        return await self._access(values, True)
+
+    async def read_regs(self, regs):
+        """
+        Read registers of this map and its submaps through the
+        frontdoor, joining them into bursts as write_regs() does
+
+        :param regs: The uvm_reg objects to read
+        :return: (status, list of the values read in the order of
+            regs)
+        """
+        values = dict.fromkeys(regs, 0)
+        status = await self._access(values, False)
+        return status, [values[reg] for reg in regs]
+
+    async def _access(self, values, write):
+        # Split each register into bus words, sort the words by
+        # address, and send runs of consecutive words as bursts.
+        # values holds what to write, or collects what is read.
+        root = self._frontdoor_map()
+        if root is None:
+            raise error_classes.UVMError(
+                f"Map {self.get_name()} has no sequencer. Call"
+                " set_sequencer() on it or a parent map.")
+        adapter = root._adapter
+        n_bytes = root._n_bytes
+        word_bits = 8 * n_bytes
+        word_mask = (1 << word_bits) - 1
+        big = root._endian == "big"
+        forbidden = "RO" if write else "WO"
+        statuses = {}
+        words = []
+        for reg, value in values.items():
+            reg_map = self._map_of(reg)
+            if reg_map._rights[reg] == forbidden:
+                statuses[reg] = uvm_status_e.UVM_NOT_OK
+                continue
+            statuses[reg] = uvm_status_e.UVM_IS_OK
+            addr = reg._maps[reg_map] + reg_map.get_base_addr(hier=True)
+            count = max(1, -(-reg.get_n_bits() // word_bits))
+            for ii in range(count):
+                shift = (count - 1 - ii if big else ii) * word_bits
+                words.append((addr + ii * n_bytes, reg, shift,
+                              value >> shift & word_mask))
+        words.sort(key=itemgetter(0))
+
+        max_beats = 1
+        if adapter.supports_bursts:
+            max_beats = max(1, adapter.max_burst_beats)
+        boundary = adapter.burst_boundary
+        bursts = []
+        for word in words:
+            burst = bursts[-1] if bursts else None
+            if (burst is None or len(burst) == max_beats
+                    or word[0] != burst[-1][0] + n_bytes
+                    or boundary and word[0] // boundary
+                    != burst[0][0] // boundary):
+                bursts.append([word])
+            else:
+                burst.append(word)
+
+        for burst in bursts:
+            if len(burst) == 1:
+                rw = uvm_reg_bus_op(
+                    uvm_access_e.UVM_WRITE if write
+                    else uvm_access_e.UVM_READ,
+                    burst[0][0], burst[0][3] if write else 0, word_bits)
+            else:
+                rw = uvm_reg_bus_op(
+                    uvm_access_e.UVM_BURST_WRITE if write
+                    else uvm_access_e.UVM_BURST_READ,
+                    burst[0][0],
+                    [word[3] for word in burst] if write
+                    else [0] * len(burst),
+                    word_bits, n_beats=len(burst))
+            await root._bus_access(rw)
+            data = rw.data if len(burst) > 1 else [rw.data]
+            for (_, reg, shift, _), beat in zip(burst, data):
+                statuses[reg] = _worse(statuses[reg], rw.status)
+                if not write:
+                    values[reg] |= (beat & word_mask) << shift
+
+        status = uvm_status_e.UVM_IS_OK
+        kind = _PREDICT_WRITE if write else _PREDICT_READ
+        for reg, reg_status in statuses.items():
+            status = _worse(status, reg_status)
+            if root._auto_predict \
+                    and reg_status != uvm_status_e.UVM_NOT_OK:
+                reg.predict(values[reg], kind=kind)
+        return status
+
+    async def _bus_access(self, rw):
+        adapter = self._adapter
+        seq = self._frontdoor_seq
+        item = adapter.reg2bus(rw)
+        await seq.start_item(item)
+        await seq.finish_item(item)
+        if adapter.provides_responses:
+            item = await seq.get_response(item.get_transaction_id())
+        adapter.bus2reg(item, rw)
+
+    def _map_of(self, element):
+        # The map holding element that is this map or a submap of it
+        if self in element._maps:
+            return self
+        for reg_map in element._maps:
+            ancestor = reg_map._parent_map
+            while ancestor is not None:
+                if ancestor is self:
+                    return reg_map
+                ancestor = ancestor._parent_map
+        raise error_classes.UVMError(
+            f"{element.get_name()} is not in map {self.get_name()}"
+            " or its submaps")
 
     # 18.2.4.11
-    def get_registers(self):
-        return list(self._regs.values())
+    def get_registers(self, hier=True):
+        """
+        :param hier: Include the registers of the submaps
+        """
+        regs = list(self._regs.values())
+        if hier:
+            for child_map in self._submaps:
+                regs.extend(child_map.get_registers(hier=True))
+        return regs
+
+    # 18.2.4.13
+    def get_memories(self, hier=True):
+        """
+        :param hier: Include the memories of the submaps
+        """
+        mems = list(self._mems.values())
+        if hier:
+            for child_map in self._submaps:
+                mems.extend(child_map.get_memories(hier=True))
+        return mems
+
+    def get_rights(self, element):
+        """
+        :param element: uvm_reg or uvm_mem in this map or a submap
+        :return: "RW", "RO" or "WO", or None if it is not mapped
+        """
+        rights = self._rights.get(element)
+        if rights is None:
+            for child_map in self._submaps:
+                rights = child_map.get_rights(element)
+                if rights is not None:
+                    break
+        return rights
 
     # 18.2.4.17
-    # TODO Fix signature
-    # TODO Handle case where no register exists at offset
     def get_reg_by_offset(self, offset):
-        return self._regs[offset]
+        """
+        :param offset: Any byte offset in this map
+        :return: The register covering offset, or None
+        """
+        element, _ = self.decode_offset(offset)
+        return element if isinstance(element, uvm_reg) else None
+
+    # 18.2.4.18
+    def get_mem_by_offset(self, offset):
+        """
+        :param offset: Any byte offset in this map
+        :return: The memory covering offset, or None
+        """
+        element, _ = self.decode_offset(offset)
+        return element if isinstance(element, uvm_mem) else None
+
+    def decode_offset(self, offset):
+        """
+        Find what is mapped at a byte offset in this map.
+
+        :param offset: Byte offset from get_base_addr()
+        :return: (uvm_reg, byte offset in the register) or
+            (uvm_mem, word index), or (None, None) if nothing is
+            mapped there
+        """
+        if self._starts is None:
+            self._build_index()
+        ii = bisect_right(self._starts, offset) - 1
+        if ii >= 0:
+            start, end, element, stride = self._ranges[ii]
+            if offset < end:
+                if stride:
+                    return element, (offset - start) // stride
+                return element, offset - start
+        return None, None
+
+    def decode(self, address):
+        """
+        Find what is mapped at a bus address.
+
+        :param address: Bus address
+        :return: As decode_offset()
+        """
+        return self.decode_offset(address - self.get_base_addr(hier=True))
+
+    def _changed(self):
+        reg_map = self
+        while reg_map is not None:
+            reg_map._starts = None
+            reg_map._ranges = None
+            reg_map = reg_map._parent_map
+
+    def _word_bytes(self, n_bits):
+        words = max(1, -(-n_bits // (8 * self._n_bytes)))
+        return words * self._n_bytes
+
+    def _element_ranges(self):
+        # (start, end, element, stride) in this map's offsets, where
+        # stride is the bytes per memory word and 0 for a register
+        for offset, reg in self._regs.items():
+            yield offset, offset + self._word_bytes(reg.get_n_bits()), \
+                reg, 0
+        for offset, mem in self._mems.items():
+            stride = self._word_bytes(mem.get_n_bits())
+            yield offset, offset + stride * mem.get_size(), mem, stride
+        for child_map, base in self._submaps.items():
+            if child_map._ranges is None:
+                child_map._build_index()
+            for start, end, element, stride in child_map._ranges:
+                yield start + base, end + base, element, stride
+
+    def _build_index(self):
+        ranges = sorted(self._element_ranges(), key=lambda rr: rr[0])
+        for before, after in zip(ranges, ranges[1:]):
+            if after[0] < before[1]:
+                raise error_classes.UVMError(
+                    f"In map {self.get_name()}, {after[2].get_name()} at"
+                    f" {after[0]:#x} overlaps {before[2].get_name()} at"
+                    f" {before[0]:#x}-{before[1] - 1:#x}")
+        self._ranges = ranges
+        self._starts = [rr[0] for rr in ranges]
 
 
 # 18.4.1 Class declaration
 class uvm_reg(uvm_object):
+    """
+    A register's mirrored and desired values live in lists in its
+    uvm_reg_block. Adding a field works out, once, which bits of
+    the register each access policy covers, so set(), predict()
+    and needs_update() are a few integer operations on those
+    masks.
+    """
 
     # 18.3.2.1
-    # TODO Fix signature
-    def __init__(self, name=""):
+    def __init__(self, name="", n_bits=None):
+        """
+        :param name: Register name
+        :param n_bits: Width in bits, or None for the width its
+            fields cover
+        """
         super().__init__(name)
         self._parent = None
+        self._index = None
         self._fields = []
+        # (make, index) for fields that make(self, index) creates on
+        # first use, as a register model loaded from a cache has
+        self._pending_fields = None
+        self._n_bits = n_bits
+        self._maps = {}
+        self._compile()
 
     # 18.4.2.2
     def configure(self, parent):
@@ -81,19 +697,289 @@ class uvm_reg(uvm_object):
     def get_parent(self):
         return self._parent
 
+    # 18.4.3.4
+    def get_maps(self):
+        return list(self._maps)
+
+    # 18.4.3.10
+    def get_n_bits(self):
+        """
+        :return: Width given to the constructor, or else the
+            width up to the top of the highest field
+        """
+        if self._n_bits is not None:
+            return self._n_bits
+        return max((field.get_lsb_pos() + field.get_n_bits()
+                    for field in self.get_fields()), default=0)
+
+    def get_n_bytes(self):
+        return (self.get_n_bits() + 7) // 8
+
+    # 18.4.3.12
+    def get_offset(self, map=None):
+        """
+        :param map: Map to look in, or None for the first map the
+            register was added to
+        :return: Byte offset in that map
+        """
+        return _element_offset(self, map)
+
+    # 18.4.3.13
+    def get_address(self, map=None):
+        """
+        :param map: As get_offset()
+        :return: Bus address
+        """
+        return _element_address(self, map)
+
     # 18.4.3.11
-    # TODO Return fields in canonical order (LSB to MSB)
     def get_fields(self):
+        """
+        :return: The fields from LSB to MSB
+        """
+        if self._pending_fields is not None:
+            make, index = self._pending_fields
+            self._pending_fields = None
+            self._fields = make(self, index)
         return self._fields
 
-    # TODO Add validation
-    # - field not None
-    # - field not already added
-    # - field fits in reg
-    # - field doesn't overlap with any other field
-    # - etc.
     def _add_field(self, field):
-        self._fields.append(field)
+        self._add_fields([field])
+
+    def _add_fields(self, fields):
+        # Check and add several fields, compiling the masks once
+        existing = self.get_fields()
+        for field in fields:
+            if field in existing:
+                raise error_classes.UVMError(
+                    f"Field {field.get_name()} is already in register"
+                    f" {self.get_name()}")
+        combined = sorted(existing + list(fields),
+                          key=uvm_reg_field.get_lsb_pos)
+        for below, above in zip(combined, combined[1:]):
+            if above.get_lsb_pos() < below.get_lsb_pos() \
+                    + below.get_n_bits():
+                raise error_classes.UVMError(
+                    f"Field {above.get_name()} overlaps field"
+                    f" {below.get_name()} in register {self.get_name()}")
+        if self._n_bits is not None and combined:
+            top = combined[-1].get_lsb_pos() + combined[-1].get_n_bits()
+            if top > self._n_bits:
+                raise error_classes.UVMError(
+                    f"Field {combined[-1].get_name()} ends at bit"
+                    f" {top - 1}, past the {self._n_bits} bits of"
+                    f" register {self.get_name()}")
+        self._fields = combined
+        self._compile()
+        if self._parent is not None:
+            block = self._parent
+            mask = reset = 0
+            for field in fields:
+                mask |= field._mask()
+                reset |= field.get_reset() << field.get_lsb_pos() \
+                    & field._mask()
+            block._mirrored[self._index] = \
+                block._mirrored[self._index] & ~mask | reset
+            block._desired[self._index] = \
+                block._desired[self._index] & ~mask | reset
+            block._update_masks[self._index] = self._update_mask
+
+    def _get_compiled(self):
+        return (self._width_mask, self._reset, self._write_take,
+                self._write_keep, self._w1c, self._w1s, self._read_take,
+                self._read_keep, self._update_mask)
+
+    def _set_compiled(self, compiled, make_fields, index):
+        # Take the masks of a register with these fields, and leave
+        # make_fields(self, index) to create them when needed
+        (self._width_mask, self._reset, self._write_take,
+         self._write_keep, self._w1c, self._w1s, self._read_take,
+         self._read_keep, self._update_mask) = compiled
+        self._pending_fields = (make_fields, index)
+
+    def _compile(self):
+        # Bits by what a write or read does to the mirror. Bits
+        # outside any field are kept.
+        fields = self.get_fields()
+        if not fields:
+            width = (1 << self.get_n_bits()) - 1
+            self._set_compiled((width, 0, 0, width, 0, 0, 0, width, 0),
+                               None, None)
+            self._pending_fields = None
+            return
+        masks = dict.fromkeys(_ACCESS_POLICIES, 0)
+        reset = 0
+        for field in fields:
+            masks[field.get_access()] |= field._mask()
+            reset |= field.get_reset() << field.get_lsb_pos() \
+                & field._mask()
+        self._width_mask = (1 << self.get_n_bits()) - 1
+        self._reset = reset & self._width_mask
+        self._write_take = 0
+        for access in _WRITE_TAKES:
+            self._write_take |= masks[access]
+        self._write_keep = self._width_mask & ~(
+            self._write_take | masks["W1C"] | masks["W1S"])
+        self._w1c = masks["W1C"]
+        self._w1s = masks["W1S"]
+        self._read_take = 0
+        for access in _READ_TAKES:
+            self._read_take |= masks[access]
+        self._read_keep = self._width_mask & ~(
+            self._read_take | masks["RC"])
+        self._update_mask = self._write_take | self._w1c | self._w1s
+
+    def _write_policy(self, current, value):
+        # The value a register holding current holds after a write
+        return (value & self._write_take | current & self._write_keep
+                | current & ~value & self._w1c
+                | (current | value) & self._w1s)
+
+    def _block(self):
+        if self._parent is None:
+            raise error_classes.UVMError(
+                f"Configure register {self.get_name()} in a block"
+                " before using its value")
+        return self._parent
+
+    def set(self, value):
+        """
+        Set the desired value as a write of value would, so RO
+        and RC bits do not change, a 1 clears a W1C bit and a 1
+        sets a W1S bit
+        """
+        block = self._block()
+        block._desired[self._index] = self._write_policy(
+            block._desired[self._index], value)
+
+    def get(self):
+        """
+        :return: The desired value
+        """
+        return self._block()._desired[self._index]
+
+    def get_mirrored_value(self):
+        return self._block()._mirrored[self._index]
+
+    def needs_update(self):
+        """
+        :return: True if the desired value differs from the
+            mirrored value in bits that a write can change
+        """
+        block = self._block()
+        return bool((block._desired[self._index]
+                     ^ block._mirrored[self._index]) & self._update_mask)
+
+    def reset(self):
+        """
+        Set the mirrored and desired values to the reset value
+        """
+        block = self._block()
+        block._mirrored[self._index] = self._reset
+        block._desired[self._index] = self._reset
+
+    def get_reset(self):
+        """
+        :return: The reset values of the fields, as one value
+        """
+        return self._reset
+
+    def get_update_value(self):
+        """
+        :return: The value to write to make the register hold its
+            desired value. A W1C bit is written 1 to clear it and a
+            W1S bit is written 1 to set it.
+        """
+        block = self._block()
+        desired = block._desired[self._index]
+        mirrored = block._mirrored[self._index]
+        return (desired & self._write_take
+                | ~desired & mirrored & self._w1c
+                | desired & ~mirrored & self._w1s)
+
+    def predict(self, value, be=-1,
+                kind=uvm_predict_e.UVM_PREDICT_DIRECT):
+        """
+        Update the mirrored and desired values from a value that
+        was written to or read from the register.
+
+        :param value: Value written, read, or to set directly
+        :param be: Byte enables, one bit per byte, or -1 for all
+        :param kind: UVM_PREDICT_WRITE applies the write policies,
+            UVM_PREDICT_READ the read policies, and
+            UVM_PREDICT_DIRECT sets the value as it is
+        :return: True
+        """
+        # _predict() inlined, as monitors call this for every access
+        block = self._parent
+        if block is None:
+            block = self._block()
+        index = self._index
+        mirrored = block._mirrored[index]
+        if kind == _PREDICT_WRITE:
+            new = (value & self._write_take | mirrored & self._write_keep
+                   | mirrored & ~value & self._w1c
+                   | (mirrored | value) & self._w1s)
+        elif kind == _PREDICT_READ:
+            new = value & self._read_take | mirrored & self._read_keep
+        else:
+            new = value & self._width_mask
+        if be != -1:
+            bits = _byte_mask(be)
+            new = new & bits | mirrored & ~bits
+        block._mirrored[index] = block._desired[index] = new
+        return True
+
+    def _predict(self, value, bits, kind):
+        block = self._block()
+        index = self._index
+        mirrored = block._mirrored[index]
+        if kind == _PREDICT_WRITE:
+            new = self._write_policy(mirrored, value)
+        elif kind == _PREDICT_READ:
+            new = value & self._read_take | mirrored & self._read_keep
+        else:
+            new = value
+        new = new & bits | mirrored & ~bits
+        block._mirrored[index] = new
+        block._desired[index] = new
+
+    async def write(self, value, map=None):
+        """
+        Write value through the frontdoor, as
+        uvm_reg_map.write_regs() does
+
+        :param value: Value to write
+        :param map: Map to write through, or None for the first
+            map the register was added to
+        :return: uvm_status_e
+        """
+        if map is None:
+            map = _element_map(self, None)
+        return await map.write_regs({self: value})
+
+    async def read(self, map=None):
+        """
+        Read the register through the frontdoor, as
+        uvm_reg_map.read_regs() does
+
+        :param map: As write()
+        :return: (uvm_status_e, value)
+        """
+        if map is None:
+            map = _element_map(self, None)
+        status, values = await map.read_regs([self])
+        return status, values[0]
+
+    async def update(self, map=None):
+        """
+        Write get_update_value() if needs_update() is True
+
+        :return: uvm_status_e
+        """
+        if self.needs_update():
+            return await self.write(self.get_update_value(), map)
+        return uvm_status_e.UVM_IS_OK
 
 
 # 18.5.1 Class declaration
@@ -112,16 +998,31 @@ class uvm_reg_field(uvm_object):
     # 18.5.3.2
     # TODO Fix signature
     def configure(self, parent, size, lsb_pos, access, is_volatile, reset):
-        # TODO Add validation of arguments
         # TODO Support binary and hex values for 'reset'
-        self._parent = parent
+        self._set_config(parent, size, lsb_pos, access, is_volatile, reset)
         parent._add_field(self)
+
+    def _set_config(self, parent, size, lsb_pos, access, is_volatile,
+                    reset):
+        access = access.upper()
+        if access not in _ACCESS_POLICIES:
+            raise error_classes.UVMError(
+                f"Field {self.get_name()} access {access} is not one of"
+                f" {', '.join(sorted(_ACCESS_POLICIES))}")
+        if size <= 0 or lsb_pos < 0:
+            raise error_classes.UVMError(
+                f"Field {self.get_name()} needs a positive size and a"
+                " non-negative lsb_pos")
+        self._parent = parent
         self._size = size
         self._lsb_pos = lsb_pos
         self._access = access
         self._is_volatile = is_volatile
         self._reset = reset
 
+    def _mask(self):
+        return ((1 << self._size) - 1) << self._lsb_pos
+
     # 18.5.4.1
     def get_parent(self):
         # TODO Check that 'configure' was called
@@ -151,3 +1052,513 @@ class uvm_reg_field(uvm_object):
     def get_reset(self):
         # TODO Check that 'configure' was called
         return self._reset
+
+    def set(self, value):
+        """
+        Set the desired value as a write of value would
+        """
+        reg = self._parent
+        block = reg._block()
+        desired = block._desired[reg._index]
+        new = reg._write_policy(desired, value << self._lsb_pos)
+        mask = self._mask()
+        block._desired[reg._index] = new & mask | desired & ~mask
+
+    def get(self):
+        """
+        :return: The desired value
+        """
+        reg = self._parent
+        return (reg._block()._desired[reg._index] >> self._lsb_pos
+                & (1 << self._size) - 1)
+
+    def get_mirrored_value(self):
+        reg = self._parent
+        return (reg._block()._mirrored[reg._index] >> self._lsb_pos
+                & (1 << self._size) - 1)
+
+    def reset(self):
+        """
+        Set the mirrored and desired values to the reset value
+        """
+        reg = self._parent
+        reg._predict(self._reset << self._lsb_pos, self._mask(),
+                     uvm_predict_e.UVM_PREDICT_DIRECT)
+
+    def needs_update(self):
+        reg = self._parent
+        block = reg._block()
+        return bool((block._desired[reg._index]
+                     ^ block._mirrored[reg._index])
+                    & self._mask() & reg._update_mask)
+
+    def predict(self, value, kind=uvm_predict_e.UVM_PREDICT_DIRECT):
+        """
+        Update this field's bits of the register's mirrored and
+        desired values, as uvm_reg.predict() does
+
+        :return: True
+        """
+        self._parent._predict(value << self._lsb_pos, self._mask(), kind)
+        return True
+
+
+# 18.6.1 Class declaration
+class uvm_mem(uvm_object):
+
+    # 18.6.3.1
+    def __init__(self, name, size, n_bits, access="RW"):
+        """
+        :param name: Memory name
+        :param size: Number of words
+        :param n_bits: Bits per word
+        :param access: "RW" or "RO"
+        """
+        super().__init__(name)
+        if size <= 0 or n_bits <= 0:
+            raise error_classes.UVMError(
+                f"Memory {name} needs a positive size and n_bits")
+        self._parent = None
+        self._size = size
+        self._n_bits = n_bits
+        self._access = access
+        self._maps = {}
+        self._store = None
+
+    # 18.6.3.2
+    def configure(self, parent):
+        self._parent = parent
+        parent._add_mem(self)
+
+    # 18.6.4.3
+    def get_parent(self):
+        return self._parent
+
+    # 18.6.4.6
+    def get_maps(self):
+        return list(self._maps)
+
+    # 18.6.4.8
+    def get_size(self):
+        return self._size
+
+    # 18.6.4.9
+    def get_n_bytes(self):
+        return (self._n_bits + 7) // 8
+
+    # 18.6.4.10
+    def get_n_bits(self):
+        return self._n_bits
+
+    # 18.6.4.12
+    def get_access(self, map=None):
+        return self._access
+
+    # 18.6.4.14
+    def get_offset(self, offset=0, map=None):
+        """
+        :param offset: Word index
+        :param map: Map to look in, or None for the first map the
+            memory was added to
+        :return: Byte offset of the word in that map
+        """
+        reg_map = _element_map(self, map)
+        return (_element_offset(self, reg_map)
+                + offset * reg_map._word_bytes(self._n_bits))
+
+    # 18.6.4.15
+    def get_address(self, offset=0, map=None):
+        """
+        :param offset: Word index
+        :param map: As get_offset()
+        :return: Bus address of the word
+        """
+        reg_map = _element_map(self, map)
+        return (_element_address(self, reg_map)
+                + offset * reg_map._word_bytes(self._n_bits))
+
+    def get_store(self):
+        """
+        :return: The uvm_mem_store that holds the memory's
+            contents, made with the default page size on first use
+        """
+        if self._store is None:
+            self._store = uvm_mem_store(self._size * self.get_n_bytes())
+        return self._store
+
+    def set_store(self, store):
+        """
+        Hold the contents in store, such as one backed by a
+        temporary file
+        """
+        if store.get_size() < self._size * self.get_n_bytes():
+            raise error_classes.UVMError(
+                f"Memory {self.get_name()} needs a store of at least"
+                f" {self._size * self.get_n_bytes()} bytes")
+        self._store = store
+
+    def peek(self, offset):
+        """
+        :param offset: Word index
+        :return: The word's value, 0 if it was never written
+        """
+        n_bytes = self.get_n_bytes()
+        self._check_offset(offset, 1)
+        return self.get_store().read_word(offset * n_bytes, n_bytes)
+
+    def poke(self, offset, value):
+        """
+        :param offset: Word index
+        :param value: Value, truncated to n_bits
+        """
+        n_bytes = self.get_n_bytes()
+        self._check_offset(offset, 1)
+        self.get_store().write_word(offset * n_bytes,
+                                    value & (1 << self._n_bits) - 1,
+                                    n_bytes)
+
+    def burst_peek(self, offset, count):
+        """
+        :param offset: Word index of the first word
+        :param count: Number of words
+        :return: bytes of the words, little endian, as
+            uvm_mem_store.read() returns them
+        """
+        n_bytes = self.get_n_bytes()
+        self._check_offset(offset, count)
+        return self.get_store().read(offset * n_bytes, count * n_bytes)
+
+    def burst_poke(self, offset, data):
+        """
+        :param offset: Word index of the first word
+        :param data: Bytes-like object of whole little-endian words
+        """
+        n_bytes = self.get_n_bytes()
+        length = memoryview(data).nbytes
+        if length % n_bytes:
+            raise error_classes.UVMError(
+                f"Memory {self.get_name()} words are {n_bytes} bytes,"
+                f" so {length} bytes is not a whole number of words")
+        self._check_offset(offset, length // n_bytes)
+        self.get_store().write(offset * n_bytes, data)
+
+    def _check_offset(self, offset, count):
+        if offset < 0 or offset + count > self._size:
+            raise error_classes.UVMError(
+                f"Words {offset}-{offset + count - 1} are outside"
+                f" memory {self.get_name()} of {self._size} words")
+
+
+uvm_mem_stats = namedtuple(
+    "uvm_mem_stats", ["pages", "resident_bytes", "reads", "writes",
+                      "bytes_read", "bytes_written", "copied_reads"])
+uvm_mem_stats.__doc__ = """
+Usage of a uvm_mem_store. pages is the number of pages written,
+and copied_reads the number of reads that spanned pages and so
+were gathered from more than one.
+"""
+
+
+class uvm_mem_store:
+    """
+    Sparse byte-addressed memory for memory models and
+    scoreboards. Memory is allocated a page at a time when a page
+    is first written, so a model of a 4 GB address space holds
+    only the pages it touches. Pages never written read as zero.
+
+    A store made with temp_file=True keeps the whole range in a
+    sparse, memory-mapped temporary file instead, and the operating
+    system allocates the file's pages as they are written.
+
+    read() returns a bytes copy, so later writes do not change
+    data already read.
+    """
+
+    def __init__(self, size, page_size=4096, temp_file=False,
+                 directory=None):
+        """
+        :param size: Size in bytes
+        :param page_size: Bytes per page, a power of two
+        :param temp_file: Keep the contents in a memory-mapped
+            temporary file
+        :param directory: Directory for the temporary file, or
+            None for the system's temporary directory
+        """
+        if size <= 0:
+            raise error_classes.UVMError(
+                "uvm_mem_store needs a positive size")
+        if page_size <= 0 or page_size & (page_size - 1):
+            raise error_classes.UVMError(
+                f"uvm_mem_store page_size {page_size} is not a power"
+                " of two")
+        self._size = size
+        self._page_size = page_size
+        self._shift = page_size.bit_length() - 1
+        self._offset_mask = page_size - 1
+        # Page number to a writable view of the page's bytearray,
+        # or to None in a file-backed store
+        self._pages = {}
+        self._zero = memoryview(bytes(page_size))
+        self._file = None
+        self._map = None
+        self._view = None
+        if temp_file:
+            self._file = tempfile.TemporaryFile(dir=directory)
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+            self._view = memoryview(self._map)
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.copied_reads = 0
+
+    def get_size(self):
+        return self._size
+
+    def get_page_size(self):
+        return self._page_size
+
+    def _check(self, addr, length):
+        if addr < 0 or length < 0 or addr + length > self._size:
+            raise error_classes.UVMError(
+                f"Bytes {addr:#x}-{addr + length - 1:#x} are outside a"
+                f" uvm_mem_store of {self._size:#x} bytes")
+
+    def read(self, addr, length):
+        """
+        :param addr: Byte address
+        :param length: Number of bytes
+        :return: bytes
+        """
+        self._check(addr, length)
+        self.reads += 1
+        self.bytes_read += length
+        if self._view is not None:
+            return self._view[addr:addr + length].tobytes()
+        start = addr & self._offset_mask
+        if start + length <= self._page_size:
+            page = self._pages.get(addr >> self._shift)
+            if page is None:
+                return bytes(length)
+            return page[start:start + length].tobytes()
+        self.copied_reads += 1
+        chunks = []
+        done = 0
+        while done < length:
+            count = min(length - done, self._page_size - start)
+            page = self._pages.get((addr + done) >> self._shift)
+            if page is None:
+                page = self._zero
+            chunks.append(page[start:start + count])
+            done += count
+            start = 0
+        return b"".join(chunks)
+
+    def write(self, addr, data):
+        """
+        :param addr: Byte address
+        :param data: Bytes-like object
+        """
+        data = memoryview(data).cast("B")
+        length = len(data)
+        self._check(addr, length)
+        self.writes += 1
+        self.bytes_written += length
+        pages = self._pages
+        if self._view is not None:
+            self._view[addr:addr + length] = data
+            for number in range(addr >> self._shift,
+                                (addr + length - 1 >> self._shift) + 1):
+                pages[number] = None
+            return
+        start = addr & self._offset_mask
+        done = 0
+        while done < length:
+            count = min(length - done, self._page_size - start)
+            number = (addr + done) >> self._shift
+            page = pages.get(number)
+            if page is None:
+                page = pages[number] = memoryview(
+                    bytearray(self._page_size))
+            page[start:start + count] = data[done:done + count]
+            done += count
+            start = 0
+
+    def read_word(self, addr, n_bytes=4, byteorder="little"):
+        """
+        :param addr: Byte address
+        :param n_bytes: Bytes in the word
+        :param byteorder: "little" or "big"
+        :return: The word as an int
+        """
+        return int.from_bytes(self.read(addr, n_bytes), byteorder)
+
+    def write_word(self, addr, value, n_bytes=4, byteorder="little"):
+        """
+        :param addr: Byte address
+        :param value: Value, truncated to n_bytes
+        :param n_bytes: Bytes in the word
+        :param byteorder: "little" or "big"
+        """
+        self.write(addr, (value & (1 << 8 * n_bytes) - 1).to_bytes(
+            n_bytes, byteorder))
+
+    def get_stats(self):
+        """
+        :return: uvm_mem_stats
+        """
+        return uvm_mem_stats(len(self._pages),
+                             len(self._pages) * self._page_size,
+                             self.reads, self.writes, self.bytes_read,
+                             self.bytes_written, self.copied_reads)
+
+    def clear(self):
+        """
+        Free every page, so the whole store reads as zero
+        """
+        if self._view is not None:
+            # Cutting the file to nothing frees its disk blocks, and
+            # the mapping reads zeros once it has its size back
+            self._file.truncate(0)
+            self._file.truncate(self._size)
+        self._pages.clear()
+
+    def close(self):
+        """
+        Unmap and delete the temporary file of a file-backed store
+        """
+        if self._view is not None:
+            self._view.release()
+            self._map.close()
+            self._file.close()
+            self._view = None
+            self._map = None
+            self._file = None
+        self._pages.clear()
+
+
+class uvm_reg_bus_op:
+    """
+    One bus access, as a map passes it to
+    uvm_reg_adapter.reg2bus() and gets it back from bus2reg().
+
+    A UVM_READ or UVM_WRITE moves one bus word, and data is an
+    int. A UVM_BURST_READ or UVM_BURST_WRITE moves n_beats words
+    at consecutive bus words from addr, and data is a list with
+    one int per beat. bus2reg() sets status, and data for a read.
+    """
+    __slots__ = ("kind", "addr", "data", "n_bits", "byte_en", "status",
+                 "n_beats")
+
+    def __init__(self, kind, addr, data=0, n_bits=0, byte_en=-1,
+                 n_beats=1):
+        """
+        :param kind: uvm_access_e
+        :param addr: Bus address of the first word
+        :param data: Value written, or list of beat values
+        :param n_bits: Bits per word
+        :param byte_en: Byte enables, or -1 for all
+        :param n_beats: Number of words
+        """
+        self.kind = kind
+        self.addr = addr
+        self.data = data
+        self.n_bits = n_bits
+        self.byte_en = byte_en
+        self.status = uvm_status_e.UVM_IS_OK
+        self.n_beats = n_beats
+
+    def __repr__(self):
+        return (f"uvm_reg_bus_op({self.kind.name}, {self.addr:#x},"
+                f" {self.data!r}, n_beats={self.n_beats},"
+                f" status={self.status.name})")
+
+
+# 19.2.1 Class declaration
+class uvm_reg_adapter(uvm_object):
+    """
+    Converts between uvm_reg_bus_op and the sequence items of one
+    bus. Override reg2bus() and bus2reg().
+
+    An adapter that sets supports_bursts must turn a
+    UVM_BURST_READ or UVM_BURST_WRITE into one item. Maps then
+    join accesses to consecutive bus words into bursts of up to
+    max_burst_beats words that do not cross a multiple of
+    burst_boundary bytes, such as the 4 KB boundary of AXI. A
+    burst_boundary of 0 means there is none.
+    """
+
+    def __init__(self, name="uvm_reg_adapter"):
+        super().__init__(name)
+        self.supports_byte_enable = False
+        self.provides_responses = False
+        self.supports_bursts = False
+        self.max_burst_beats = 256
+        self.burst_boundary = 4096
+
+    def reg2bus(self, rw):
+        """
+        :param rw: uvm_reg_bus_op
+        :return: Sequence item that performs the access
+        """
+        raise error_classes.UVMFatalError(
+            "You must override the reg2bus() method in"
+            f" uvm_reg_adapter {self.get_name()}")
+
+    def bus2reg(self, bus_item, rw):
+        """
+        Set rw.status, and rw.data for a read, from a completed
+        item
+
+        :param bus_item: The item from reg2bus() once the driver
+            has completed it, or its response if
+            provides_responses is True
+        :param rw: The uvm_reg_bus_op given to reg2bus()
+        """
+        raise error_classes.UVMFatalError(
+            "You must override the bus2reg() method in"
+            f" uvm_reg_adapter {self.get_name()}")
+
+
+def _worse(status, other):
+    # UVM_NOT_OK outranks UVM_HAS_X, which outranks UVM_IS_OK
+    if status == uvm_status_e.UVM_IS_OK \
+            or other == uvm_status_e.UVM_NOT_OK:
+        return other
+    return status
+
+
+def _differs(desired, mirrored, mask):
+    return (desired ^ mirrored) & mask
+
+
+def _byte_mask(be):
+    mask = 0
+    byte = 0
+    while be >> byte:
+        if be >> byte & 1:
+            mask |= 0xFF << 8 * byte
+        byte += 1
+    return mask
+
+
+def _element_map(element, reg_map):
+    if reg_map is None:
+        if not element._maps:
+            raise error_classes.UVMError(
+                f"{element.get_name()} is not in a map")
+        return next(iter(element._maps))
+    if reg_map not in element._maps:
+        raise error_classes.UVMError(
+            f"{element.get_name()} is not in map {reg_map.get_name()}")
+    return reg_map
+
+
+def _element_offset(element, reg_map):
+    return element._maps[_element_map(element, reg_map)]
+
+
+def _element_address(element, reg_map):
+    reg_map = _element_map(element, reg_map)
+    return element._maps[reg_map] + reg_map.get_base_addr(hier=True)
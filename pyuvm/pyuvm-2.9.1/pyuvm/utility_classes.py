@@ -1,9 +1,16 @@
-from collections import OrderedDict
+from collections import OrderedDict, deque
+import copy
+import hashlib
 import logging
 import fnmatch
-import cocotb.queue
+import pickle
+import struct
+import sys
+import tempfile
+import cocotb
 from cocotb.triggers import Event, NullTrigger
-from cocotb.queue import QueueEmpty
+from cocotb.queue import QueueEmpty, QueueFull
+from pyuvm import error_classes
 
 FIFO_DEBUG = 5
 PYUVM_DEBUG = 4
@@ -161,15 +168,276 @@ class FactoryData(metaclass=Singleton):
             return requested_type
 
 
+class uvm_field:
+    """
+    Declares one data field of a uvm_object subclass. List them,
+    first field first, in the class's uvm_fields::
+
+        class BusItem(uvm_sequence_item):
+            __slots__ = ("addr", "data", "we", "beats")
+            uvm_fields = (uvm_field("addr", 32), uvm_field("data", 32),
+                          uvm_field("we", 1),
+                          uvm_field("beats", mutable=True))
+
+    do_copy(), do_compare() and clone() are generated from the
+    fields. Set uvm_fields_eq = True in the class to generate
+    __eq__() and __hash__() as well.
+
+    A subclass that declares uvm_fields adds them after the fields
+    of its parents, and its generated methods cover them all.
+
+    pack() needs a width for every field. It places the first field
+    in the most significant bits and pads the last byte with zeros,
+    so a subclass packs its parents' fields first.
+    """
+
+    def __init__(self, name, width=None, endian="big", signed=False,
+                 mutable=False):
+        """
+        :param name: Attribute name
+        :param width: Width in bits, or None for a field that is
+            copied and compared but not packed
+        :param endian: "big" or "little". Little-endian fields must
+            be a whole number of bytes wide.
+        :param signed: Unpack as a two's complement number
+        :param mutable: The field holds a container, such as a list,
+            that copies get their own deep copy of. Other fields are
+            shared by reference.
+        """
+        if not name.isidentifier():
+            raise error_classes.UVMError(
+                f"uvm_field name {name!r} is not an identifier")
+        if width is not None and width <= 0:
+            raise error_classes.UVMError(
+                f"uvm_field {name} needs a positive width")
+        if endian not in ("big", "little"):
+            raise error_classes.UVMError(
+                f"uvm_field {name} endian must be 'big' or 'little'")
+        if endian == "little" and width is not None and width % 8:
+            raise error_classes.UVMError(
+                f"Little-endian uvm_field {name} must be a whole"
+                " number of bytes wide")
+        self.name = name
+        self.width = width
+        self.endian = endian
+        self.signed = signed
+        self.mutable = mutable
+
+    def __repr__(self):
+        return (f"uvm_field({self.name!r}, {self.width},"
+                f" endian={self.endian!r}, signed={self.signed},"
+                f" mutable={self.mutable})")
+
+
+_ATOMIC = frozenset((int, float, bool, str, bytes, type(None)))
+
+
+def _copy_mutable(value):
+    """
+    Deep copy a mutable uvm_field. Lists, dicts and bytearrays of
+    numbers, strings and bytes, and lists and dicts of those, are
+    rebuilt directly. Anything else goes to copy.deepcopy().
+    """
+    kind = type(value)
+    if kind is list:
+        return [item if type(item) in _ATOMIC else _copy_mutable(item)
+                for item in value]
+    if kind is dict:
+        return {key: item if type(item) in _ATOMIC
+                else _copy_mutable(item)
+                for key, item in value.items()}
+    if kind is bytearray:
+        return bytearray(value)
+    return copy.deepcopy(value)
+
+
+def _field_methods(cls, fields, eq):
+    """
+    Generate do_copy(), do_compare() and clone() for cls from
+    fields, which hold the uvm_fields of cls and its parents, and
+    __eq__() and __hash__() if eq is True.
+
+    do_copy() first calls the nearest do_copy() in the MRO that was
+    not generated, so the name and anything a hand-written parent
+    copies come along. do_compare() compares only the fields.
+    """
+    parent_copy = getattr(super(cls, cls), "do_copy")
+    base_copy = getattr(parent_copy, "_uvm_base", parent_copy)
+    copies = [f"self.{field.name} = _copy_mutable(rhs.{field.name})"
+              if field.mutable else f"self.{field.name} = rhs.{field.name}"
+              for field in fields]
+    same = " and ".join(f"self.{field.name} == rhs.{field.name}"
+                        for field in fields)
+    key = "".join(f"self.{field.name}, " for field in fields
+                  if not field.mutable)
+    source = (
+        "def do_copy(self, rhs):\n"
+        "    _base_copy(self, rhs)\n"
+        + "".join(f"    {line}\n" for line in copies)
+        + "def clone(self):\n"
+        "    new = type(self)(self.get_name())\n"
+        "    if type(self).do_copy is not do_copy:\n"
+        "        new.copy(self)\n"
+        "        return new\n"
+        "    _base_copy(new, self)\n"
+        + "".join(f"    {line.replace('self.', 'new.', 1)}\n"
+                  .replace("rhs.", "self.") for line in copies)
+        + "    return new\n"
+        "def do_compare(self, rhs):\n"
+        f"    return isinstance(rhs, _cls) and {same}\n"
+        "def __eq__(self, rhs):\n"
+        "    if not isinstance(rhs, _cls):\n"
+        "        return NotImplemented\n"
+        f"    return {same}\n"
+        "def __hash__(self):\n"
+        f"    return hash(({key}))\n")
+    namespace = {"_cls": cls, "_base_copy": base_copy,
+                 "_copy_mutable": _copy_mutable}
+    exec(compile(source, f"<uvm_fields of {cls.__name__}>", "exec"),
+         namespace)
+    namespace["do_copy"]._uvm_base = base_copy
+    names = ["do_copy", "clone", "do_compare"]
+    if eq:
+        names += ["__eq__", "__hash__"]
+    return {name: namespace[name] for name in names}
+
+
+def _class_fields(cls):
+    """
+    The uvm_fields of cls and its parents, those of the most
+    distant parent first
+    """
+    fields = []
+    names = {}
+    for klass in reversed(cls.__mro__):
+        for field in klass.__dict__.get("uvm_fields") or ():
+            if field.name in names:
+                raise error_classes.UVMError(
+                    f"uvm_field {field.name} of {klass.__name__} is"
+                    f" already declared in {names[field.name]}")
+            names[field.name] = klass.__name__
+            fields.append(field)
+    return fields
+
+
+class FieldCodec:
+    """
+    Pack and unpack functions generated once for a list of
+    uvm_fields. Layouts of 8, 16, 32 and 64-bit fields with one
+    byte order use a struct.Struct, which raises struct.error for
+    a value that does not fit. Any other layout builds one integer
+    with shifts and masks, so values are cut to their width.
+
+    pack_into() and unpack_from() handle one object.
+    pack_items() and unpack_items() loop over many objects in the
+    generated code and return the offset after the last one.
+    """
+
+    _struct_codes = {8: "b", 16: "h", 32: "i", 64: "q"}
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.width = sum(field.width for field in self.fields)
+        self.size = (self.width + 7) // 8
+        endians = {field.endian for field in self.fields}
+        if (len(endians) == 1
+                and all(field.width in self._struct_codes
+                        for field in self.fields)):
+            self._compile_struct(endians.pop())
+        else:
+            self._compile_shifts()
+
+    def _compile_struct(self, endian):
+        codes = "".join(
+            self._struct_codes[field.width] if field.signed
+            else self._struct_codes[field.width].upper()
+            for field in self.fields)
+        layout = struct.Struct((">" if endian == "big" else "<") + codes)
+        names = ", ".join(f"obj.{field.name}" for field in self.fields)
+        self._build([f"_pack_into(buffer, offset, {names})"],
+                    [f"{names}, = _unpack_from(buffer, offset)"],
+                    {"_pack_into": layout.pack_into,
+                     "_unpack_from": layout.unpack_from})
+
+    def _compile_shifts(self):
+        pad = self.size * 8 - self.width
+        shift = self.width
+        terms = []
+        unpack = [f"value = int.from_bytes("
+                  f"buffer[offset:offset + {self.size}], 'big')"
+                  + (f" >> {pad}" if pad else "")]
+        for field in self.fields:
+            shift -= field.width
+            mask = (1 << field.width) - 1
+            nbytes = field.width // 8
+            term = f"(obj.{field.name} & {mask:#x})"
+            if field.endian == "little" and nbytes > 1:
+                term = (f"int.from_bytes({term}.to_bytes({nbytes},"
+                        f" 'little'), 'big')")
+            terms.append(f"({term} << {shift})" if shift else term)
+            get = f"(value >> {shift}) & {mask:#x}" if shift \
+                else f"value & {mask:#x}"
+            if field.endian == "little" and nbytes > 1:
+                get = (f"int.from_bytes(({get}).to_bytes({nbytes},"
+                       f" 'big'), 'little')")
+            if field.signed:
+                unpack.append(f"field = {get}")
+                unpack.append(f"obj.{field.name} = field - "
+                              f"{1 << field.width} if field >> "
+                              f"{field.width - 1} else field")
+            else:
+                unpack.append(f"obj.{field.name} = {get}")
+        value = " | ".join(terms)
+        if pad:
+            value = f"({value}) << {pad}"
+        pack = [f"value = {value}",
+                f"buffer[offset:offset + {self.size}] ="
+                f" value.to_bytes({self.size}, 'big')"]
+        self._build(pack, unpack, {})
+
+    def _build(self, pack, unpack, namespace):
+        def body(lines, indent):
+            return "".join(f"{' ' * indent}{line}\n" for line in lines)
+
+        self.source = (
+            "def pack_into(obj, buffer, offset):\n" + body(pack, 4)
+            + "def unpack_from(obj, buffer, offset):\n" + body(unpack, 4)
+            + "def pack_items(objs, buffer, offset):\n"
+            + "    for obj in objs:\n" + body(pack, 8)
+            + f"        offset += {self.size}\n    return offset\n"
+            + "def unpack_items(objs, buffer, offset):\n"
+            + "    for obj in objs:\n" + body(unpack, 8)
+            + f"        offset += {self.size}\n    return offset\n")
+        exec(compile(self.source, "<uvm_fields codec>", "exec"), namespace)
+        self.pack_into = namespace["pack_into"]
+        self.unpack_from = namespace["unpack_from"]
+        self.pack_items = namespace["pack_items"]
+        self.unpack_items = namespace["unpack_items"]
+
+
 class FactoryMeta(type):
     """
     This is the metaclass that causes all uvm_void classes
-    to register themselves
+    to register themselves. It also compiles the codec and the
+    copy and compare methods for a class that declares uvm_fields.
     """
 
     def __init__(cls, name, bases, cls_dict):
         FactoryData().classes[cls.__name__] = cls
         super().__init__(name, bases, cls_dict)
+        if "uvm_fields" not in cls_dict:
+            return
+        fields = _class_fields(cls)
+        packable = fields and all(field.width is not None
+                                  for field in fields)
+        cls._uvm_codec = FieldCodec(fields) if packable else None
+        if fields:
+            eq = getattr(cls, "uvm_fields_eq", False)
+            # Methods the class writes itself win
+            for method_name, method in _field_methods(
+                    cls, fields, eq).items():
+                if method_name not in cls_dict:
+                    setattr(cls, method_name, method)
 
 
 class uvm_void(metaclass=FactoryMeta):
@@ -182,6 +450,7 @@ class uvm_void(metaclass=FactoryMeta):
     In pyuvm, we're using uvm_void() as a metaclass so
     that all UVM classes can be stored in a factory.
 """
+    __slots__ = ()
 
 
 class UVM_ROOT_Singleton(FactoryMeta):
@@ -256,36 +525,375 @@ class ObjectionHandler(metaclass=Singleton):
                 "You did not call self.raise_objection() in any run_phase")
 
 
-class UVMQueue(cocotb.queue.Queue):
+class UVMSeeding:
+    """
+    Seeds for the random stream of each uvm_object, derived from
+    the test seed, the object's full name and its type name. A
+    seed depends only on those and on how many times objects with
+    the same name and type have been seeded before, so adding or
+    reordering other objects leaves it unchanged.
+
+    The test seed defaults to cocotb.RANDOM_SEED. Run shards of a
+    test with different seeds through set_test_seed(), and rerun
+    any shard with its seed to reproduce it.
+    """
+
+    use_uvm_seeding = True
+    _test_seed = None
+    _counts = {}  # (type name, full name) -> seeds handed out
+
+    @classmethod
+    def set_test_seed(cls, seed):
+        cls._test_seed = seed
+        cls.clear()
+
+    @classmethod
+    def get_test_seed(cls):
+        if cls._test_seed is not None:
+            return cls._test_seed
+        return cocotb.RANDOM_SEED if cocotb.RANDOM_SEED is not None else 0
+
+    @classmethod
+    def clear(cls):
+        """Start counting seeds again, as at the start of a test"""
+        cls._counts = {}
+
+    @classmethod
+    def create_random_seed(cls, type_id, inst_id):
+        """
+        :param type_id: Type name of the object
+        :param inst_id: Full name of the object
+        :return: 64-bit seed
+        """
+        key = (type_id, inst_id)
+        count = cls._counts.get(key, 0)
+        cls._counts[key] = count + 1
+        text = f"{cls.get_test_seed()}\0{inst_id}\0{type_id}\0{count}"
+        digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+
+class UVMQueue:
     """
-    The UVMQueue provides a peek function as well as the
-    ability to break out of a blocking operation if
-    the time_to_die predicate is true.  The time
-    to die is set to the dropping of all run_phase objections
-    by default.
+    The queue behind the pyuvm TLM FIFOs and sequencers.
+
+    Items live in a preallocated circular buffer. A bounded queue
+    allocates maxsize slots up front. An unbounded queue starts
+    small and doubles its buffer when it fills.
+
+    A blocked put(), get() or peek() waits on an Event taken from
+    a free list, and each change of state wakes only the waiters
+    it can satisfy: a put wakes every peeker and one getter, and
+    a get wakes one putter. A waiter whose task is killed removes
+    itself, and hands on its wakeup if it had already been given
+    one.
     """
+
+    def __init__(self, maxsize: int = 0):
+        self._maxsize = maxsize
+        self._capacity = maxsize if maxsize > 0 else 16
+        self._buffer = [None] * self._capacity
+        self._head = 0
+        self._count = 0
+        self._getters = deque()
+        self._putters = deque()
+        self._peekers = deque()
+        self._free_events = []
+
     def __str__(self):
-        return str(self._queue)
+        return str(list(self))
+
+    def __iter__(self):
+        buffer, capacity = self._buffer, self._capacity
+        for ii in range(self._head, self._head + self._count):
+            yield buffer[ii % capacity]
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def maxsize(self):
+        """Number of items allowed in the queue. 0 means no limit."""
+        return self._maxsize
+
+    def qsize(self):
+        """Number of items in the queue"""
+        return self._count
+
+    def empty(self):
+        return self._count == 0
+
+    def full(self):
+        return 0 < self._maxsize <= self.qsize()
+
+    def _grow(self):
+        old, head = self._buffer, self._head
+        self._buffer = old[head:] + old[:head] + [None] * self._capacity
+        self._capacity *= 2
+        self._head = 0
+
+    def _put(self, item):
+        count = self._count
+        if count == self._capacity:
+            self._grow()
+        tail = self._head + count
+        if tail >= self._capacity:
+            tail -= self._capacity
+        self._buffer[tail] = item
+        self._count = count + 1
+
+    def _get(self):
+        head = self._head
+        buffer = self._buffer
+        item = buffer[head]
+        buffer[head] = None
+        head += 1
+        self._head = 0 if head == self._capacity else head
+        self._count -= 1
+        return item
 
     def _peek(self):
-        return self._queue[0]
+        return self._buffer[self._head]
+
+    def _remove_at(self, index):
+        """Remove and return the item index places from the front"""
+        buffer, capacity, head = self._buffer, self._capacity, self._head
+        item = buffer[(head + index) % capacity]
+        for ii in range(head + index, head + self._count - 1):
+            buffer[ii % capacity] = buffer[(ii + 1) % capacity]
+        buffer[(head + self._count - 1) % capacity] = None
+        self._count -= 1
+        self._wakeup(self._putters)
+        return item
+
+    async def _wait(self, waiters):
+        if self._free_events:
+            event = self._free_events.pop()
+        else:
+            event = Event(f"{type(self).__name__} waiter")
+        waiters.append(event)
+        try:
+            await event.wait()
+        except BaseException:
+            try:
+                waiters.remove(event)
+            except ValueError:
+                # We were woken but will not act on it. Pass it on.
+                self._wakeup(waiters)
+            raise
+        finally:
+            event.clear()
+            self._free_events.append(event)
+
+    @staticmethod
+    def _wakeup(waiters):
+        if waiters:
+            waiters.popleft().set()
+
+    @staticmethod
+    def _wakeup_all(waiters):
+        while waiters:
+            waiters.popleft().set()
+
+    def clear(self):
+        """Remove every item and wake the blocked putters"""
+        self._buffer = [None] * self._capacity
+        self._head = 0
+        self._count = 0
+        self._wakeup_all(self._putters)
+
+    async def put(self, item):
+        """Put an item in the queue, waiting for room if it is full"""
+        while self.full():
+            await self._wait(self._putters)
+        self.put_nowait(item)
+
+    def put_nowait(self, item):
+        """
+        Put an item in the queue.
+        Raise :exc:`QueueFull` if there is no room.
+        """
+        if self._maxsize > 0 and self.full():
+            raise QueueFull()
+        self._put(item)
+        # Peekers go first so they see the item before a getter takes it
+        if self._peekers:
+            self._wakeup_all(self._peekers)
+        if self._getters:
+            self._wakeup(self._getters)
+
+    async def get(self):
+        """Remove and return an item, waiting for one if empty"""
+        while self.empty():
+            await self._wait(self._getters)
+        return self.get_nowait()
+
+    def get_nowait(self):
+        """
+        Remove and return an item.
+        Raise :exc:`QueueEmpty` if there is none.
+        """
+        if not self._count:
+            raise QueueEmpty()
+        item = self._get()
+        if self._putters:
+            self._wakeup(self._putters)
+        return item
 
     async def peek(self):
-        """Remove and return an item from the queue.
-        If the queue is empty, wait until an item is available.
+        """Return the next item without removing it,
+        waiting for one if the queue is empty.
         """
         while self.empty():
-            event = Event('{} peek'.format(type(self).__name__))
-            self._getters.append((event, cocotb.scheduler._current_task))
-            await event.wait()
+            await self._wait(self._peekers)
         return self.peek_nowait()
 
     def peek_nowait(self):
-        """Remove and return an item from the queue.
-        Return an item if one is immediately available, else raise
-        :exc:`asyncio.QueueEmpty`.
+        """Return the next item without removing it.
+        Raise :exc:`QueueEmpty` if there is none.
         """
         if self.empty():
             raise QueueEmpty()
-        item = self._peek()
+        return self._peek()
+
+
+class SpillQueue(UVMQueue):
+    """
+    A bounded UVMQueue that can spill items to a temporary
+    file once it is full. Spilled items move back into
+    the queue in order as gets make room, so the consumer
+    sees every item in the order it was written.
+
+    Spilled items must be picklable.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize=maxsize)
+        self._spill_file = None
+        self._spill_read_pos = 0
+        self._spilled = 0
+
+    def spilled(self):
+        """Number of items currently on disk"""
+        return self._spilled
+
+    def spill(self, item):
+        """Append an item to the spill file"""
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix="pyuvm_spill_")
+        self._spill_file.seek(0, 2)
+        pickle.dump(item, self._spill_file, pickle.HIGHEST_PROTOCOL)
+        self._spilled += 1
+
+    def clear_spill(self):
+        """Discard everything in the spill file"""
+        if self._spill_file is not None:
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+        self._spill_read_pos = 0
+        self._spilled = 0
+
+    def qsize(self):
+        return self._count + self._spilled
+
+    def clear(self):
+        self.clear_spill()
+        super().clear()
+
+    def _get(self):
+        item = super()._get()
+        if self._spilled:
+            self._spill_file.seek(self._spill_read_pos)
+            self._put(pickle.load(self._spill_file))
+            self._spill_read_pos = self._spill_file.tell()
+            self._spilled -= 1
+            if self._spilled == 0:
+                self.clear_spill()
         return item
+
+
+def _unreferenced_refcount():
+    """
+    sys.getrefcount() of an object that acquire() has taken out of
+    its free list and that nothing else refers to.
+    """
+    free = deque([object()])
+    obj = free.popleft()
+    return sys.getrefcount(obj)
+
+
+class ObjectPool:
+    """
+    A free list of released objects of one type. uvm_object.create()
+    takes objects from it instead of constructing new ones once the
+    type calls enable_pool().
+
+    A released object may still be in use, for example by a sequence
+    that has not dropped its handle to an item. get() reuses an
+    object only when the free list holds the last reference to it.
+    Objects still referenced elsewhere go to the back of the list
+    and are counted in ``busy``. Weak references are not counted,
+    so do not pool objects that are reached through them.
+    """
+
+    pools = {}  # type -> ObjectPool
+    scan = 8  # most released objects get() looks at
+    _unreferenced = _unreferenced_refcount()
+
+    def __init__(self, obj_type, max_size=1024):
+        self.obj_type = obj_type
+        self.max_size = max_size
+        self._free = deque()
+        self._free_ids = set()
+        self.hits = 0
+        self.allocations = 0
+        self.busy = 0
+        self.releases = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._free)
+
+    def __str__(self):
+        return (f"{self.obj_type.__name__} pool: {self.hits} hits,"
+                f" {self.allocations} allocations, {self.busy} busy,"
+                f" {self.releases} releases, {self.dropped} dropped,"
+                f" {len(self._free)} free")
+
+    def get(self, name):
+        """
+        Return a released object renamed to name and reset, or a
+        new object if none is free.
+        """
+        free = self._free
+        for _ in range(min(len(free), self.scan)):
+            obj = free.popleft()
+            if sys.getrefcount(obj) == self._unreferenced:
+                self._free_ids.discard(id(obj))
+                self.hits += 1
+                obj._recycle(name)
+                return obj
+            free.append(obj)
+            self.busy += 1
+        self.allocations += 1
+        return self.obj_type(name)
+
+    def release(self, obj):
+        """
+        Put obj on the free list
+
+        :return: False if obj is already on the free list
+        """
+        if id(obj) in self._free_ids:
+            return False
+        self.releases += 1
+        if len(self._free) >= self.max_size:
+            self.dropped += 1
+        else:
+            self._free.append(obj)
+            self._free_ids.add(id(obj))
+        return True
+
+    def clear(self):
+        self._free.clear()
+        self._free_ids.clear()
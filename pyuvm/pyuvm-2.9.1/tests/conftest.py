@@ -0,0 +1,76 @@
+"""
+These tests run without a simulator, so the Scheduler below stands
+in for the cocotb scheduler. It runs coroutines and resumes them
+when the cocotb triggers they wait on fire. Simulation time stays
+at 0.
+"""
+import collections
+
+import cocotb
+import cocotb.simulator
+import pytest
+
+from pyuvm import uvm_root
+
+
+class Task:
+    def __init__(self, coro):
+        self.coro = coro
+        self.finished = False
+        self.result = None
+
+    def done(self):
+        return self.finished
+
+
+class Scheduler:
+    def __init__(self):
+        self.ready = collections.deque()
+        self._current_task = None
+
+    def spawn(self, coro):
+        task = Task(coro)
+        self.ready.append(task)
+        return task
+
+    def run(self, coro=None):
+        """
+        Run until every task is done or waiting. If coro is given,
+        start it first and return its result.
+        """
+        task = None if coro is None else self.spawn(coro)
+        ready = self.ready
+        while ready:
+            current = ready.popleft()
+            self._current_task = current
+            try:
+                trigger = current.coro.send(None)
+            except StopIteration as stop:
+                current.finished = True
+                current.result = stop.value
+                continue
+            trigger.prime(lambda _, current=current: ready.append(current))
+        if task is not None:
+            assert task.finished, "coroutine is still waiting"
+            return task.result
+        return None
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    sched = Scheduler()
+    monkeypatch.setattr(cocotb, "scheduler", sched, raising=False)
+    return sched
+
+
+@pytest.fixture(autouse=True)
+def sim_time(monkeypatch):
+    # Logging and recording read the simulation time
+    monkeypatch.setattr(cocotb.simulator, "get_sim_time", lambda: (0, 0),
+                        raising=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_hierarchy():
+    yield
+    uvm_root().clear_children()
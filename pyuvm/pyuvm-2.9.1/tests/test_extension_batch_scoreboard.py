@@ -0,0 +1,113 @@
+import logging
+
+import cocotb.simulator
+import cocotb.utils
+import pytest
+
+from pyuvm import uvm_batch_scoreboard
+
+np = pytest.importorskip("numpy")
+
+
+class Item:
+    __slots__ = ("a", "y")
+
+    def __init__(self, a, y):
+        self.a, self.y = a, y
+
+
+class Scoreboard(uvm_batch_scoreboard):
+    fields = ("a", "y")
+    batch_size = 4
+
+
+class PredictScoreboard(Scoreboard):
+    def predict(self, cols):
+        return {"y": cols["a"] * 2}
+
+
+class Messages(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.NOTSET)
+        self.setFormatter(logging.Formatter("%(message)s"))
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def run(sb_cls, actual, expected=None):
+    sb = sb_cls("sb", None)
+    messages = Messages()
+    sb.remove_streaming_handler()
+    sb.add_logging_handler(messages)
+    for exp in expected or ():
+        sb.expected_export.write(exp)
+    for act in actual:
+        sb.actual_export.write(act)
+    sb.check_phase()
+    return sb, messages.messages
+
+
+@pytest.fixture
+def sim_time(monkeypatch):
+    monkeypatch.setattr(cocotb.simulator, "get_sim_time", lambda: (0, 5000),
+                        raising=False)
+    monkeypatch.setattr(cocotb.utils, "_get_simulator_precision",
+                        lambda: -12)
+
+
+def test_expected_stream_reports_mismatches(sim_time):
+    expected = [Item(ii, 2 * ii) for ii in range(10)]
+    actual = [Item(ii, 2 * ii + (ii == 6)) for ii in range(10)]
+    sb, messages = run(Scoreboard, actual, expected)
+    assert (sb.compared, sb.matches, sb.mismatches) == (10, 9, 1)
+    assert sb.batches == 3
+    assert messages == ["Mismatch at transaction 6 (expected at 5.0ns,"
+                        " actual at 5.0ns): y expected 12 got 13"]
+
+
+def test_predict_needs_no_expected_stream():
+    actual = [Item(ii, 2 * ii + (ii in (1, 9))) for ii in range(10)]
+    sb, messages = run(PredictScoreboard, actual)
+    assert (sb.compared, sb.mismatches) == (10, 2)
+    assert [msg.split(" (")[0] for msg in messages] == [
+        "Mismatch at transaction 1", "Mismatch at transaction 9"]
+
+
+def test_unpaired_transactions_are_errors():
+    sb, messages = run(Scoreboard, [Item(0, 0), Item(1, 2)],
+                       [Item(0, 0)])
+    assert sb.compared == 1
+    assert messages == ["1 actual transactions had no expected transaction"]
+
+
+def test_mismatches_past_max_reported_are_counted():
+    class Quiet(PredictScoreboard):
+        max_reported = 2
+
+    sb, messages = run(Quiet, [Item(ii, 1) for ii in range(1, 6)])
+    assert sb.mismatches == 5
+    assert len(messages) == 3
+    assert messages[-1] == "3 more mismatches not reported"
+
+
+def test_a_reused_transaction_object_keeps_each_write():
+    sb = Scoreboard("sb", None)
+    item = Item(0, 0)
+    for ii in range(10):
+        item.a, item.y = ii, 2 * ii
+        sb.expected_export.write(item)
+    for ii in range(10):
+        item.a, item.y = ii, 2 * ii + (ii == 3)
+        sb.actual_export.write(item)
+    sb.check_phase()
+    assert (sb.compared, sb.mismatches) == (10, 1)
+
+
+def test_columns_grow_while_one_side_runs_ahead():
+    expected = [Item(ii, ii) for ii in range(100)]
+    actual = [Item(ii, ii) for ii in range(100)]
+    sb, messages = run(Scoreboard, actual, expected)
+    assert (sb.compared, sb.matches) == (100, 100)
+    assert messages == []
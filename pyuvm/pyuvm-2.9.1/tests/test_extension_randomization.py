@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from pyuvm import UVMSeeding, uvm_sequence_item
+from pyuvm.extension_randomization import (uvm_rand_dist, uvm_rand_range,
+                                           uvm_randomizer)
+
+np = pytest.importorskip("numpy")
+
+
+class AluItem(uvm_sequence_item):
+    __slots__ = ("op", "a", "b")
+    rand_fields = {
+        "op": uvm_rand_dist({0: 4, 1: 3, 2: 2, 3: 1}),
+        "a": uvm_rand_range(0, 255),
+        "b": uvm_rand_range(0, 255),
+    }
+    constraints = (lambda c: (c["op"] != 1) | (c["a"] >= c["b"]),)
+
+
+@pytest.fixture
+def test_seed(monkeypatch):
+    monkeypatch.setattr(UVMSeeding, "_counts", {})
+
+    def set_seed(seed):
+        monkeypatch.setattr(UVMSeeding, "_test_seed", seed)
+        UVMSeeding.clear()
+    return set_seed
+
+
+def draw(count=1000):
+    return uvm_randomizer(AluItem).randomize_batch(count)
+
+
+def test_default_seed_follows_the_test_seed(test_seed):
+    test_seed(1)
+    first = draw()
+    test_seed(1)
+    again = draw()
+    test_seed(2)
+    other = draw()
+    assert all(np.array_equal(first[name], again[name]) for name in first)
+    assert not np.array_equal(first["a"], other["a"])
+
+
+def test_randomizers_of_a_type_get_their_own_streams(test_seed):
+    test_seed(1)
+    assert not np.array_equal(draw()["a"], draw()["a"])
+
+
+def test_default_seed_uses_random_without_path_seeding(monkeypatch):
+    monkeypatch.setattr(UVMSeeding, "use_uvm_seeding", False)
+    random.seed(5)
+    first = draw()
+    random.seed(5)
+    assert np.array_equal(first["b"], draw()["b"])
+
+
+def test_items_meet_the_constraints():
+    items = list(uvm_randomizer(AluItem, seed=3).items(5000))
+    assert len(items) == 5000
+    assert all(item.a >= item.b for item in items if item.op == 1)
+    assert all(0 <= item.a <= 255 for item in items)
+    ops = np.bincount([item.op for item in items], minlength=4)
+    assert ops[0] > ops[3]
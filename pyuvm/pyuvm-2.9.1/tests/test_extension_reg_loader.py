@@ -0,0 +1,115 @@
+import os
+import stat
+
+import pytest
+
+from pyuvm import UVMError, uvm_predict_e, uvm_reg_loader
+
+TABLE = """map,reg,offset,field,lsb,size,access,reset,volatile
+apb,ctrl,0x0,enable,0,1,RW,1,0
+apb,ctrl,0x0,mode,1,3,RW,0x2,0
+apb,status,0x4,irq,0,4,W1C,0,1
+dbg,ctrl,0x100,,,,,,
+"""
+
+
+def write_table(tmp_path, text, name="soc.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def load(tmp_path, text, name="soc.csv"):
+    loader = uvm_reg_loader(write_table(tmp_path, text, name),
+                            cache_dir=str(tmp_path / "cache"))
+    return loader, loader.load()
+
+
+def describe(block):
+    apb = block.get_map_by_name("apb")
+    ctrl, status = apb.get_reg_by_offset(0), apb.get_reg_by_offset(4)
+    status.predict(0xF, kind=uvm_predict_e.UVM_PREDICT_WRITE)
+    dbg_ctrl = block.get_map_by_name("dbg").get_reg_by_offset(0x100)
+    return {
+        "regs": len(block.get_registers()),
+        "ctrl reset": ctrl.get_reset(),
+        "fields": [(field.get_name(), field.get_lsb_pos(),
+                    field.get_n_bits(), field.get_access())
+                   for field in ctrl.get_fields()],
+        "status after write": status.get_mirrored_value(),
+        "dbg": dbg_ctrl is ctrl,
+    }
+
+
+def test_a_cached_load_builds_the_same_model(tmp_path):
+    first_loader, first = load(tmp_path, TABLE)
+    second_loader, second = load(tmp_path, TABLE)
+    assert not first_loader.from_cache
+    assert second_loader.from_cache
+    expected = {"regs": 2, "ctrl reset": 0x5,
+                "fields": [("enable", 0, 1, "RW"), ("mode", 1, 3, "RW")],
+                "status after write": 0, "dbg": True}
+    assert describe(first) == expected
+    assert describe(second) == expected
+
+
+def test_a_changed_table_is_not_read_from_the_cache(tmp_path):
+    load(tmp_path, TABLE)
+    loader, block = load(tmp_path, TABLE.replace("0x2", "0x3"))
+    assert not loader.from_cache
+    assert block.get_map_by_name("apb").get_reg_by_offset(0).get_reset() \
+        == 0x7
+
+
+@pytest.mark.parametrize("content", [
+    b"", b"\x80\x04not json", b"[1, 2]", b'{"version": 2}',
+    b'{"version": 2, "maps": [], "reg_names": 7}',
+])
+def test_a_damaged_cache_file_is_a_cache_miss(tmp_path, content):
+    first, _ = load(tmp_path, TABLE)
+    with open(first.cache_path, "wb") as file:
+        file.write(content)
+    loader, block = load(tmp_path, TABLE)
+    assert not loader.from_cache
+    assert describe(block)["regs"] == 2
+    assert load(tmp_path, TABLE)[0].from_cache
+
+
+def test_the_default_cache_is_private_to_the_user(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "home"))
+    loader = uvm_reg_loader(write_table(tmp_path, TABLE))
+    loader.load()
+    assert loader.cache_dir == str(tmp_path / "home" / "pyuvm"
+                                   / "reg_cache")
+    assert stat.S_IMODE(os.stat(loader.cache_dir).st_mode) == 0o700
+    again = uvm_reg_loader(write_table(tmp_path, TABLE))
+    again.load()
+    assert again.from_cache
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_a_cache_others_can_write_to_is_not_used(tmp_path):
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    cache.chmod(0o777)
+    loader, _ = load(tmp_path, TABLE)
+    again, _ = load(tmp_path, TABLE)
+    assert not again.from_cache
+    assert not os.path.exists(loader.cache_path)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("reg,offset,field,lsb,size,access\na,0,x,0,4,RW\na,0,y,3,2,RW\n",
+     "Field y overlaps field x in register a"),
+    ("reg,offset,field,lsb,size,access\na,0,x,0,4,RW\nb,0,y,0,2,RW\n",
+     "b at 0x0 overlaps a"),
+    ("reg,offset,field,lsb,size\na,0,x,0,4\n",
+     "bad.csv:1: missing columns access"),
+    ("reg,offset,field,lsb,size,access\na,zz,x,0,4,RW\n",
+     "bad.csv:2: offset 'zz' is not a number"),
+    ("reg,offset,field,lsb,size,access\na,0,x,0,4,QQ\n",
+     "access QQ is not one of"),
+])
+def test_bad_tables_are_errors(tmp_path, text, message):
+    with pytest.raises(UVMError, match=message):
+        load(tmp_path, text, "bad.csv")
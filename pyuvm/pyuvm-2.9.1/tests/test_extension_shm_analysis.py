@@ -0,0 +1,95 @@
+import logging
+import os
+
+import pytest
+
+from pyuvm import UVMError, uvm_component, uvm_shm_subscriber, uvm_subscriber
+
+N = 5_000
+
+
+class SumChecker(uvm_subscriber):
+    """Sets up its state and a child in build_phase"""
+
+    def build_phase(self):
+        self.total = 0
+        self.count = 0
+        self.helper = uvm_component("helper", self)
+
+    def start_of_simulation_phase(self):
+        self.logger.info("started")
+
+    def write(self, tt):
+        self.total += tt
+        self.count += 1
+
+    def check_phase(self):
+        self.logger.info(f"total {self.total} of {self.count}")
+
+
+class FailingChecker(uvm_subscriber):
+    def write(self, tt):
+        if tt == 3:
+            raise ValueError("bad transaction")
+
+
+class DyingChecker(uvm_subscriber):
+    def write(self, tt):
+        if tt == 3:
+            os._exit(3)
+
+
+class Messages(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.NOTSET)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def run_worker(subscriber_cls, count):
+    shm = uvm_shm_subscriber("shm", None, subscriber_cls,
+                             capacity=1 << 12, timeout=30)
+    messages = Messages()
+    shm.remove_streaming_handler()
+    shm.add_logging_handler(messages)
+    shm.start_of_simulation_phase()
+    try:
+        for value in range(count):
+            shm.write(value)
+        shm.check_phase()
+    finally:
+        shm.final_phase()
+        if shm.process.is_alive():
+            shm.process.kill()
+    return shm, messages.messages
+
+
+def test_worker_runs_phases_before_write():
+    shm, messages = run_worker(SumChecker, N)
+    assert shm.items_checked == N
+    assert messages == ["started", f"total {sum(range(N))} of {N}"]
+
+
+def test_worker_exception_is_raised_in_parent():
+    with pytest.raises(UVMError, match="write\\(\\) of transaction 4"
+                       "(.|\\n)*ValueError: bad transaction"):
+        run_worker(FailingChecker, 10)
+
+
+def test_worker_that_dies_reports_exit_code():
+    shm = uvm_shm_subscriber("shm", None, DyingChecker,
+                             capacity=1 << 12, timeout=30)
+    shm.start_of_simulation_phase()
+    try:
+        for value in range(10):
+            shm.write(value)
+        with pytest.raises(UVMError, match="exited with code 3"):
+            shm.check_phase()
+        assert shm.ring is None
+        assert not shm.process.is_alive()
+    finally:
+        shm.final_phase()
+        if shm.process.is_alive():
+            shm.process.kill()
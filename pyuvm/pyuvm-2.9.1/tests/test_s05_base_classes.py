@@ -0,0 +1,160 @@
+import pytest
+
+from pyuvm import UVMError, uvm_field, uvm_object, uvm_sequence_item
+
+
+class Parent(uvm_sequence_item):
+    __slots__ = ("addr", "tags")
+    uvm_fields = (uvm_field("addr", 16),
+                  uvm_field("tags", mutable=True))
+
+    def __init__(self, name="parent"):
+        super().__init__(name)
+        self.addr = 0
+        self.tags = []
+
+
+class Child(Parent):
+    __slots__ = ("data",)
+    uvm_fields = (uvm_field("data", 8),)
+
+    def __init__(self, name="child"):
+        super().__init__(name)
+        self.data = 0
+
+
+class Packed(uvm_object):
+    uvm_fields = (uvm_field("addr", 16),)
+
+    def __init__(self, name="packed"):
+        super().__init__(name)
+        self.addr = 0
+
+
+class PackedChild(Packed):
+    uvm_fields = (uvm_field("data", 8),)
+
+    def __init__(self, name="packed_child"):
+        super().__init__(name)
+        self.data = 0
+
+
+def make_child(addr=5, data=7):
+    item = Child("item")
+    item.addr = addr
+    item.data = data
+    item.tags = [1, 2]
+    return item
+
+
+def test_subclass_clone_copies_parent_fields():
+    item = make_child()
+    copy = item.clone()
+    assert (copy.get_name(), copy.addr, copy.data) == ("item", 5, 7)
+    assert copy.tags == [1, 2] and copy.tags is not item.tags
+
+
+def test_subclass_copy_copies_parent_fields():
+    copy = Child("copy")
+    copy.copy(make_child())
+    assert (copy.addr, copy.data, copy.tags) == (5, 7, [1, 2])
+
+
+def test_subclass_compare_checks_parent_fields():
+    item = make_child()
+    assert item.compare(make_child())
+    assert not item.compare(make_child(addr=6))
+    assert not item.compare(make_child(data=8))
+
+
+def test_subclass_packs_parent_fields_first():
+    item = PackedChild()
+    item.addr = 0x1234
+    item.data = 0x56
+    assert bytes(item.pack()) == b"\x12\x34\x56"
+    other = PackedChild()
+    other.unpack(item.pack())
+    assert (other.addr, other.data) == (0x1234, 0x56)
+
+
+def test_parent_keeps_its_own_fields():
+    item = Packed()
+    item.addr = 0x1234
+    assert bytes(item.pack()) == b"\x12\x34"
+
+
+def test_redeclared_field_is_an_error():
+    with pytest.raises(UVMError, match="already declared in Packed"):
+        class Again(Packed):
+            uvm_fields = (uvm_field("addr", 8),)
+
+
+class Pooled(uvm_object):
+    def __init__(self, name="pooled"):
+        super().__init__(name)
+        self.value = 0
+
+    def reset(self):
+        self.value = 0
+
+
+@pytest.fixture
+def pool():
+    yield Pooled.enable_pool(max_size=2)
+    Pooled.disable_pool()
+
+
+def test_create_reuses_a_released_object(pool):
+    item = Pooled.create("first")
+    item.value = 5
+    first = id(item)
+    item.release()
+    del item
+    again = Pooled.create("second")
+    assert id(again) == first
+    assert (again.get_name(), again.value) == ("second", 0)
+    assert (pool.hits, pool.allocations, pool.releases) == (1, 1, 1)
+    assert len(pool) == 0
+
+
+def test_a_released_object_still_referenced_is_not_reused(pool):
+    item = Pooled.create("held")
+    item.value = 5
+    item.release()
+    other = Pooled.create("other")
+    assert other is not item
+    assert item.get_name() == "held" and item.value == 5
+    assert (pool.hits, pool.allocations, pool.busy) == (0, 2, 1)
+    assert len(pool) == 1
+
+
+def test_releasing_twice_is_an_error(pool):
+    item = Pooled.create("twice")
+    item.release()
+    with pytest.raises(UVMError, match="twice was released twice"):
+        item.release()
+
+
+def test_pool_drops_releases_beyond_max_size(pool):
+    items = [Pooled.create(f"item{ii}") for ii in range(3)]
+    for item in items:
+        item.release()
+    assert (pool.releases, pool.dropped, len(pool)) == (3, 1, 2)
+    assert str(pool) == ("Pooled pool: 0 hits, 3 allocations, 0 busy,"
+                         " 3 releases, 1 dropped, 2 free")
+
+
+def test_disable_pool_restores_plain_construction(pool):
+    item = Pooled.create("first")
+    item.release()
+    del item
+    Pooled.disable_pool()
+    assert Pooled.get_pool() is None
+    assert len(pool) == 0
+    again = Pooled.create("second")
+    assert type(again) is Pooled
+    assert pool.hits == 0 and pool.allocations == 1
+    # Releasing an object of a type that is not pooled does nothing
+    again.release()
+    again.release()
+    assert pool.releases == 1 and len(pool) == 0
@@ -0,0 +1,150 @@
+import pytest
+
+from pyuvm import (UVMError, uvm_field, uvm_tr_database, uvm_tr_stream_reader,
+                   uvm_transaction)
+
+
+class BusItem(uvm_transaction):
+    uvm_fields = (uvm_field("addr", 16), uvm_field("data", 32))
+
+    def __init__(self, name="bus_item", addr=0, data=0):
+        super().__init__(name)
+        self.addr = addr
+        self.data = data
+
+
+class Note(uvm_transaction):
+    """Has no uvm_fields, so it is pickled"""
+
+    def __init__(self, name="note", text=""):
+        super().__init__(name)
+        self.text = text
+
+
+# (begin, end) of each transaction, recorded in the order they end
+SPANS = [(0, 10), (5, 20), (30, 40), (12, 50)]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = uvm_tr_database("db", str(tmp_path / "db"))
+    yield db
+    db.close_db()
+
+
+def record_spans(db, buffer_size=1 << 20):
+    stream = db.open_stream("bus", buffer_size=buffer_size)
+    for number, (begin, end) in enumerate(SPANS):
+        item = BusItem(addr=number, data=number * 1000)
+        item.set_transaction_id(100 + number)
+        stream.record(item, begin, end)
+    stream.close()
+    return db.get_path("bus")
+
+
+def spans(records):
+    return [(record.begin_time, record.end_time) for record in records]
+
+
+def test_reader_iterates_every_record(db):
+    path = record_spans(db)
+    with uvm_tr_stream_reader(path) as reader:
+        assert len(reader) == len(SPANS)
+        assert reader.sorted
+        assert reader.max_duration == 38
+        records = list(reader)
+        assert spans(records) == SPANS
+        items = [reader.unpack(record, BusItem) for record in records]
+        assert [(item.addr, item.data, item.get_transaction_id())
+                for item in items] == [(n, n * 1000, 100 + n)
+                                       for n in range(len(SPANS))]
+        del records
+
+
+def test_records_span_several_buffer_flushes(db):
+    path = record_spans(db, buffer_size=64)
+    with uvm_tr_stream_reader(path) as reader:
+        assert spans(reader) == SPANS
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (0, 100, SPANS),
+    (21, 29, [(12, 50)]),
+    (10, 10, [(0, 10), (5, 20)]),
+    (30, 30, [(30, 40), (12, 50)]),
+    (50, 50, [(12, 50)]),
+    (-5, -1, []),
+    (51, 60, []),
+    (1_000, 2_000, []),
+])
+def test_transactions_overlapping_a_time_range(db, start, end, expected):
+    path = record_spans(db)
+    with uvm_tr_stream_reader(path) as reader:
+        assert spans(reader.transactions(start, end)) == expected
+
+
+def test_time_range_with_end_times_out_of_order(db):
+    stream = db.open_stream("bus")
+    for begin, end in [(0, 10), (20, 30), (5, 15)]:
+        stream.record(BusItem(), begin, end)
+    stream.close()
+    with uvm_tr_stream_reader(db.get_path("bus")) as reader:
+        assert not reader.sorted
+        assert spans(reader.transactions(12, 18)) == [(5, 15)]
+        assert spans(reader.transactions(31, 40)) == []
+
+
+def test_end_tr_records_an_enabled_transaction(db):
+    stream = db.open_stream("bus", scope="top.env")
+    item = BusItem(addr=7, data=9)
+    item.enable_recording(stream)
+    handle = item.begin_tr(begin_time=5)
+    child = BusItem(addr=8)
+    child.enable_recording(stream)
+    child_handle = child.begin_tr(begin_time=6, parent_handle=handle)
+    child.end_tr(end_time=8)
+    item.end_tr(end_time=9)
+    assert item.get_tr_handle() == 0
+    stream.close()
+    with uvm_tr_stream_reader(db.get_path("top.env.bus")) as reader:
+        records = list(reader)
+        assert [(r.handle, r.parent_handle) for r in records] == [
+            (child_handle, handle), (handle, 0)]
+        assert spans(records) == [(6, 8), (5, 9)]
+        del records
+
+
+def test_transactions_without_fields_are_pickled(db):
+    stream = db.open_stream("notes")
+    stream.record(Note(text="hello"), 1, 2)
+    stream.close()
+    with uvm_tr_stream_reader(db.get_path("notes")) as reader:
+        (record,) = list(reader)
+        assert record.pickled
+        assert reader.unpack(record).text == "hello"
+        del record
+
+
+def test_a_packed_record_needs_its_item_type(db):
+    path = record_spans(db)
+    with uvm_tr_stream_reader(path) as reader:
+        record = next(iter(reader))
+        with pytest.raises(UVMError, match="item_type"):
+            reader.unpack(record)
+        del record
+
+
+def test_recording_into_a_closed_stream_is_an_error(db):
+    stream = db.open_stream("bus")
+    stream.close()
+    assert db.get_streams() == []
+    with pytest.raises(UVMError, match="closed"):
+        stream.record(BusItem(), 0, 1)
+
+
+def test_reader_rejects_a_file_that_is_not_a_stream(tmp_path):
+    path = tmp_path / "junk.trs"
+    path.write_bytes(b"not a stream")
+    (tmp_path / "junk.tri").write_bytes(b"PYUVMTRI" + bytes(16))
+    with pytest.raises(UVMError, match="not a pyuvm transaction stream"):
+        uvm_tr_stream_reader(str(path))
@@ -0,0 +1,111 @@
+from array import array
+
+from pyuvm import (uvm_component, uvm_tlm_b_initiator_socket,
+                   uvm_tlm_b_target_socket, uvm_tlm_command_e,
+                   uvm_tlm_generic_payload, uvm_tlm_nb_initiator_socket,
+                   uvm_tlm_nb_target_socket, uvm_tlm_phase_e,
+                   uvm_tlm_response_status_e, uvm_tlm_sync_e)
+
+
+def test_set_data_views_wide_items_as_bytes():
+    words = array("I", [0x04030201, 0x08070605])
+    gp = uvm_tlm_generic_payload()
+    gp.set_data(words)
+    assert gp.get_data_length() == 8
+    assert gp.get_data()[4] == 5
+    gp.get_data()[0] = 0xFF
+    assert words[0] == 0x040302FF
+    part = gp.slice(4, 4)
+    assert part.get_address() == 4
+    assert bytes(part.get_data()) == bytes([5, 6, 7, 8])
+
+
+def test_byte_enables_are_viewed_as_bytes():
+    gp = uvm_tlm_generic_payload()
+    gp.set_data(bytearray(4))
+    gp.set_byte_enable(array("H", [0xFFFF, 0]))
+    assert gp.get_byte_enable_length() == 4
+    assert bytes(gp.get_byte_enable()) == b"\xff\xff\x00\x00"
+
+
+def test_slice_shares_the_buffer_and_copy_does_not():
+    buffer = bytearray(range(16))
+    gp = uvm_tlm_generic_payload()
+    gp.set_write()
+    gp.set_address(0x100)
+    gp.set_data(buffer)
+    part = gp.slice(8, 8)
+    copy = gp.clone()
+    buffer[8] = 0xAA
+    assert part.get_address() == 0x108
+    assert part.get_data()[0] == 0xAA
+    assert copy.get_data()[8] == 8
+    assert not copy.compare(gp)
+    buffer[8] = 8
+    assert copy.compare(gp)
+
+
+class Memory(uvm_component):
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.mem = bytearray(64)
+        self.b_socket = uvm_tlm_b_target_socket("b_socket", self)
+        self.nb_socket = uvm_tlm_nb_target_socket("nb_socket", self)
+
+    def access(self, trans):
+        addr, size = trans.get_address(), trans.get_data_length()
+        if trans.is_write():
+            self.mem[addr:addr + size] = trans.get_data()
+        else:
+            trans.get_data()[:size] = self.mem[addr:addr + size]
+        trans.set_response_status(
+            uvm_tlm_response_status_e.UVM_TLM_OK_RESPONSE)
+
+    async def b_transport(self, trans, delay):
+        self.access(trans)
+        return delay + 10
+
+    def nb_transport_fw(self, trans, phase, delay):
+        self.access(trans)
+        self.nb_socket.nb_transport_bw(trans, uvm_tlm_phase_e.BEGIN_RESP,
+                                       delay)
+        return uvm_tlm_sync_e.UVM_TLM_UPDATED, uvm_tlm_phase_e.END_REQ, delay
+
+
+class Initiator(uvm_component):
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.b_socket = uvm_tlm_b_initiator_socket("b_socket", self)
+        self.nb_socket = uvm_tlm_nb_initiator_socket("nb_socket", self)
+        self.backward = []
+
+    def nb_transport_bw(self, trans, phase, delay):
+        self.backward.append(phase)
+        return uvm_tlm_sync_e.UVM_TLM_COMPLETED, phase, delay
+
+
+def payload(command, addr, data):
+    gp = uvm_tlm_generic_payload()
+    gp.set_command(command)
+    gp.set_address(addr)
+    gp.set_data(data)
+    return gp
+
+
+def test_sockets_reach_the_target(scheduler):
+    top = uvm_component("top", None)
+    memory = Memory("memory", top)
+    initiator = Initiator("initiator", top)
+    initiator.b_socket.connect(memory.b_socket)
+    initiator.nb_socket.connect(memory.nb_socket)
+    write = payload(uvm_tlm_command_e.UVM_TLM_WRITE_COMMAND, 8,
+                    b"\x01\x02\x03\x04")
+    assert scheduler.run(initiator.b_socket.b_transport(write, 5)) == 15
+    assert write.is_response_ok()
+    read = payload(uvm_tlm_command_e.UVM_TLM_READ_COMMAND, 8, bytearray(4))
+    sync, phase, _ = initiator.nb_socket.nb_transport_fw(
+        read, uvm_tlm_phase_e.BEGIN_REQ)
+    assert sync == uvm_tlm_sync_e.UVM_TLM_UPDATED
+    assert phase == uvm_tlm_phase_e.END_REQ
+    assert bytes(read.get_data()) == b"\x01\x02\x03\x04"
+    assert initiator.backward == [uvm_tlm_phase_e.BEGIN_RESP]
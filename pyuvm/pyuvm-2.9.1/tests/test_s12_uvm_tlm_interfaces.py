@@ -0,0 +1,319 @@
+import logging
+
+import pytest
+from cocotb.queue import QueueFull
+
+from pyuvm import (UVMTLMConnectionError, uvm_analysis_port, uvm_build_phase,
+                   uvm_component, uvm_connect_phase, uvm_fifo_overflow_policy,
+                   uvm_get_port, uvm_LazyAnalysisPort, uvm_LazyExport,
+                   uvm_put_port, uvm_subscriber, uvm_tlm_analysis_fifo,
+                   uvm_tlm_fifo, uvm_tlm_fifo_base,
+                   uvm_tlm_pipelined_transport_channel, uvm_transaction)
+
+
+class Messages(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.NOTSET)
+        self.setFormatter(logging.Formatter("%(message)s"))
+        self.messages = []
+        self.levels = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.levels.append(record.levelno)
+
+
+class Collector(uvm_subscriber):
+    def __init__(self, name, parent):
+        super().__init__(name, parent)
+        self.items = []
+
+    def write(self, tt):
+        self.items.append(tt)
+
+
+def test_ports_bind_to_the_end_of_the_chain():
+    top = uvm_component("top", None)
+    fifo = uvm_tlm_fifo("fifo", top, 4)
+    outer = uvm_put_port("outer", top)
+    inner = uvm_put_port("inner", top)
+    get_port = uvm_get_port("get_port", top)
+    outer.connect(inner)
+    inner.connect(fifo.put_export)
+    get_port.connect(fifo.get_export)
+    top.resolve_bindings_hier()
+    assert vars(outer)["try_put"] == fifo.put_export.try_put
+    assert outer.try_put(1) and inner.try_put(2)
+    assert [get_port.try_get()[1] for _ in range(2)] == [1, 2]
+
+
+def test_connect_after_resolving_drops_the_bindings():
+    top = uvm_component("top", None)
+    first = uvm_tlm_fifo("first", top)
+    second = uvm_tlm_fifo("second", top)
+    outer = uvm_put_port("outer", top)
+    inner = uvm_put_port("inner", top)
+    outer.connect(inner)
+    inner.connect(first.put_export)
+    top.resolve_bindings_hier()
+    inner.connect(second.put_export)
+    assert "try_put" not in vars(outer)
+    outer.try_put("x")
+    assert second.used() == 1 and first.used() == 0
+
+
+def test_analysis_ports_write_to_every_subscriber():
+    top = uvm_component("top", None)
+    source = uvm_analysis_port("source", top)
+    relay = uvm_analysis_port("relay", top)
+    collectors = [Collector(f"c{ii}", top) for ii in range(3)]
+    source.connect(collectors[0].analysis_export)
+    source.connect(relay)
+    relay.connect(collectors[1].analysis_export)
+    relay.connect(collectors[2].analysis_export)
+    top.resolve_bindings_hier()
+    source.write("t")
+    assert [col.items for col in collectors] == [["t"], ["t"], ["t"]]
+
+
+def test_unconnected_port_warns_when_resolved():
+    top = uvm_component("top", None)
+    port = uvm_put_port("port", top)
+    messages = Messages()
+    port.remove_streaming_handler()
+    port.add_logging_handler(messages)
+    top.resolve_bindings_hier()
+    assert messages.messages == ["Port is not connected"]
+    with pytest.raises(UVMTLMConnectionError, match="Did you connect it"):
+        port.try_put(1)
+
+
+class Txn(uvm_transaction):
+    def __init__(self, name, data=0):
+        super().__init__(name)
+        self.data = data
+
+
+def response_to(req):
+    rsp = Txn(f"rsp{req.data}", req.data * 10)
+    rsp.set_id_info(req)
+    return rsp
+
+
+def run_channel(scheduler, requests, max_outstanding, target):
+    channel = uvm_tlm_pipelined_transport_channel(
+        "channel", None, max_outstanding=max_outstanding)
+    results = {}
+
+    async def initiator(req):
+        rsp = await channel.transport_export.transport(req)
+        results[req.data] = rsp.data
+
+    for req in requests:
+        scheduler.spawn(initiator(req))
+    scheduler.run(target(channel))
+    return channel, results
+
+
+def test_responses_return_to_their_requests_out_of_order(scheduler):
+    requests = [Txn(f"req{ii}", ii) for ii in range(3)]
+
+    async def reverse(channel):
+        port = channel.get_peek_request_export
+        reqs = [await port.get() for _ in range(3)]
+        for req in reversed(reqs):
+            channel.put_response_export.try_put(response_to(req))
+
+    channel, results = run_channel(scheduler, requests, 4, reverse)
+    scheduler.run()
+    assert results == {0: 0, 1: 10, 2: 20}
+    assert channel.completed == 3
+    assert channel.get_occupancy() == 0
+
+
+def test_max_outstanding_limits_requests_in_flight(scheduler):
+    requests = [Txn(f"req{ii}", ii) for ii in range(5)]
+    seen = []
+
+    async def target(channel):
+        port = channel.get_peek_request_export
+        for _ in range(5):
+            req = await port.get()
+            seen.append(channel.get_occupancy())
+            await channel.put_response_export.put(response_to(req))
+
+    channel, results = run_channel(scheduler, requests, 2, target)
+    scheduler.run()
+    assert results == {ii: 10 * ii for ii in range(5)}
+    assert channel.max_occupancy == 2
+    assert max(seen) == 2
+
+
+def test_nb_transport_polls_for_the_response(scheduler):
+    channel = uvm_tlm_pipelined_transport_channel("channel", None)
+    req = Txn("req", 4)
+    assert channel.transport_export.nb_transport(req) == (False, None)
+    assert channel.transport_export.nb_transport(req) == (False, None)
+    _, pending = channel.get_peek_request_export.try_get()
+    channel.put_response_export.try_put(response_to(pending))
+    done, rsp = channel.transport_export.nb_transport(req)
+    assert done and rsp.data == 40
+    assert channel.get_occupancy() == 0
+
+
+def test_reused_transaction_id_is_an_error(scheduler):
+    channel = uvm_tlm_pipelined_transport_channel("channel", None)
+    req = Txn("req")
+    channel.nb_transport(req)
+    copy = Txn("copy")
+    copy.set_id_info(req)
+    with pytest.raises(UVMTLMConnectionError, match="already outstanding"):
+        scheduler.run(channel.transport(copy))
+
+
+def drain(fifo):
+    items = []
+    while True:
+        ok, item = fifo.get_export.try_get()
+        if not ok:
+            return items
+        items.append(item)
+
+
+def overflow_fifo(policy, size=3, count=5):
+    fifo = uvm_tlm_analysis_fifo("fifo", None, size, policy)
+    for ii in range(count):
+        fifo.analysis_export.write(ii)
+    return fifo
+
+
+def test_drop_oldest_keeps_the_newest_items():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_DROP_OLDEST)
+    assert (fifo.dropped, fifo.spilled) == (2, 0)
+    assert drain(fifo) == [2, 3, 4]
+
+
+def test_drop_newest_keeps_the_oldest_items():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_DROP_NEWEST)
+    assert (fifo.dropped, fifo.spilled) == (2, 0)
+    assert drain(fifo) == [0, 1, 2]
+
+
+def test_error_policy_raises_and_keeps_the_contents():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_ERROR, count=3)
+    with pytest.raises(QueueFull, match="Full analysis fifo: fifo"):
+        fifo.analysis_export.write(3)
+    assert (fifo.dropped, fifo.spilled) == (0, 0)
+    assert drain(fifo) == [0, 1, 2]
+
+
+def test_spill_keeps_every_item():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_SPILL)
+    assert (fifo.dropped, fifo.spilled) == (0, 2)
+    assert fifo.used() == 5
+    assert drain(fifo) == [0, 1, 2, 3, 4]
+    assert fifo.queue.spilled() == 0
+
+
+def test_spill_keeps_fifo_order_across_the_spill_boundary():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_SPILL)
+    got = [fifo.get_export.try_get()[1] for _ in range(2)]
+    # Two spilled items have moved back into the queue, so new
+    # writes spill behind the third
+    for ii in range(5, 8):
+        fifo.analysis_export.write(ii)
+    got += drain(fifo)
+    assert got == list(range(8))
+    assert fifo.spilled == 5
+
+
+def test_report_phase_reports_the_high_watermark():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_SPILL)
+    drain(fifo)
+    fifo.analysis_export.write(9)
+    assert fifo.get_high_watermark() == 5
+    messages = Messages()
+    fifo.remove_streaming_handler()
+    fifo.add_logging_handler(messages)
+    fifo.report_phase()
+    assert messages.messages == [
+        "high watermark 5 (size 3), dropped 0, spilled 2"]
+    assert messages.levels == [logging.INFO]
+
+
+def test_report_phase_warns_about_dropped_items():
+    fifo = overflow_fifo(uvm_fifo_overflow_policy.UVM_FIFO_DROP_NEWEST)
+    messages = Messages()
+    fifo.remove_streaming_handler()
+    fifo.add_logging_handler(messages)
+    fifo.report_phase()
+    assert messages.messages == [
+        "high watermark 3 (size 3), dropped 2, spilled 0"]
+    assert messages.levels == [logging.WARNING]
+
+
+def test_fifo_exports_are_created_on_first_access():
+    fifo = uvm_tlm_fifo("fifo", None)
+    assert fifo.get_children() == []
+    assert "put_export" not in vars(fifo) and "put_ap" not in vars(fifo)
+    export = fifo.put_export
+    assert vars(fifo)["put_export"] is export
+    assert fifo.put_export is export
+    assert export.queue is fifo.queue and export.ap is fifo.put_ap
+    assert {child.get_name() for child in fifo.get_children()} == {
+        "put_export", "put_ap"}
+    assert "get_export" not in vars(fifo)
+
+
+def test_lazy_descriptors_are_shared_but_exports_are_not():
+    assert isinstance(uvm_tlm_fifo_base.put_export, uvm_LazyExport)
+    assert isinstance(uvm_tlm_fifo_base.get_ap, uvm_LazyAnalysisPort)
+    first = uvm_tlm_fifo("first", None)
+    second = uvm_tlm_fifo("second", None)
+    assert first.get_export is not second.get_export
+    assert first.get_export.queue is first.queue
+    assert second.get_export.queue is second.queue
+    assert first.get_ap is not second.get_ap
+    assert first.get_export.get_parent() is first
+
+
+def test_fifo_subclass_overrides_the_export_class():
+    class CountingFifo(uvm_tlm_fifo):
+        class uvm_PutExport(uvm_tlm_fifo.uvm_PutExport):
+            def try_put(self, item):
+                self._parent.puts += 1
+                return super().try_put(item)
+
+        puts = 0
+
+    fifo = CountingFifo("fifo", None, 4)
+    assert fifo.put_export.try_put(1)
+    assert fifo.puts == 1
+    assert fifo.nonblocking_put_export.try_put(2)
+    assert fifo.puts == 1
+
+
+class Env(uvm_component):
+    def build_phase(self):
+        self.fifo = uvm_tlm_fifo("fifo", self, 4)
+        self.put_port = uvm_put_port("put_port", self)
+        self.get_port = uvm_get_port("get_port", self)
+        self.monitor = Collector("monitor", self)
+
+    def connect_phase(self):
+        self.put_port.connect(self.fifo.put_export)
+        self.get_port.connect(self.fifo.get_export)
+        self.fifo.put_ap.connect(self.monitor.analysis_export)
+
+
+def test_lazy_exports_bind_in_connect_phase():
+    env = Env("env", None)
+    uvm_build_phase.traverse(env)
+    assert "put_export" not in vars(env.fifo)
+    uvm_connect_phase.traverse(env)
+    env.resolve_bindings_hier()
+    assert env.put_port.try_put("a") and env.put_port.try_put("b")
+    assert env.monitor.items == ["a", "b"]
+    assert env.get_port.try_get() == (True, "a")
+    assert env.fifo.used() == 1
+    assert "peek_export" not in vars(env.fifo)
@@ -0,0 +1,174 @@
+import importlib
+import logging
+
+import pytest
+
+from pyuvm import (uvm_algorithmic_comparator, uvm_in_order_comparator,
+                   uvm_out_of_order_comparator)
+
+predefined = importlib.import_module("pyuvm.s13_predefined_component_classes")
+
+
+class Messages(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.NOTSET)
+        self.setFormatter(logging.Formatter("%(message)s"))
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+    def errors(self):
+        return [msg for level, msg in self.records
+                if level >= logging.ERROR]
+
+
+class Doubler:
+    def transform(self, tt):
+        return tt * 2
+
+
+class Clock:
+    """Stands in for get_sim_time() so expiry can be tested"""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self, unit):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(predefined, "get_sim_time", clock)
+    return clock
+
+
+def make(cls, *args, **kwargs):
+    comparator = cls("cmp", None, *args, **kwargs)
+    messages = Messages()
+    comparator.remove_streaming_handler()
+    comparator.add_logging_handler(messages)
+    pairs = []
+    comparator.pair_ap.write = pairs.append
+    return comparator, messages, pairs
+
+
+@pytest.mark.parametrize("cls, args, expected", [
+    (uvm_in_order_comparator, (), [1, 2, 3]),
+    (uvm_algorithmic_comparator, (Doubler(),), [2, 4, 6]),
+    (uvm_out_of_order_comparator, (), [1, 2, 3]),
+])
+def test_in_order_streams_match(cls, args, expected):
+    comparator, messages, pairs = make(cls, *args)
+    for before, after in zip([1, 2, 3], expected):
+        comparator.write_before(before)
+        comparator.write_after(after)
+    comparator.check_phase()
+    assert pairs == [(tt, tt) for tt in expected]
+    assert comparator.get_matches() == 3
+    assert comparator.get_mismatches() == 0
+    assert comparator.get_orphans() == 0
+    assert messages.errors() == []
+
+
+@pytest.mark.parametrize("cls, args", [
+    (uvm_in_order_comparator, ()),
+    (uvm_algorithmic_comparator, (Doubler(),)),
+])
+def test_in_order_comparators_flag_reordered_streams(cls, args):
+    comparator, messages, _ = make(cls, *args)
+    expected = [2, 4] if args else [1, 2]
+    for tt in expected:
+        comparator.write_after(tt)
+    for tt in reversed([1, 2]):
+        comparator.write_before(tt)
+    assert comparator.get_mismatches() == 2
+    assert len(messages.errors()) == 2
+
+
+def test_out_of_order_pairs_by_key():
+    comparator, messages, pairs = make(uvm_out_of_order_comparator,
+                                       key=lambda tt: tt[0])
+    for tt in [("a", 1), ("b", 2), ("c", 3)]:
+        comparator.write_before(tt)
+    for tt in [("c", 3), ("a", 1), ("b", 2)]:
+        comparator.write_after(tt)
+    assert pairs == [(("c", 3), ("c", 3)), (("a", 1), ("a", 1)),
+                     (("b", 2), ("b", 2))]
+    assert comparator.get_matches() == 3
+    assert comparator.before == {} and comparator.after == {}
+
+
+def test_out_of_order_partners_with_one_key_pair_in_order():
+    comparator, _, pairs = make(uvm_out_of_order_comparator,
+                                key=lambda tt: tt[0])
+    comparator.write_before(("a", 1))
+    comparator.write_before(("a", 2))
+    comparator.write_after(("a", 1))
+    comparator.write_after(("a", 3))
+    assert pairs == [(("a", 1), ("a", 1)), (("a", 2), ("a", 3))]
+    assert comparator.get_mismatches() == 1
+
+
+@pytest.mark.parametrize("cls, args", [
+    (uvm_in_order_comparator, ()),
+    (uvm_algorithmic_comparator, (Doubler(),)),
+    (uvm_out_of_order_comparator, ()),
+])
+def test_orphans_on_both_sides_are_reported(cls, args):
+    comparator, messages, _ = make(cls, *args)
+    comparator.write_before(1)
+    comparator.check_phase()
+    assert messages.errors() == ["1 expected transactions never arrived"]
+    comparator.flush()
+    messages.records.clear()
+    comparator.write_after(1)
+    comparator.write_after(2)
+    comparator.check_phase()
+    assert comparator.get_orphans() == 2
+    assert messages.errors() == [
+        "2 transactions arrived with no expected transaction"]
+
+
+def test_out_of_order_entries_expire_after_the_window(clock):
+    comparator, messages, pairs = make(uvm_out_of_order_comparator,
+                                       window=10)
+    comparator.write_before(1)
+    clock.now = 5
+    comparator.write_after(2)
+    clock.now = 12
+    # 1 expires; 2 is still inside the window
+    comparator.write_before(3)
+    assert comparator.before == {3: comparator.before[3]}
+    assert comparator.get_expired() == 1
+    clock.now = 14
+    comparator.write_after(3)
+    assert pairs == [(3, 3)]
+    assert comparator.get_orphans() == 2
+
+
+def test_check_phase_expires_and_reports_separately(clock):
+    comparator, messages, _ = make(uvm_out_of_order_comparator, window=10)
+    comparator.write_before(1)
+    clock.now = 8
+    comparator.write_after(2)
+    clock.now = 15
+    comparator.check_phase()
+    assert comparator.get_expired() == 1
+    assert comparator.get_orphans() == 2
+    assert messages.errors() == [
+        "1 transactions expired waiting more than 10ns for a partner",
+        "1 transactions arrived with no expected transaction"]
+    comparator.flush()
+    assert comparator.get_expired() == 0
+
+
+def test_entry_exactly_at_the_window_edge_has_not_expired(clock):
+    comparator, _, pairs = make(uvm_out_of_order_comparator, window=10)
+    comparator.write_before(1)
+    clock.now = 10
+    comparator.write_after(1)
+    assert pairs == [(1, 1)]
+    assert comparator.get_expired() == 0
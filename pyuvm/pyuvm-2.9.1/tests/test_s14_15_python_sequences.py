@@ -0,0 +1,543 @@
+import random
+from collections import Counter
+
+import pytest
+from cocotb.queue import QueueEmpty
+
+from pyuvm import (ArbitrationQueue, ResponseQueue, UVMSeeding,
+                   UVMSequenceError, uvm_sequence, uvm_sequence_item,
+                   uvm_sequencer, uvm_sequencer_arb_mode)
+
+ARB = uvm_sequencer_arb_mode
+
+
+def arbitration_queue(mode, seed=1):
+    random.seed(seed)
+    queue = ArbitrationQueue()
+    queue.set_arbitration(mode)
+    return queue
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def wins(mode, priorities, rounds):
+    """
+    Every sequence always has a request waiting. Count how often
+    each one wins.
+    """
+    queue = arbitration_queue(mode)
+    for seq_id, priority in priorities.items():
+        queue.put_nowait(seq_id, seq_id, priority)
+    counts = Counter()
+    for _ in range(rounds):
+        seq_id = queue.get_nowait()
+        counts[seq_id] += 1
+        queue.put_nowait(seq_id, seq_id, priorities[seq_id])
+    return counts
+
+
+def fill(queue):
+    # (sequence ID, priority) in arrival order
+    for ii, (seq_id, priority) in enumerate(
+            [(1, 100), (2, 300), (3, 200), (2, 300), (1, 100)]):
+        queue.put_nowait(f"{seq_id}.{ii}", seq_id, priority)
+
+
+def test_fifo_ignores_priority():
+    queue = arbitration_queue(ARB.UVM_SEQ_ARB_FIFO)
+    fill(queue)
+    assert drain(queue) == ["1.0", "2.1", "3.2", "2.3", "1.4"]
+
+
+def test_strict_fifo_takes_highest_priority_first():
+    queue = arbitration_queue(ARB.UVM_SEQ_ARB_STRICT_FIFO)
+    fill(queue)
+    assert drain(queue) == ["2.1", "2.3", "3.2", "1.0", "1.4"]
+
+
+def test_strict_random_takes_highest_priority_first():
+    queue = arbitration_queue(ARB.UVM_SEQ_ARB_STRICT_RANDOM)
+    fill(queue)
+    assert drain(queue)[:3] == ["2.1", "2.3", "3.2"]
+
+
+def test_strict_random_is_fair_within_a_priority():
+    counts = wins(ARB.UVM_SEQ_ARB_STRICT_RANDOM,
+                  {1: 200, 2: 200, 3: 100}, 4_000)
+    assert counts[3] == 0
+    assert 1_800 < counts[1] < 2_200
+
+
+def test_strict_random_heap_does_not_grow():
+    queue = arbitration_queue(ARB.UVM_SEQ_ARB_STRICT_RANDOM)
+    for ii in range(10_000):
+        queue.put_nowait(ii, 1, 100)
+        assert queue.get_nowait() == ii
+    assert len(queue._arbiter._priorities) == 1
+
+
+def test_random_is_uniform():
+    counts = wins(ARB.UVM_SEQ_ARB_RANDOM, {1: 100, 2: 300}, 4_000)
+    assert 1_800 < counts[1] < 2_200
+
+
+def test_weighted_follows_priority():
+    counts = wins(ARB.UVM_SEQ_ARB_WEIGHTED, {1: 100, 2: 300}, 4_000)
+    assert 850 < counts[1] < 1_150
+
+
+def test_set_arbitration_keeps_waiting_requests():
+    queue = arbitration_queue(ARB.UVM_SEQ_ARB_FIFO)
+    fill(queue)
+    queue.set_arbitration(ARB.UVM_SEQ_ARB_STRICT_FIFO)
+    assert drain(queue) == ["2.1", "2.3", "3.2", "1.0", "1.4"]
+
+
+class Item(uvm_sequence_item):
+    def __init__(self, name="item"):
+        super().__init__(name)
+
+
+class Sender(uvm_sequence):
+    def __init__(self, name, count, lock=False):
+        super().__init__(name)
+        self.count = count
+        self.use_lock = lock
+
+    async def body(self):
+        if self.use_lock:
+            await self.lock()
+        for ii in range(self.count):
+            await self.start_item(Item(f"{self.get_name()}.{ii}"))
+            await self.finish_item(self.running_item)
+        if self.use_lock:
+            self.unlock()
+
+
+def run_senders(scheduler, sequences, total):
+    seqr = uvm_sequencer("seqr", None)
+    export = seqr.seq_item_export
+    names = []
+
+    async def driver():
+        for _ in range(total):
+            item = await export.get_next_item()
+            names.append(item.get_name())
+            export.item_done()
+
+    for sequence in sequences:
+        scheduler.spawn(sequence.start(seqr))
+    scheduler.run(driver())
+    return names
+
+
+def test_fifo_interleaves_sequences(scheduler):
+    names = run_senders(scheduler, [Sender("a", 3), Sender("b", 3)], 6)
+    assert names == ["a.0", "b.0", "a.1", "b.1", "a.2", "b.2"]
+
+
+def test_lock_sends_only_the_holders_items(scheduler):
+    names = run_senders(scheduler,
+                        [Sender("a", 3, lock=True), Sender("b", 3)], 6)
+    assert names == ["a.0", "a.1", "a.2", "b.0", "b.1", "b.2"]
+
+
+def test_negative_priority_is_an_error():
+    with pytest.raises(UVMSequenceError, match="must not be negative"):
+        Sender("a", 1).set_priority(-1)
+
+
+def test_full_names_start_with_the_sequencer(scheduler):
+    full_names = []
+
+    class Recorder(Sender):
+        async def body(self):
+            full_names.append(self.get_full_name())
+            await super().body()
+            full_names.append(self.running_item.get_full_name())
+
+    sequence = Recorder("a", 1)
+    assert sequence.get_full_name() == "a"
+    run_senders(scheduler, [sequence], 1)
+    assert full_names == ["seqr.a", "seqr.a.a.0"]
+
+
+class Drawer(uvm_sequence):
+    async def body(self):
+        self.draw = self.rng.random()
+
+
+@pytest.fixture
+def test_seed(monkeypatch):
+    monkeypatch.setattr(UVMSeeding, "_test_seed", 7)
+    monkeypatch.setattr(UVMSeeding, "_counts", {})
+
+
+def draw(scheduler, seqr, sequence=None):
+    sequence = sequence or Drawer("drawer")
+    UVMSeeding.clear()
+    scheduler.run(sequence.start(seqr))
+    return sequence.draw
+
+
+def test_sequence_stream_is_seeded_from_its_path(scheduler, test_seed):
+    seqr_a = uvm_sequencer("seqr_a", None)
+    seqr_b = uvm_sequencer("seqr_b", None)
+    first = draw(scheduler, seqr_a)
+    assert draw(scheduler, seqr_a) == first
+    assert draw(scheduler, seqr_b) != first
+    assert draw(scheduler, None) not in (first, draw(scheduler, seqr_b))
+    used = Drawer("drawer")
+    used.rng.random()
+    assert draw(scheduler, seqr_a, used) == first
+
+
+def request(sequence_id):
+    req = Item("req")
+    req.parent_sequence_id = sequence_id
+    return req
+
+
+def response_to(req, name="rsp"):
+    rsp = Item(name)
+    rsp.set_id_info(req)
+    return rsp
+
+
+def test_responses_are_fetched_by_id():
+    queue = ResponseQueue()
+    reqs = [request(1), request(2), request(1)]
+    for req in reqs:
+        queue.put_nowait(response_to(req))
+    assert queue.get_nowait(reqs[2].transaction_id).transaction_id \
+        == reqs[2].transaction_id
+    assert queue.get_nowait(sequence_id=2).transaction_id \
+        == reqs[1].transaction_id
+    with pytest.raises(QueueEmpty):
+        queue.get_nowait(sequence_id=2)
+    with pytest.raises(QueueEmpty):
+        queue.get_nowait(reqs[1].transaction_id)
+    assert queue.get_nowait().transaction_id == reqs[0].transaction_id
+    assert queue.empty()
+
+
+def test_set_context_routes_a_new_response():
+    queue = ResponseQueue()
+    req = request(3)
+    rsp = Item("rsp")
+    rsp.set_context(req)
+    queue.put_nowait(rsp)
+    assert rsp.transaction_id != req.transaction_id
+    assert queue.get_nowait(sequence_id=3) is rsp
+    queue.put_nowait(rsp)
+    assert queue.get_nowait(req.transaction_id) is rsp
+
+
+def test_a_response_wakes_only_its_waiter(scheduler):
+    queue = ResponseQueue()
+    reqs = [request(1), request(2)]
+    got = []
+
+    async def wait_for(txn_id=None, sequence_id=None):
+        rsp = await queue.get_response(txn_id, sequence_id)
+        got.append((txn_id, sequence_id, rsp.get_name()))
+
+    scheduler.spawn(wait_for(reqs[0].transaction_id))
+    scheduler.spawn(wait_for(sequence_id=2))
+    scheduler.spawn(wait_for())
+    scheduler.run()
+    queue.put_nowait(response_to(reqs[1], "second"))
+    scheduler.run()
+    assert got == [(None, 2, "second")]
+    queue.put_nowait(response_to(request(5), "other"))
+    queue.put_nowait(response_to(reqs[0], "first"))
+    scheduler.run()
+    assert got[1:] == [(None, None, "other"),
+                       (reqs[0].transaction_id, None, "first")]
+
+
+def test_two_waiters_for_one_response_is_an_error(scheduler):
+    queue = ResponseQueue()
+    scheduler.spawn(queue.get_response(7))
+    with pytest.raises(UVMSequenceError, match="Two callers"):
+        scheduler.run(queue.get_response(7))
+
+
+class Requester(uvm_sequence):
+    async def body(self):
+        items = [Item(f"{self.get_name()}.{ii}") for ii in range(3)]
+        for item in items:
+            await self.start_item(item)
+            await self.finish_item(item)
+        self.responses = [
+            (await self.get_response(item.transaction_id)).get_name()
+            for item in reversed(items)]
+
+
+def test_sequences_get_their_own_responses(scheduler):
+    seqr = uvm_sequencer("seqr", None)
+    port = seqr.seq_item_export
+    sequences = [Requester("a"), Requester("b")]
+
+    async def driver():
+        pending = []
+        for _ in range(6):
+            item = await port.get_next_item()
+            port.item_done()
+            pending.append(item)
+        for item in pending:
+            port.put_response(response_to(item, f"rsp.{item.get_name()}"))
+
+    for sequence in sequences:
+        scheduler.spawn(sequence.start(seqr))
+    scheduler.spawn(driver())
+    scheduler.run()
+    for sequence in sequences:
+        name = sequence.get_name()
+        assert sequence.responses == [f"rsp.{name}.{ii}" for ii in (2, 1, 0)]
+
+
+class Pipeliner(uvm_sequence):
+    """Sends every item, then waits for the responses in order"""
+
+    def __init__(self, name, count):
+        super().__init__(name)
+        self.count = count
+        self.sent = 0
+        self.responses = []
+
+    async def body(self):
+        items = [Item(f"{self.get_name()}.{ii}") for ii in range(self.count)]
+        for item in items:
+            await self.start_item(item)
+            await self.finish_item(item)
+            self.sent += 1
+        for item in items:
+            rsp = await self.get_response(item.transaction_id)
+            self.responses.append((item.get_name(), rsp.get_name()))
+
+
+def test_max_outstanding_blocks_get(scheduler):
+    seqr = uvm_sequencer("seqr", None)
+    seqr.set_max_outstanding(2)
+    assert seqr.get_max_outstanding() == 2
+    port = seqr.seq_item_export
+    sequence = Pipeliner("a", 4)
+    accepted = []
+
+    async def driver():
+        for _ in range(4):
+            accepted.append(await port.get())
+
+    scheduler.spawn(sequence.start(seqr))
+    scheduler.spawn(driver())
+    scheduler.run()
+    assert [item.get_name() for item in accepted] == ["a.0", "a.1"]
+    assert sequence.sent == 2
+    assert len(port.outstanding) == 2
+    scheduler.run(port.put(response_to(accepted[1], "rsp.a.1")))
+    scheduler.run()
+    assert len(accepted) == 3 and sequence.sent == 3
+    for item in (accepted[0], accepted[2]):
+        scheduler.run(port.put(response_to(item, f"rsp.{item.get_name()}")))
+    scheduler.run()
+    assert len(accepted) == 4
+    scheduler.run(port.put(response_to(accepted[3], "rsp.a.3")))
+    scheduler.run()
+    assert port.outstanding == {}
+    assert sequence.responses == [(f"a.{ii}", f"rsp.a.{ii}")
+                                  for ii in range(4)]
+
+
+def test_out_of_order_responses_reach_their_requests(scheduler):
+    seqr = uvm_sequencer("seqr", None)
+    seqr.set_max_outstanding(4)
+    port = seqr.seq_item_export
+    sequences = [Pipeliner("a", 2), Pipeliner("b", 2)]
+
+    async def driver():
+        peeked = await port.peek()
+        first = await port.get()
+        assert first is peeked
+        pending = [first] + [await port.get() for _ in range(3)]
+        for item in (pending[3], pending[0], pending[2], pending[1]):
+            await port.put(response_to(item, f"rsp.{item.get_name()}"))
+
+    for sequence in sequences:
+        scheduler.spawn(sequence.start(seqr))
+    scheduler.spawn(driver())
+    scheduler.run()
+    for sequence in sequences:
+        name = sequence.get_name()
+        assert sequence.responses == [(f"{name}.{ii}", f"rsp.{name}.{ii}")
+                                      for ii in range(2)]
+    assert port.outstanding == {}
+
+
+def test_negative_max_outstanding_is_an_error():
+    seqr = uvm_sequencer("seqr", None)
+    with pytest.raises(UVMSequenceError, match="must not be negative"):
+        seqr.set_max_outstanding(-1)
+
+
+class Streamer(uvm_sequence):
+    def __init__(self, name, count, use_async=True):
+        super().__init__(name)
+        self.count = count
+        self.use_async = use_async
+        self.result = None
+
+    async def generate(self):
+        for ii in range(self.count):
+            yield Item(f"{self.get_name()}.{ii}")
+
+    async def body(self):
+        if self.use_async:
+            source = self.generate()
+        else:
+            source = [Item(f"{self.get_name()}.{ii}")
+                      for ii in range(self.count)]
+        self.result = await self.send_items(source)
+
+
+@pytest.mark.parametrize("use_async", [True, False])
+def test_send_items_streams_in_batches(scheduler, use_async):
+    seqr = uvm_sequencer("seqr", None)
+    port = seqr.seq_item_export
+    sequence = Streamer("s", 10, use_async)
+    batches = []
+
+    async def driver():
+        while sum(map(len, batches)) < 10:
+            items = await port.get_next_items(4)
+            batches.append([item.get_name() for item in items])
+            port.items_done()
+
+    task = scheduler.spawn(sequence.start(seqr))
+    scheduler.run(driver())
+    scheduler.run()
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sum(batches, []) == [f"s.{ii}" for ii in range(10)]
+    assert task.done()
+    assert sequence.result == 10
+
+
+def test_get_next_items_takes_one_item_from_start_item(scheduler):
+    seqr = uvm_sequencer("seqr", None)
+    port = seqr.seq_item_export
+    batches = []
+
+    async def driver():
+        for _ in range(2):
+            items = await port.get_next_items(4)
+            batches.append([item.get_name() for item in items])
+            port.items_done()
+
+    scheduler.spawn(Sender("a", 2).start(seqr))
+    scheduler.run(driver())
+    assert batches == [["a.0"], ["a.1"]]
+
+
+def test_items_done_before_get_next_items_is_an_error():
+    seqr = uvm_sequencer("seqr", None)
+    with pytest.raises(UVMSequenceError, match="call get_next_items"):
+        seqr.seq_item_export.items_done()
+
+
+class SlottedItem(uvm_sequence_item):
+    __slots__ = ("addr",)
+
+    def __init__(self, name="slotted"):
+        super().__init__(name)
+        self.addr = 0
+
+
+class PlainItem(uvm_sequence_item):
+    def __init__(self, name="plain"):
+        super().__init__(name)
+        self.addr = 0
+
+
+def test_subclass_with_slots_has_no_instance_dict():
+    item = SlottedItem()
+    item.addr = 5
+    assert not hasattr(item, "__dict__")
+    with pytest.raises(AttributeError):
+        item.extra = 1
+
+
+def test_subclass_without_slots_takes_any_attribute():
+    item = PlainItem()
+    item.extra = 1
+    assert vars(item) == {"addr": 0, "extra": 1}
+
+
+@pytest.mark.parametrize("item_type", [SlottedItem, PlainItem])
+def test_item_events_are_created_on_first_use(item_type):
+    item = item_type()
+    assert (item._start_condition, item._finish_condition,
+            item._item_ready) == (None, None, None)
+    event = item.start_condition
+    assert item.start_condition is event
+    assert item._finish_condition is None and item._item_ready is None
+
+
+class Handshaker(uvm_sequence):
+    def __init__(self, name, items):
+        super().__init__(name)
+        self.items = items
+
+    async def body(self):
+        for item in self.items:
+            await self.start_item(item)
+            item.addr += 1
+            await self.finish_item(item)
+
+
+def test_lazy_events_work_with_start_and_finish_item(scheduler):
+    seqr = uvm_sequencer("seqr", None)
+    port = seqr.seq_item_export
+    items = [SlottedItem("s"), PlainItem("p")]
+    seen = []
+
+    async def driver():
+        for _ in items:
+            item = await port.get_next_item()
+            seen.append((item.get_name(), item.addr))
+            port.item_done()
+
+    task = scheduler.spawn(Handshaker("h", items).start(seqr))
+    scheduler.run(driver())
+    scheduler.run()
+    assert seen == [("s", 1), ("p", 1)]
+    assert task.done()
+    for item in items:
+        assert item._start_condition is not None
+        assert item._finish_condition is not None
+
+
+def test_streamed_items_never_create_events(scheduler):
+    seqr = uvm_sequencer("seqr", None)
+    port = seqr.seq_item_export
+    items = [SlottedItem(f"s{ii}") for ii in range(3)]
+
+    async def driver():
+        for _ in range(2):
+            await port.get_next_items(2)
+            port.items_done()
+
+    async def body():
+        return await seqr.send_items(items, sequence_id=1)
+
+    task = scheduler.spawn(body())
+    scheduler.run(driver())
+    scheduler.run()
+    assert task.result == 3
+    for item in items:
+        assert (item._start_condition, item._finish_condition,
+                item._item_ready) == (None, None, None)
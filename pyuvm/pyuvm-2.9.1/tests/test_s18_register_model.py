@@ -0,0 +1,329 @@
+import array
+
+import pytest
+
+from pyuvm import (UVMError, uvm_access_e, uvm_mem, uvm_predict_e, uvm_reg,
+                   uvm_mem_store, uvm_reg_adapter, uvm_reg_block,
+                   uvm_reg_field, uvm_reg_map, uvm_sequence_item,
+                   uvm_sequencer, uvm_status_e)
+
+
+def make_reg(block, name, n_bits=32):
+    reg = uvm_reg(name, n_bits)
+    reg.configure(block)
+    return reg
+
+
+@pytest.fixture
+def bus_map():
+    block = uvm_reg_block("block")
+    reg_map = block.create_map("bus", 0x4000_0000)
+    for ii in range(4):
+        reg_map.add_reg(make_reg(block, f"r{ii}"), 4 * ii)
+    reg_map.add_reg(make_reg(block, "wide", 64), 0x10, "RO")
+    ram = uvm_mem("ram", 256, 32)
+    ram.configure(block)
+    reg_map.add_mem(ram, 0x1000)
+    sub = uvm_reg_map("sub")
+    sub.configure(block, 0)
+    sub.add_reg(make_reg(block, "sr", 16), 0x8)
+    reg_map.add_submap(sub, 0x2000)
+    return reg_map
+
+
+def name_at(reg_map, address):
+    element, _ = reg_map.decode(address)
+    return None if element is None else element.get_name()
+
+
+def test_decode_finds_registers_memories_and_submaps(bus_map):
+    assert name_at(bus_map, 0x4000_0004) == "r1"
+    assert bus_map.decode(0x4000_0016)[1] == 6
+    assert bus_map.decode(0x4000_13FC)[1] == 255
+    assert name_at(bus_map, 0x4000_2008) == "sr"
+    for address in (0x4000_0018, 0x4000_1400, 0x3000_0000):
+        assert bus_map.decode(address) == (None, None)
+    assert bus_map.get_reg_by_offset(0x14).get_name() == "wide"
+    assert bus_map.get_mem_by_offset(0x1400) is None
+
+
+def test_addresses_and_rights_include_submaps(bus_map):
+    sr = bus_map.get_reg_by_offset(0x2008)
+    ram = bus_map.get_mem_by_offset(0x1000)
+    assert sr.get_address() == 0x4000_2008
+    assert ram.get_address(5) == 0x4000_1014
+    assert bus_map.get_rights(bus_map.get_reg_by_offset(0x10)) == "RO"
+    assert bus_map.get_rights(sr) == "RW"
+    assert len(bus_map.get_registers()) == 6
+    assert len(bus_map.get_registers(hier=False)) == 5
+
+
+def test_overlaps_and_cycles_are_errors(bus_map):
+    bus_map.add_reg(make_reg(bus_map.get_parent(), "bad"), 0x12)
+    with pytest.raises(UVMError, match="bad at 0x12 overlaps wide"):
+        bus_map.decode(0)
+    with pytest.raises(UVMError, match="cannot be its own submap"):
+        bus_map.get_submaps()[0].add_submap(bus_map, 0)
+
+
+@pytest.fixture
+def ctrl():
+    block = uvm_reg_block("block")
+    reg = uvm_reg("ctrl", 32)
+    for name, size, lsb, access, reset in (
+            ("rw", 8, 0, "RW", 0x5A), ("ro", 4, 8, "RO", 0x3),
+            ("w1c", 4, 12, "W1C", 0xF), ("w1s", 4, 16, "W1S", 0x0),
+            ("rc", 4, 20, "RC", 0x9), ("wo", 4, 24, "WO", 0x1)):
+        field = uvm_reg_field(name)
+        field.configure(reg, size, lsb, access, False, reset)
+    reg.configure(block)
+    return reg
+
+
+def fields(reg, value):
+    return {field.get_name(): value(field) for field in reg.get_fields()}
+
+
+def test_reset_values_fill_both_values(ctrl):
+    assert ctrl.get_reset() == 0x0190F35A
+    assert ctrl.get_mirrored_value() == 0x0190F35A
+    assert not ctrl.needs_update()
+
+
+def test_predict_applies_each_access_policy(ctrl):
+    ctrl.predict(0xFFFFFFFF, kind=uvm_predict_e.UVM_PREDICT_WRITE)
+    assert fields(ctrl, uvm_reg_field.get_mirrored_value) == {
+        "rw": 0xFF, "ro": 0x3, "w1c": 0x0, "w1s": 0xF, "rc": 0x9,
+        "wo": 0xF}
+    ctrl.predict(0x0AAAAAAA, kind=uvm_predict_e.UVM_PREDICT_READ)
+    assert ctrl.get_mirrored_value() == 0x0F0AAAAA
+
+
+def test_predict_with_byte_enables_changes_only_those_bytes(ctrl):
+    ctrl.predict(0x12345678, be=0b0010)
+    assert ctrl.get_mirrored_value() == 0x0190565A
+
+
+def test_set_leads_to_an_update_of_only_changed_fields(ctrl):
+    fields_by_name = {field.get_name(): field for field in ctrl.get_fields()}
+    fields_by_name["rw"].set(0x11)
+    fields_by_name["ro"].set(0)
+    fields_by_name["w1c"].set(0x3)
+    assert fields(ctrl, uvm_reg_field.get) == {
+        "rw": 0x11, "ro": 0x3, "w1c": 0xC, "w1s": 0x0, "rc": 0x9,
+        "wo": 0x1}
+    assert fields(ctrl, uvm_reg_field.needs_update) == {
+        "rw": True, "ro": False, "w1c": True, "w1s": False, "rc": False,
+        "wo": False}
+    assert ctrl.get_update_value() == 0x01003011
+    assert ctrl.get_parent().get_regs_to_update() == [ctrl]
+    ctrl.get_parent().reset()
+    assert not ctrl.needs_update()
+
+
+@pytest.mark.parametrize("size, lsb, access, message", [
+    (4, 2, "RW", "Field bad overlaps field rw"),
+    (4, 30, "RW", "ends at bit 33, past the 32 bits"),
+    (1, 31, "XX", "access XX is not one of"),
+])
+def test_bad_fields_are_errors(ctrl, size, lsb, access, message):
+    field = uvm_reg_field("bad")
+    with pytest.raises(UVMError, match=message):
+        field.configure(ctrl, size, lsb, access, False, 0)
+
+
+class BusItem(uvm_sequence_item):
+    def __init__(self, name="bus_item"):
+        super().__init__(name)
+        self.write = False
+        self.addr = 0
+        self.data = []
+
+
+class BusAdapter(uvm_reg_adapter):
+    def __init__(self, bursts, responses):
+        super().__init__("adapter")
+        self.supports_bursts = bursts
+        self.provides_responses = responses
+        self.max_burst_beats = 8
+
+    def reg2bus(self, rw):
+        item = BusItem()
+        item.write = rw.kind in (uvm_access_e.UVM_WRITE,
+                                 uvm_access_e.UVM_BURST_WRITE)
+        item.addr = rw.addr
+        item.data = list(rw.data) if rw.n_beats > 1 else [rw.data]
+        return item
+
+    def bus2reg(self, bus_item, rw):
+        if not bus_item.write:
+            rw.data = bus_item.data if rw.n_beats > 1 else bus_item.data[0]
+        rw.status = uvm_status_e.UVM_IS_OK
+
+
+class Bus:
+    """A sequencer and a driver in front of a word-addressed memory"""
+
+    def __init__(self, scheduler, adapter):
+        self.adapter = adapter
+        self.sequencer = uvm_sequencer("seqr", None)
+        self.memory = {}
+        self.items = []
+        scheduler.spawn(self.driver())
+
+    async def driver(self):
+        export = self.sequencer.seq_item_export
+        while True:
+            item = await export.get_next_item()
+            self.items.append((item.write, item.addr, len(item.data)))
+            if item.write:
+                for ii, word in enumerate(item.data):
+                    self.memory[item.addr + 4 * ii] = word
+            else:
+                item.data = [self.memory.get(item.addr + 4 * ii, 0)
+                             for ii in range(len(item.data))]
+            if self.adapter.provides_responses:
+                rsp = BusItem("rsp")
+                rsp.write, rsp.data = item.write, item.data
+                rsp.set_id_info(item)
+                export.item_done(rsp)
+            else:
+                export.item_done()
+
+
+def frontdoor_block(bus, n_bits=32, endian="little"):
+    """
+    Twenty registers with one field each. r10 is apart from the
+    others at 0x200 and r15 is read-only.
+    """
+    block = uvm_reg_block("block")
+    reg_map = block.create_map("bus", 0x1000, 4, endian)
+    step = 4 * -(-n_bits // 32)
+    regs = []
+    for ii in range(20):
+        reg = make_reg(block, f"r{ii}", n_bits)
+        uvm_reg_field("value").configure(reg, n_bits, 0, "RW", False, 0)
+        reg_map.add_reg(reg, 0x200 if ii == 10 else ii * step,
+                        "RO" if ii == 15 else "RW")
+        regs.append(reg)
+    reg_map.set_sequencer(bus.sequencer, bus.adapter)
+    return block, reg_map, regs
+
+
+@pytest.fixture(params=[(False, False), (True, False), (True, True)],
+                ids=["single", "bursts", "bursts with responses"])
+def bus(request, scheduler):
+    return Bus(scheduler, BusAdapter(*request.param))
+
+
+def test_write_regs_joins_consecutive_registers(scheduler, bus):
+    _, reg_map, regs = frontdoor_block(bus)
+    status = scheduler.run(
+        reg_map.write_regs({reg: 0x100 + ii for ii, reg in enumerate(regs)}))
+    assert status == uvm_status_e.UVM_NOT_OK
+    writable = [ii for ii in range(20) if ii != 15]
+    assert bus.memory == {regs[ii].get_address(): 0x100 + ii
+                          for ii in writable}
+    if bus.adapter.supports_bursts:
+        assert bus.items == [(True, 0x1000, 8), (True, 0x1020, 2),
+                             (True, 0x102C, 4), (True, 0x1040, 4),
+                             (True, 0x1200, 1)]
+    else:
+        assert len(bus.items) == len(writable)
+
+
+def test_read_regs_returns_values_in_request_order(scheduler, bus):
+    _, reg_map, regs = frontdoor_block(bus)
+    for ii, reg in enumerate(regs):
+        bus.memory[reg.get_address()] = 0x100 + ii
+    status, values = scheduler.run(reg_map.read_regs(regs[::-1]))
+    assert status == uvm_status_e.UVM_IS_OK
+    assert values == [0x100 + ii for ii in reversed(range(20))]
+    assert regs[3].get_mirrored_value() == 0x103
+    expected_items = 5 if bus.adapter.supports_bursts else 20
+    assert len(bus.items) == expected_items
+
+
+def test_update_writes_only_changed_registers(scheduler, bus):
+    block, _, regs = frontdoor_block(bus)
+    assert scheduler.run(regs[2].write(7)) == uvm_status_e.UVM_IS_OK
+    assert scheduler.run(regs[2].read()) == (uvm_status_e.UVM_IS_OK, 7)
+    bus.items.clear()
+    for reg in regs[4:8]:
+        reg.set(0x55)
+    assert scheduler.run(block.update()) == uvm_status_e.UVM_IS_OK
+    assert not block.needs_update()
+    assert [bus.memory[reg.get_address()] for reg in regs[4:8]] == [0x55] * 4
+    expected_items = 1 if bus.adapter.supports_bursts else 4
+    assert len(bus.items) == expected_items
+
+
+def test_wide_registers_are_split_into_bus_words(scheduler):
+    bus = Bus(scheduler, BusAdapter(True, False))
+    _, reg_map, regs = frontdoor_block(bus, n_bits=64, endian="big")
+    scheduler.run(reg_map.write_regs({regs[0]: 0x1111_2222_3333_4444}))
+    assert bus.memory == {0x1000: 0x1111_2222, 0x1004: 0x3333_4444}
+    assert bus.items == [(True, 0x1000, 2)]
+    assert scheduler.run(regs[0].read()) == (uvm_status_e.UVM_IS_OK,
+                                             0x1111_2222_3333_4444)
+
+
+@pytest.fixture(params=[False, True], ids=["pages", "temp_file"])
+def store(request):
+    store = uvm_mem_store(1 << 32, temp_file=request.param)
+    yield store
+    store.close()
+
+
+def test_store_allocates_only_written_pages(store):
+    assert bytes(store.read(0x1234, 4)) == bytes(4)
+    assert store.get_stats().pages == 0
+    store.write(4094, b"abcdef")
+    store.write_word(0xFFFF_FFFC, 0xDEADBEEF)
+    assert store.get_stats().pages == 3
+    assert bytes(store.read(4094, 6)) == b"abcdef"
+    assert store.read_word(0xFFFF_FFFC) == 0xDEADBEEF
+    assert store.read_word(0xFFFF_FFFC, 4, "big") == 0xEFBEADDE
+    store.clear()
+    assert store.get_stats().pages == 0
+    assert bytes(store.read(4094, 6)) == bytes(6)
+
+
+def test_store_reads_are_copies(store):
+    store.write(8192, array.array("I", [1, 2, 3]))
+    data = store.read(8192, 12)
+    assert type(data) is bytes
+    assert list(memoryview(data).cast("I")) == [1, 2, 3]
+    store.write(8192, b"\x07")
+    assert data[0] == 1
+    assert store.read(8192, 1) == b"\x07"
+
+
+@pytest.mark.parametrize("addr, length", [(0x1000, 8), (0x0FFC, 8),
+                                          (0x0FFC, 0x2008)])
+def test_store_reads_of_unwritten_pages_are_copies(store, addr, length):
+    first = store.read(addr, length)
+    store.write(addr, b"\xff" * length)
+    assert first == bytes(length)
+    assert store.read(addr, length) == b"\xff" * length
+    store.clear()
+    assert store.read(addr, length) == bytes(length)
+
+
+def test_store_accesses_past_the_end_are_errors(store):
+    with pytest.raises(UVMError, match="outside a uvm_mem_store"):
+        store.read(0xFFFF_FFFE, 4)
+
+
+def test_mem_backdoor_reads_and_writes_words():
+    mem = uvm_mem("mem", 1 << 30, 32)
+    mem.poke(5, 0x1_2345_6789)
+    assert (mem.peek(5), mem.peek(6)) == (0x2345_6789, 0)
+    mem.burst_poke(10, bytes(range(16)))
+    assert bytes(mem.burst_peek(10, 4)) == bytes(range(16))
+    with pytest.raises(UVMError, match="outside memory mem"):
+        mem.peek(1 << 30)
+    with pytest.raises(UVMError, match="not a whole number of words"):
+        mem.burst_poke(0, b"abc")
+    with pytest.raises(UVMError, match="needs a store of at least"):
+        mem.set_store(uvm_mem_store(100))
@@ -0,0 +1,158 @@
+import struct
+from types import SimpleNamespace
+
+import pytest
+from cocotb.queue import QueueEmpty, QueueFull
+
+from pyuvm import FieldCodec, UVMQueue, uvm_field
+
+
+def test_items_stay_in_order_across_wrap_and_growth():
+    queue = UVMQueue()
+    for ii in range(10):
+        queue.put_nowait(ii)
+    for _ in range(8):
+        queue.get_nowait()
+    for ii in range(10, 50):
+        queue.put_nowait(ii)
+    expected = list(range(8, 50))
+    assert list(queue) == expected
+    assert len(queue) == len(expected)
+    assert [queue.get_nowait() for _ in expected] == expected
+    with pytest.raises(QueueEmpty):
+        queue.get_nowait()
+
+
+def test_bounded_queue_is_full_at_maxsize():
+    queue = UVMQueue(maxsize=3)
+    for ii in range(3):
+        queue.put_nowait(ii)
+    assert queue.full()
+    with pytest.raises(QueueFull):
+        queue.put_nowait(3)
+    assert queue.peek_nowait() == 0
+    assert queue.get_nowait() == 0
+    queue.put_nowait(3)
+    assert list(queue) == [1, 2, 3]
+
+
+def test_blocked_put_resumes_when_a_get_makes_room(scheduler):
+    queue = UVMQueue(maxsize=1)
+    queue.put_nowait("a")
+    putter = scheduler.spawn(queue.put("b"))
+    scheduler.run()
+    assert not putter.done()
+    assert queue.get_nowait() == "a"
+    scheduler.run()
+    assert putter.done()
+    assert list(queue) == ["b"]
+
+
+def test_a_put_wakes_every_peeker_and_one_getter(scheduler):
+    queue = UVMQueue()
+    peeks = [scheduler.spawn(queue.peek()) for _ in range(2)]
+    gets = [scheduler.spawn(queue.get()) for _ in range(2)]
+    scheduler.run()
+    queue.put_nowait("x")
+    scheduler.run()
+    assert [task.result for task in peeks] == ["x", "x"]
+    assert [task.done() for task in gets] == [True, False]
+    assert gets[0].result == "x"
+    queue.put_nowait("y")
+    scheduler.run()
+    assert gets[1].result == "y"
+
+
+def test_a_killed_getter_hands_on_its_wakeup(scheduler):
+    queue = UVMQueue()
+    first = scheduler.spawn(queue.get())
+    second = scheduler.spawn(queue.get())
+    scheduler.run()
+    queue.put_nowait("x")
+    scheduler.ready.remove(first)
+    first.coro.close()
+    scheduler.run()
+    assert second.result == "x"
+
+
+STRUCT_FIELDS = [uvm_field("a", 8), uvm_field("b", 16, signed=True),
+                 uvm_field("c", 32), uvm_field("d", 64, signed=True)]
+SHIFT_FIELDS = [uvm_field("a", 3), uvm_field("b", 5, signed=True),
+                uvm_field("c", 12), uvm_field("d", 1)]
+
+
+def round_trip(codec, **values):
+    buffer = bytearray(codec.size + 2)
+    codec.pack_into(SimpleNamespace(**values), buffer, 1)
+    obj = SimpleNamespace()
+    codec.unpack_from(obj, buffer, 1)
+    return bytes(buffer[1:-1]), vars(obj)
+
+
+def test_struct_codec_round_trips_whole_byte_fields():
+    codec = FieldCodec(STRUCT_FIELDS)
+    assert "_pack_into" in codec.source
+    values = {"a": 0xAB, "b": -2, "c": 0x01020304, "d": -1}
+    packed, unpacked = round_trip(codec, **values)
+    assert packed == struct.pack(">BhIq", 0xAB, -2, 0x01020304, -1)
+    assert unpacked == values
+
+
+def test_struct_codec_little_endian():
+    codec = FieldCodec([uvm_field("a", 16, endian="little"),
+                        uvm_field("b", 32, endian="little")])
+    packed, unpacked = round_trip(codec, a=0x1234, b=0x56789ABC)
+    assert packed == bytes.fromhex("3412bc9a7856")
+    assert unpacked == {"a": 0x1234, "b": 0x56789ABC}
+
+
+def test_struct_codec_rejects_a_value_wider_than_its_field():
+    codec = FieldCodec(STRUCT_FIELDS)
+    with pytest.raises(struct.error):
+        round_trip(codec, a=0x100, b=0, c=0, d=0)
+
+
+def test_shift_codec_round_trips_odd_widths():
+    codec = FieldCodec(SHIFT_FIELDS)
+    assert "_pack_into" not in codec.source
+    assert (codec.width, codec.size) == (21, 3)
+    values = {"a": 5, "b": -3, "c": 0xABC, "d": 1}
+    packed, unpacked = round_trip(codec, **values)
+    # 101 11101 101010111100 1, then three bits of padding
+    assert packed == b"\xbd\xab\xc8"
+    assert unpacked == values
+
+
+@pytest.mark.parametrize("value", [-16, -1, 0, 1, 15])
+def test_shift_codec_sign_extends_signed_fields(value):
+    codec = FieldCodec(SHIFT_FIELDS)
+    _, unpacked = round_trip(codec, a=0, b=value, c=0, d=0)
+    assert unpacked["b"] == value
+
+
+def test_shift_codec_cuts_values_to_their_width():
+    codec = FieldCodec(SHIFT_FIELDS)
+    _, unpacked = round_trip(codec, a=0x1F, b=0x35, c=0x1FFF, d=2)
+    assert unpacked == {"a": 7, "b": -11, "c": 0xFFF, "d": 0}
+
+
+def test_shift_codec_mixes_little_endian_and_odd_fields():
+    codec = FieldCodec([uvm_field("flag", 1),
+                        uvm_field("word", 16, endian="little"),
+                        uvm_field("rest", 7)])
+    packed, unpacked = round_trip(codec, flag=1, word=0x1234, rest=0x55)
+    assert packed == bytes([0x80 | 0x34 >> 1, (0x34 & 1) << 7 | 0x12 >> 1,
+                            (0x12 & 1) << 7 | 0x55])
+    assert unpacked == {"flag": 1, "word": 0x1234, "rest": 0x55}
+
+
+@pytest.mark.parametrize("fields", [STRUCT_FIELDS, SHIFT_FIELDS])
+def test_codec_packs_and_unpacks_many_items(fields):
+    codec = FieldCodec(fields)
+    objs = [SimpleNamespace(a=ii, b=-ii, c=ii * 3, d=ii & 1)
+            for ii in range(5)]
+    buffer = bytearray(codec.size * 5)
+    assert codec.pack_items(objs, buffer, 0) == len(buffer)
+    copies = [SimpleNamespace() for _ in objs]
+    assert codec.unpack_items(copies, buffer, 0) == len(buffer)
+    assert [vars(copy) for copy in copies] == [vars(obj) for obj in objs]